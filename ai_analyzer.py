@@ -1,25 +1,70 @@
 ﻿import os
+import copy
 import json
 import re
-from openai import OpenAI
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import streamlit as st  # <-- ADDED: For accessing Streamlit Secrets
+from types import MappingProxyType
+from prompt_builder import (
+    SYSTEM_PROMPT, CHUNK_SUMMARY_SYSTEM_PROMPT, CHUNK_SUMMARY_TOKENS,
+    estimate_tokens, plan_prompt, build_analysis_prompt, build_chunk_prompt, merge_chunk_summaries
+)
+from resilience import CircuitBreaker, Deadline, DeadlineExceeded, LatencyTracker, hedged_call, retry_call
+from metrics import get_metrics
+from scripture_refs import reference_key
+from theme_index import recommend_verses
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com"
+
+# Upper bound on concurrent chunk summaries for one long entry
+MAX_PARALLEL_REQUESTS = 4
+
+# Total time budget for one analysis, including retries (override with DEEPSEEK_DEADLINE_SECONDS)
+ANALYSIS_DEADLINE_SECONDS = 45
+MAX_RETRIES = 2
+
+# Shared by every session: stop calling DeepSeek for a while after repeated failures
+_deepseek_breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+# Recent request latencies; with DEEPSEEK_HEDGE=1 a second request fires after the p95
+_request_latencies = LatencyTracker(window=200, min_samples=20)
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="deepseek-hedge")
+
+# One client (and HTTP connection pool) per API key/endpoint, reused across analyses
+_clients = {}
+_clients_lock = threading.Lock()
 
 # Theme mapping for deeper analysis
-SPIRITUAL_THEMES = {
-    "Faith": ["trust", "belief", "confidence", "assurance", "conviction"],
-    "Hope": ["expectation", "anticipation", "optimism", "longing", "aspiration"],
-    "Love": ["compassion", "affection", "devotion", "care", "kindness"],
-    "Peace": ["calm", "serenity", "tranquility", "harmony", "contentment"],
-    "Joy": ["happiness", "delight", "gladness", "cheer", "bliss"],
-    "Patience": ["endurance", "perseverance", "steadfastness", "fortitude", "resilience"],
-    "Gratitude": ["thankfulness", "appreciation", "recognition", "acknowledgment"],
-    "Forgiveness": ["mercy", "pardon", "clemency", "absolution", "reconciliation"],
-    "Humility": ["modesty", "meekness", "unpretentiousness", "submission"],
-    "Wisdom": ["understanding", "insight", "discernment", "prudence", "knowledge"]
-}
-
-BIBLE_BOOKS = {
+SPIRITUAL_THEMES = MappingProxyType({
+    "Faith": ("trust", "belief", "confidence", "assurance", "conviction"),
+    "Hope": ("expectation", "anticipation", "optimism", "longing", "aspiration"),
+    "Love": ("compassion", "affection", "devotion", "care", "kindness"),
+    "Peace": ("calm", "serenity", "tranquility", "harmony", "contentment"),
+    "Joy": ("happiness", "delight", "gladness", "cheer", "bliss"),
+    "Patience": ("endurance", "perseverance", "steadfastness", "fortitude", "resilience"),
+    "Gratitude": ("thankfulness", "appreciation", "recognition", "acknowledgment"),
+    "Forgiveness": ("mercy", "pardon", "clemency", "absolution", "reconciliation"),
+    "Humility": ("modesty", "meekness", "unpretentiousness", "submission"),
+    "Wisdom": ("understanding", "insight", "discernment", "prudence", "knowledge")
+})
+
+# Keyword -> theme lookup and a single word-boundary pattern, compiled once at import.
+# Common inflections are allowed ("trusting", "cares") but not other words ("careless").
+_KEYWORD_THEMES = MappingProxyType({
+    keyword: theme
+    for theme, keywords in SPIRITUAL_THEMES.items()
+    for keyword in keywords
+})
+_THEME_ORDER = MappingProxyType({theme: i for i, theme in enumerate(SPIRITUAL_THEMES)})
+_THEME_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(k) for k in sorted(_KEYWORD_THEMES, key=len, reverse=True)) + r")"
+    r"(?:s|es|d|ed|ing|ly)?\b",
+    re.IGNORECASE
+)
+
+BIBLE_BOOKS = MappingProxyType({
     "Psalms": "Comfort, prayer, worship",
     "Proverbs": "Wisdom, practical living",
     "Matthew": "Jesus' teachings, Kingdom",
@@ -27,101 +72,300 @@ BIBLE_BOOKS = {
     "Romans": "Doctrine, grace, faith",
     "Philippians": "Joy, contentment",
     "James": "Practical faith, wisdom"
-}
+})
 
 def analyze_spiritual_journal(journal_text):
     """Deep spiritual analysis with personalized guidance."""
+    started = time.perf_counter()
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0, "sent_tokens": 0}
+    timings = {}
+    
     try:
-        # Get API key from Streamlit Secrets
-        api_key = st.secrets.get("DEEPSEEK_API_KEY")
+        # Get API key from Streamlit Secrets (or the environment for local runs)
+        phase = time.perf_counter()
+        api_key = get_setting("DEEPSEEK_API_KEY")
+        base_url = get_setting("DEEPSEEK_BASE_URL", DEEPSEEK_BASE_URL)
+        timings["secrets"] = _elapsed_ms(phase)
         
         if not api_key:
-            return get_rich_fallback_response("API key not configured in Streamlit Secrets")
+            return _fallback("no_api_key", "API key not configured in Streamlit Secrets")
         
-        # Initialize DeepSeek client
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
+        # Serve the fallback instantly while DeepSeek is failing for everyone
+        if not _deepseek_breaker.allow():
+            return _fallback("circuit_open", "AI service temporarily unavailable")
+        
+        deadline = Deadline(float(get_setting("DEEPSEEK_DEADLINE_SECONDS", ANALYSIS_DEADLINE_SECONDS)))
+        hedge = str(get_setting("DEEPSEEK_HEDGE", "")).lower() in ("1", "true", "yes")
         
-        # Create comprehensive prompt for deep analysis
-        prompt = f"""As a seasoned spiritual director with theological training, provide a DEEP analysis of this journal entry:
-
-JOURNAL ENTRY:
-"{journal_text}"
-
-Provide analysis in this EXACT JSON format:
-{{
-  "analysis_summary": "Brief overall assessment of the spiritual state",
-  "primary_themes": ["theme1", "theme2", "theme3", "theme4"],
-  "emotional_state": ["emotion1", "emotion2", "emotion3"],
-  "core_question": "The central spiritual question emerging",
-  "key_insight": "Most important spiritual insight (2-3 sentences)",
-  "bible_passages": [
-    {{
-      "reference": "Scripture reference",
-      "text": "Full verse text",
-      "why_it_fits": "Detailed explanation of relevance (2-3 sentences)",
-      "application": "How to apply this Scripture practically"
-    }},
-    {{
-      "reference": "Second Scripture reference",
-      "text": "Full verse text",
-      "why_it_fits": "Detailed explanation",
-      "application": "Practical application"
-    }}
-  ],
-  "practical_steps": [
-    "Specific, actionable step 1",
-    "Specific, actionable step 2", 
-    "Specific, actionable step 3"
-  ],
-  "prayer_starter": "A heartfelt prayer paragraph (3-4 sentences)",
-  "encouragement": "Personalized encouragement message (2-3 sentences)",
-  "growth_areas": ["Area 1 for growth", "Area 2 for growth"],
-  "scriptural_promise": "A specific Bible promise that applies"
-}}
-
-Guidelines:
-1. Be psychologically astute and spiritually deep
-2. Identify both surface and underlying themes
-3. Provide SPECIFIC Bible passages with full context
-4. Make practical steps CONCRETE and doable
-5. Prayer should be authentic and heartfelt
-6. Insight should be transformative, not just observational
-7. Connect emotions to spiritual truths"""
+        # Initialize DeepSeek client (retries are handled here, within the deadline)
+        phase = time.perf_counter()
+        client = _get_client(api_key, base_url, deadline.seconds)
+        timings["client"] = _elapsed_ms(phase)
+        
+        # Keep the prompt within budget; very long pastes are summarized in parallel first
+        phase = time.perf_counter()
+        plan = plan_prompt(journal_text)
+        if plan["chunks"]:
+            entry_text = merge_chunk_summaries(_summarize_chunks(client, plan["chunks"], usage, deadline, hedge))
+        else:
+            entry_text = plan["text"]
+        
+        prompt = build_analysis_prompt(entry_text, condensed=bool(plan["chunks"]))
+        timings["prompt"] = _elapsed_ms(phase)
         
         # Call DeepSeek with more tokens for deeper analysis
-        response = client.chat.completions.create(
+        phase = time.perf_counter()
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        usage["sent_tokens"] += _estimate_message_tokens(messages)
+        response = _chat_completion(
+            client, deadline, hedge,
             model="deepseek-chat",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": """You are a wise, experienced spiritual director with 30 years of counseling experience. 
-                    You combine psychological insight with deep biblical wisdom. You notice subtle spiritual patterns 
-                    and provide transformative, practical guidance. Your responses are compassionate yet challenging, 
-                    always pointing toward spiritual growth and deeper relationship with God."""
-                },
-                {"role": "user", "content": prompt}
-            ],
+            messages=messages,
             temperature=0.8,  # Slightly higher for more creative insights
             max_tokens=1200,  # More tokens for deeper analysis
             response_format={"type": "json_object"}
         )
+        timings["request"] = _elapsed_ms(phase)
+        _deepseek_breaker.record_success()
+        _add_usage(usage, response)
         
         # Parse and enhance the response
+        phase = time.perf_counter()
         result_text = response.choices[0].message.content
         result = json.loads(result_text)
+        timings["parse"] = _elapsed_ms(phase)
         
         # Add metadata and enhance
+        phase = time.perf_counter()
         result = enhance_analysis(result, journal_text)
+        timings["enhance"] = _elapsed_ms(phase)
+        result["analysis_metrics"] = _build_analysis_metrics(started, usage, plan, timings)
+        _publish_analysis_metrics(result["analysis_metrics"])
         
         return result
         
     except json.JSONDecodeError as e:
-        return get_rich_fallback_response(f"JSON error: {str(e)[:50]}")
+        return _fallback("json_error", f"JSON error: {str(e)[:50]}")
     except Exception as e:
-        return get_rich_fallback_response(f"API error: {str(e)[:50]}")
+        # Only timeouts, connection errors, 429s and 5xx count against the provider; a 4xx
+        # is still an answer. Anything else (a bug on our side) leaves the circuit as it was
+        if _is_transient(e):
+            _deepseek_breaker.record_failure()
+        elif _provider_answered(e):
+            _deepseek_breaker.record_success()
+        else:
+            _deepseek_breaker.release()
+        return _fallback("api_error", f"API error: {str(e)[:50]}", error=type(e).__name__)
+
+def _get_client(api_key, base_url, timeout):
+    """Reuse one OpenAI client per endpoint so connections stay warm."""
+    key = (api_key, base_url, timeout)
+    client = _clients.get(key)
+    if client is not None:
+        get_metrics().incr("analysis.client_cache", result="hit")
+        return client
+    
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # openai is only imported once an analysis actually needs a client
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+            _clients[key] = client
+    get_metrics().incr("analysis.client_cache", result="miss")
+    return client
+
+def _fallback(reason, message, **labels):
+    """Count why an analysis fell back, then build the fallback response."""
+    get_metrics().incr("analysis.fallback", reason=reason, **labels)
+    return get_rich_fallback_response(message)
+
+def _publish_analysis_metrics(analysis_metrics):
+    """Send one successful analysis' timings and token usage to the metrics sink."""
+    metrics = get_metrics()
+    strategy = analysis_metrics["strategy"]
+    metrics.incr("analysis.success", strategy=strategy)
+    metrics.observe("analysis.latency_ms", analysis_metrics["latency_ms"], strategy=strategy)
+    for phase, elapsed in analysis_metrics["timings_ms"].items():
+        metrics.observe(f"analysis.{phase}_ms", elapsed)
+    metrics.observe("analysis.prompt_tokens", analysis_metrics["prompt_tokens"])
+    metrics.observe("analysis.completion_tokens", analysis_metrics["completion_tokens"])
+    metrics.incr("analysis.requests", analysis_metrics["requests"])
+    metrics.incr("analysis.tokens", analysis_metrics["prompt_tokens"], kind="prompt")
+    metrics.incr("analysis.tokens", analysis_metrics["completion_tokens"], kind="completion")
+
+def _chat_completion(client, deadline, hedge, **request):
+    """One chat completion with jittered retries (and optional hedging) within the deadline."""
+    def attempt(timeout):
+        started = time.perf_counter()
+        hedge_after = _request_latencies.percentile(95) if hedge else None
+        if hedge_after and hedge_after < timeout:
+            response = hedged_call(
+                lambda t: client.chat.completions.create(timeout=t, **request),
+                timeout, hedge_after, _hedge_executor
+            )
+        else:
+            response = client.chat.completions.create(timeout=timeout, **request)
+        _request_latencies.add(time.perf_counter() - started)
+        return response
+    
+    def count_retry(error):
+        get_metrics().incr("analysis.retries", error=type(error).__name__)
+    
+    return retry_call(attempt, deadline, _is_transient, retries=MAX_RETRIES, on_retry=count_retry)
+
+def _is_transient(error):
+    """Errors worth retrying: timeouts, dropped connections, rate limits and 5xx."""
+    if isinstance(error, DeadlineExceeded):
+        return True
+    openai = sys.modules.get("openai")
+    if openai and isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    return getattr(error, "status_code", None) in (408, 409)
+
+def _provider_answered(error):
+    """True for an error response from the API (4xx), as opposed to no response at all."""
+    openai = sys.modules.get("openai")
+    return bool(openai) and isinstance(error, openai.APIStatusError)
+
+def get_setting(name, default=None):
+    """Read a setting from Streamlit Secrets, falling back to environment variables."""
+    # Only consult Streamlit Secrets inside the app; scripts and benchmarks never import streamlit
+    st = sys.modules.get("streamlit")
+    try:
+        value = st.secrets.get(name) if st else None
+    except Exception:
+        # No secrets.toml (benchmarks, scripts, local runs)
+        value = None
+    return value or os.getenv(name, default)
+
+def _elapsed_ms(started):
+    """Milliseconds since a perf_counter() reading."""
+    return round((time.perf_counter() - started) * 1000, 3)
+
+def _summarize_chunks(client, chunks, usage, deadline, hedge=False):
+    """Summarize chunks of a long entry in parallel (map step)."""
+    def summarize(indexed_chunk):
+        index, chunk = indexed_chunk
+        messages = [
+            {"role": "system", "content": CHUNK_SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": build_chunk_prompt(chunk, index, len(chunks))}
+        ]
+        response = _chat_completion(
+            client, deadline, hedge,
+            model="deepseek-chat",
+            messages=messages,
+            temperature=0.3,
+            max_tokens=CHUNK_SUMMARY_TOKENS
+        )
+        return response, _estimate_message_tokens(messages)
+    
+    with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_PARALLEL_REQUESTS)) as executor:
+        results = list(executor.map(summarize, enumerate(chunks, 1)))
+    
+    summaries = []
+    for response, sent_tokens in results:
+        _add_usage(usage, response)
+        usage["sent_tokens"] += sent_tokens
+        summaries.append(response.choices[0].message.content or "")
+    return summaries
+
+def _estimate_message_tokens(messages):
+    """Estimated input tokens of a chat request, as actually sent."""
+    return sum(estimate_tokens(message["content"]) for message in messages)
+
+def _add_usage(usage, response):
+    """Accumulate token usage reported by the API."""
+    usage["requests"] += 1
+    reported = getattr(response, "usage", None)
+    if reported:
+        usage["prompt_tokens"] += getattr(reported, "prompt_tokens", 0) or 0
+        usage["completion_tokens"] += getattr(reported, "completion_tokens", 0) or 0
+
+def _build_analysis_metrics(started, usage, plan, timings):
+    """Latency and token usage for one analysis request."""
+    return {
+        "latency_ms": round((time.perf_counter() - started) * 1000),
+        "timings_ms": timings,
+        "strategy": "map_reduce" if plan["chunks"] else "single",
+        "chunks": len(plan["chunks"]),
+        "requests": usage["requests"],
+        "estimated_input_tokens": plan["original_tokens"],
+        # The provider's count of what was sent (summary requests included), else our estimate of it
+        "sent_input_tokens": usage["prompt_tokens"] or usage["sent_tokens"],
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+        "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"]
+    }
+
+# Fields every analysis result carries (deep-copied into results, never shared)
+_DEFAULT_STRUCTURE = MappingProxyType({
+    "analysis_summary": "A spiritual journey unfolding",
+    "primary_themes": ["Reflection", "Growth"],
+    "emotional_state": ["Contemplative"],
+    "core_question": "What is God inviting you into?",
+    "key_insight": "Your openness creates space for transformation.",
+    "bible_passages": [
+        {
+            "reference": "Philippians 1:6",
+            "text": "Being confident of this, that he who began a good work in you will carry it on to completion until the day of Christ Jesus.",
+            "why_it_fits": "God is continually at work in your spiritual journey.",
+            "application": "Trust the process of your growth."
+        }
+    ],
+    "practical_steps": [
+        "Reflect on this analysis for 5 minutes",
+        "Choose one step to implement this week",
+        "Share an insight with someone"
+    ],
+    "prayer_starter": "God, meet me in this reflection and guide my steps forward.",
+    "encouragement": "Your spiritual attention is bearing fruit.",
+    "growth_areas": ["Self-awareness", "Practical application"],
+    "scriptural_promise": "Jeremiah 29:13 - You will seek me and find me when you seek me with all your heart."
+})
+
+# Reflection questions and weekly practices by theme
+_THEME_QUESTIONS = MappingProxyType({
+    "Faith": (
+        "What is God asking you to trust Him with right now?",
+        "Where have you seen evidence of God's faithfulness recently?"
+    ),
+    "Hope": (
+        "What future are you hoping for? How does God fit into that?",
+        "What anchors your hope when circumstances are difficult?"
+    ),
+    "Love": (
+        "How are you experiencing God's love in this season?",
+        "Where is God inviting you to love more freely?"
+    ),
+    "Peace": (
+        "What disturbs your peace, and what restores it?",
+        "How can you create space for God's peace daily?"
+    ),
+    "Gratitude": (
+        "What hidden blessings can you thank God for today?",
+        "How does gratitude change your perspective?"
+    )
+})
+
+_GENERAL_QUESTIONS = (
+    "What is the most important thing God is saying to you through this?",
+    "How does this connect to your broader spiritual journey?",
+    "What one action would most honor God in this situation?"
+)
+
+_WEEKLY_PRACTICES = MappingProxyType({
+    "Faith": "Practice releasing one worry to God each day this week.",
+    "Hope": "Write down three hopes and pray over them each morning.",
+    "Love": "Perform one intentional act of kindness daily.",
+    "Peace": "Spend 5 minutes in silence with God each day.",
+    "Gratitude": "Keep a daily gratitude journal with three entries.",
+    "Forgiveness": "Pray for someone who has hurt you each day.",
+    "Patience": "Practice waiting gracefully in one situation daily."
+})
 
 def enhance_analysis(result, journal_text):
     """Add additional insights and structure to the analysis."""
@@ -144,107 +388,71 @@ def enhance_analysis(result, journal_text):
     result["weekly_practice"] = generate_weekly_practice(result.get("primary_themes", []))
     
     # Ensure all fields exist
-    default_structure = {
-        "analysis_summary": "A spiritual journey unfolding",
-        "primary_themes": ["Reflection", "Growth"],
-        "emotional_state": ["Contemplative"],
-        "core_question": "What is God inviting you into?",
-        "key_insight": "Your openness creates space for transformation.",
-        "bible_passages": [
-            {
-                "reference": "Philippians 1:6",
-                "text": "Being confident of this, that he who began a good work in you will carry it on to completion until the day of Christ Jesus.",
-                "why_it_fits": "God is continually at work in your spiritual journey.",
-                "application": "Trust the process of your growth."
-            }
-        ],
-        "practical_steps": [
-            "Reflect on this analysis for 5 minutes",
-            "Choose one step to implement this week",
-            "Share an insight with someone"
-        ],
-        "prayer_starter": "God, meet me in this reflection and guide my steps forward.",
-        "encouragement": "Your spiritual attention is bearing fruit.",
-        "growth_areas": ["Self-awareness", "Practical application"],
-        "scriptural_promise": "Jeremiah 29:13 - You will seek me and find me when you seek me with all your heart."
-    }
-    
-    for key, default in default_structure.items():
+    for key, default in _DEFAULT_STRUCTURE.items():
         if key not in result:
-            result[key] = default
+            result[key] = copy.deepcopy(default)
     
     return result
 
+def score_themes(text):
+    """Score spiritual themes in one pass over the text.
+
+    Returns {theme: {"score": hits, "keywords": [...], "positions": [(start, end), ...]}}
+    ordered by score, highest first.
+    """
+    scores = {}
+    for match in _THEME_PATTERN.finditer(text):
+        keyword = match.group(1).lower()
+        theme = _KEYWORD_THEMES[keyword]
+        if theme not in scores:
+            scores[theme] = {"score": 0, "keywords": [], "positions": []}
+        hit = scores[theme]
+        hit["score"] += 1
+        hit["positions"].append(match.span())
+        if keyword not in hit["keywords"]:
+            hit["keywords"].append(keyword)
+    
+    # Highest score first, ties keep the SPIRITUAL_THEMES order
+    ranked = sorted(scores, key=lambda theme: (-scores[theme]["score"], _THEME_ORDER[theme]))
+    return {theme: scores[theme] for theme in ranked}
+
 def detect_themes(text):
     """Detect spiritual themes from journal text."""
-    text_lower = text.lower()
-    detected = []
-    
-    for theme, keywords in SPIRITUAL_THEMES.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                if theme not in detected:
-                    detected.append(theme)
-                break
-    
-    return detected[:5]  # Return top 5 themes
+    return list(score_themes(text))[:5]  # Return top 5 themes
+
+def backfill_detected_themes(entries):
+    """Recompute detected_themes for archived entries. Returns how many changed."""
+    updated = 0
+    for entry in entries:
+        analysis = entry.get("analysis")
+        if not isinstance(analysis, dict):
+            continue
+        themes = detect_themes(entry.get("journal_text", ""))
+        if analysis.get("detected_themes", []) != themes:
+            if themes:
+                analysis["detected_themes"] = themes
+            else:
+                analysis.pop("detected_themes", None)
+            updated += 1
+    return updated
 
 def generate_reflection_questions(themes):
     """Generate deep reflection questions based on themes."""
     questions = []
     
-    theme_questions = {
-        "Faith": [
-            "What is God asking you to trust Him with right now?",
-            "Where have you seen evidence of God's faithfulness recently?"
-        ],
-        "Hope": [
-            "What future are you hoping for? How does God fit into that?",
-            "What anchors your hope when circumstances are difficult?"
-        ],
-        "Love": [
-            "How are you experiencing God's love in this season?",
-            "Where is God inviting you to love more freely?"
-        ],
-        "Peace": [
-            "What disturbs your peace, and what restores it?",
-            "How can you create space for God's peace daily?"
-        ],
-        "Gratitude": [
-            "What hidden blessings can you thank God for today?",
-            "How does gratitude change your perspective?"
-        ]
-    }
-    
     for theme in themes:
-        if theme in theme_questions:
-            questions.extend(theme_questions[theme])
+        if theme in _THEME_QUESTIONS:
+            questions.extend(_THEME_QUESTIONS[theme])
     
     # Add general reflection questions
-    general_questions = [
-        "What is the most important thing God is saying to you through this?",
-        "How does this connect to your broader spiritual journey?",
-        "What one action would most honor God in this situation?"
-    ]
-    
-    questions.extend(general_questions)
+    questions.extend(_GENERAL_QUESTIONS)
     return questions[:5]  # Return top 5 questions
 
 def generate_weekly_practice(themes):
     """Suggest a weekly spiritual practice based on themes."""
-    practices = {
-        "Faith": "Practice releasing one worry to God each day this week.",
-        "Hope": "Write down three hopes and pray over them each morning.",
-        "Love": "Perform one intentional act of kindness daily.",
-        "Peace": "Spend 5 minutes in silence with God each day.",
-        "Gratitude": "Keep a daily gratitude journal with three entries.",
-        "Forgiveness": "Pray for someone who has hurt you each day.",
-        "Patience": "Practice waiting gracefully in one situation daily."
-    }
-    
     for theme in themes:
-        if theme in practices:
-            return practices[theme]
+        if theme in _WEEKLY_PRACTICES:
+            return _WEEKLY_PRACTICES[theme]
     
     return "Spend 10 minutes daily reflecting on God's presence in your life."
 
@@ -289,48 +497,65 @@ def get_rich_fallback_response(error_msg=""):
         "is_fallback": True
     }
 
+# Hand-picked suggestions, shown before anything from the theme index
+_CURATED_VERSES = MappingProxyType({
+    "Faith": (
+        {"reference": "Hebrews 11:1", "theme": "Faith", "reason": "Defines faith as confidence in what we hope for"},
+        {"reference": "Mark 9:24", "theme": "Faith", "reason": "The honest prayer: 'I do believe; help me overcome my unbelief!'"}
+    ),
+    "Hope": (
+        {"reference": "Romans 15:13", "theme": "Hope", "reason": "God as the source of hope that overflows"},
+        {"reference": "Jeremiah 29:11", "theme": "Hope", "reason": "God's plans for welfare and future"}
+    ),
+    "Love": (
+        {"reference": "1 Corinthians 13:4-7", "theme": "Love", "reason": "The definitive description of love's character"},
+        {"reference": "1 John 4:18", "theme": "Love", "reason": "Perfect love drives out fear"}
+    ),
+    "Peace": (
+        {"reference": "Philippians 4:6-7", "theme": "Peace", "reason": "The peace that guards hearts and minds"},
+        {"reference": "John 14:27", "theme": "Peace", "reason": "Jesus' gift of peace, different from the world's"}
+    ),
+    "Anxiety": (
+        {"reference": "1 Peter 5:7", "theme": "Anxiety", "reason": "Cast all your anxiety on God"},
+        {"reference": "Matthew 6:25-34", "theme": "Anxiety", "reason": "Jesus' teaching on worry and trust"}
+    ),
+    "Guidance": (
+        {"reference": "Proverbs 3:5-6", "theme": "Guidance", "reason": "Trust and acknowledgment leading to straight paths"},
+        {"reference": "Psalm 32:8", "theme": "Guidance", "reason": "God's promise to instruct and teach"}
+    )
+})
+
+# When no theme produces anything
+_GENERAL_VERSES = (
+    {"reference": "Psalm 23:1-3", "theme": "Provision", "reason": "God's shepherding care through all of life"},
+    {"reference": "Romans 8:38-39", "theme": "Security", "reason": "Nothing can separate us from God's love"},
+    {"reference": "2 Corinthians 12:9", "theme": "Grace", "reason": "God's strength perfected in weakness"},
+    {"reference": "Philippians 4:13", "theme": "Strength", "reason": "Christ as the source of strength for all things"},
+    {"reference": "Isaiah 41:10", "theme": "Courage", "reason": "God's promise of presence and strengthening"}
+)
+
 def get_bible_verse_suggestions(themes):
     """Get substantial Bible verse suggestions with explanations."""
-    theme_verses = {
-        "Faith": [
-            {"reference": "Hebrews 11:1", "theme": "Faith", "reason": "Defines faith as confidence in what we hope for"},
-            {"reference": "Mark 9:24", "theme": "Faith", "reason": "The honest prayer: 'I do believe; help me overcome my unbelief!'"}
-        ],
-        "Hope": [
-            {"reference": "Romans 15:13", "theme": "Hope", "reason": "God as the source of hope that overflows"},
-            {"reference": "Jeremiah 29:11", "theme": "Hope", "reason": "God's plans for welfare and future"}
-        ],
-        "Love": [
-            {"reference": "1 Corinthians 13:4-7", "theme": "Love", "reason": "The definitive description of love's character"},
-            {"reference": "1 John 4:18", "theme": "Love", "reason": "Perfect love drives out fear"}
-        ],
-        "Peace": [
-            {"reference": "Philippians 4:6-7", "theme": "Peace", "reason": "The peace that guards hearts and minds"},
-            {"reference": "John 14:27", "theme": "Peace", "reason": "Jesus' gift of peace, different from the world's"}
-        ],
-        "Anxiety": [
-            {"reference": "1 Peter 5:7", "theme": "Anxiety", "reason": "Cast all your anxiety on God"},
-            {"reference": "Matthew 6:25-34", "theme": "Anxiety", "reason": "Jesus' teaching on worry and trust"}
-        ],
-        "Guidance": [
-            {"reference": "Proverbs 3:5-6", "theme": "Guidance", "reason": "Trust and acknowledgment leading to straight paths"},
-            {"reference": "Psalm 32:8", "theme": "Guidance", "reason": "God's promise to instruct and teach"}
-        ]
-    }
-    
     results = []
+    seen = set()
+    
+    def add(suggestion):
+        key = reference_key(suggestion["reference"])
+        if key not in seen:
+            seen.add(key)
+            results.append(dict(suggestion))
+    
+    # Curated verses first, then the precomputed theme index for any theme name
     for theme in themes:
-        if theme in theme_verses:
-            results.extend(theme_verses[theme])
+        for suggestion in _CURATED_VERSES.get(theme, ()):
+            add(suggestion)
+    for theme in themes:
+        for matched, reference in recommend_verses(theme, k=3):
+            add({"reference": reference, "theme": theme, "reason": f"A passage on {matched.lower()} from across Scripture"})
     
     # If no themes matched, provide general substantial verses
     if not results:
-        results = [
-            {"reference": "Psalm 23:1-3", "theme": "Provision", "reason": "God's shepherding care through all of life"},
-            {"reference": "Romans 8:38-39", "theme": "Security", "reason": "Nothing can separate us from God's love"},
-            {"reference": "2 Corinthians 12:9", "theme": "Grace", "reason": "God's strength perfected in weakness"},
-            {"reference": "Philippians 4:13", "theme": "Strength", "reason": "Christ as the source of strength for all things"},
-            {"reference": "Isaiah 41:10", "theme": "Courage", "reason": "God's promise of presence and strengthening"}
-        ]
+        for suggestion in _GENERAL_VERSES:
+            add(suggestion)
     
-    return results[:5]  # Return top 5
\ No newline at end of file
+    return results[:5]  # Return top 5
@@ -11,11 +11,13 @@ import datetime
 import os
 import sys
 from collections import Counter
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import random
-import hashlib
+import secrets
+import profiler
+from user_store import open_user_store
+
+# Opt-in render profiler: ?profile=1 or MYGROW_PROFILE=1
+_query_params = getattr(st, "query_params", None)
+profiler.start(_query_params is not None and _query_params.get("profile") == "1")
 
 # ============================================
 # ENHANCED AUTHENTICATION WITH FALLBACK OPTIONS
@@ -30,32 +32,15 @@ if 'auth_initialized' not in st.session_state:
 
 # Helper function for email/password auth
 def authenticate_email_password(email, password):
-    """Simple email/password authentication as fallback"""
-    # Demo users (in production, use a database)
-    demo_users = {
-        "user@example.com": {
-            "password_hash": hashlib.sha256("password123".encode()).hexdigest(),
-            "name": "John Doe",
-            "user_id": "user_001"
-        },
-        "test@test.com": {
-            "password_hash": hashlib.sha256("test123".encode()).hexdigest(),
-            "name": "Test User",
-            "user_id": "user_002"
-        }
-    }
-    
-    if email in demo_users:
-        user_data = demo_users[email]
-        input_hash = hashlib.sha256(password.encode()).hexdigest()
-        
-        if user_data["password_hash"] == input_hash:
-            return {
-                "email": email,
-                "name": user_data["name"],
-                "sub": user_data["user_id"]
-            }
-    return None
+    """Check email/password against the registered accounts (demo accounts included)."""
+    return open_user_store().authenticate(email, password)
+
+def start_email_session(user_info):
+    """Mark this browser session signed in, with a server-side session token."""
+    st.session_state.is_authenticated = True
+    st.session_state.user_info = user_info
+    st.session_state.auth_method = 'email'
+    st.session_state.session_token = open_user_store().create_session(user_info)
 
 def show_auth_page():
     """Show authentication page with multiple options"""
@@ -176,9 +161,7 @@ def show_auth_page():
                 if email and password:
                     user_info = authenticate_email_password(email, password)
                     if user_info:
-                        st.session_state.is_authenticated = True
-                        st.session_state.user_info = user_info
-                        st.session_state.auth_method = 'email'
+                        start_email_session(user_info)
                         st.success("Login successful! Redirecting...")
                         st.rerun()
                     else:
@@ -197,17 +180,14 @@ def show_auth_page():
             
             if st.form_submit_button("Create Account", type="primary"):
                 if password == confirm_password and len(password) >= 6:
-                    # In production, save to database
-                    user_id = f"user_{hashlib.md5(email.encode()).hexdigest()[:8]}"
-                    st.session_state.is_authenticated = True
-                    st.session_state.user_info = {
-                        'email': email,
-                        'name': name,
-                        'sub': user_id
-                    }
-                    st.session_state.auth_method = 'email'
-                    st.success("Account created! Redirecting...")
-                    st.rerun()
+                    try:
+                        user_info = open_user_store().register(email, password, name)
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        start_email_session(user_info)
+                        st.success("Account created! Redirecting...")
+                        st.rerun()
                 else:
                     st.error("Passwords don't match or are too short")
     
@@ -219,11 +199,16 @@ def show_auth_page():
         """)
         
         if st.button("Start with Demo Account", type="primary", icon="🚀", use_container_width=True):
+            # One demo journal per browser session, kept through sign-out, so repeated
+            # clicks don't leave a new folder and cached archive behind each time;
+            # the random part is long enough that two visitors never share one
+            if 'demo_user_id' not in st.session_state:
+                st.session_state.demo_user_id = 'demo_user_' + secrets.token_hex(8)
             st.session_state.is_authenticated = True
             st.session_state.user_info = {
                 'email': 'demo@mygrow.app',
                 'name': 'Demo User',
-                'sub': 'demo_user_' + str(random.randint(1000, 9999))
+                'sub': st.session_state.demo_user_id
             }
             st.session_state.auth_method = 'demo'
             st.success("Welcome! Using demo mode.")
@@ -284,6 +269,17 @@ if not st.session_state.is_authenticated and os.getenv('LOCAL_DEVELOPMENT'):
     st.session_state.auth_method = 'local'
     print("Running in local development mode")
 
+# Email sign-ins carry a session token: a rerun checks it against the store's
+# cache (no password check), and a revoked or expired token signs the user out
+if st.session_state.is_authenticated and st.session_state.get('session_token'):
+    verified = open_user_store().verify_session(st.session_state.session_token)
+    if verified:
+        st.session_state.user_info = verified
+    else:
+        st.session_state.is_authenticated = False
+        st.session_state.user_info = {}
+        st.session_state.session_token = None
+
 # Option 3: Show auth page if still not authenticated
 if not st.session_state.is_authenticated:
     show_auth_page()
@@ -297,6 +293,7 @@ user_info = st.session_state.user_info
 user_id = user_info.get("sub", "unknown")
 user_email = user_info.get("email", "")
 user_name = user_info.get("name", user_email.split('@')[0] if '@' in user_email else "User")
+profiler.mark("auth check")
 
 # Display auth method in sidebar
 auth_method_display = {
@@ -312,8 +309,8 @@ auth_method_display = {
 
 # Now try to import your AI modules (rest of your original code continues...)
 try:
-    from ai_analyzer import analyze_spiritual_journal, get_bible_verse_suggestions
-    from bible_integration import get_bible_verse, get_book_list, get_chapter_list, get_verse_list
+    from ai_analyzer import analyze_spiritual_journal, get_bible_verse_suggestions, detect_themes
+    from bible_integration import get_bible_verse, get_book_list, get_chapter_list, get_verse_list, prefetch_verses, search_scripture, get_bible_passage
     ai_ready = True
     bible_ready = True
     
@@ -352,9 +349,21 @@ except ImportError as e:
     def get_bible_verse_suggestions(themes):
         return [{"reference": "John 3:16", "theme": "Love"}]
     
+    def detect_themes(text):
+        return []
+    
     def get_bible_verse(reference, version="WEB"):
         return "Bible module not loaded"
     
+    def prefetch_verses(passages, version="WEB"):
+        return None
+    
+    def search_scripture(query, version="WEB", k=10):
+        return None
+    
+    def get_bible_passage(reference, version="WEB"):
+        return None
+    
     def get_book_list():
         return ["Genesis", "Psalms", "Matthew", "John"]
     
@@ -392,472 +401,8 @@ st.markdown(f"""
 # ENHANCED JOURNAL ARCHIVE CLASS WITH MONTH FILTERING
 # ============================================
 
-class JournalArchive:
-    def __init__(self, user_id):  # MODIFIED: Accept user_id parameter
-        # MODIFIED: Create user-specific data directory
-        self.user_id = user_id
-        self.data_dir = f"user_data/{user_id}"
-        os.makedirs(self.data_dir, exist_ok=True)
-        
-        # MODIFIED: All file paths are now inside the user's folder
-        self.entries_file = os.path.join(self.data_dir, "journal_entries.json")
-        self.patterns_file = os.path.join(self.data_dir, "user_patterns.json")
-        self.timeline_file = os.path.join(self.data_dir, "growth_timeline.json")
-        
-        # Initialize files if they don't exist
-        self._init_files()
-    
-    def _init_files(self):
-        """Initialize empty data files."""
-        defaults = {
-            self.entries_file: [],
-            self.patterns_file: {},
-            self.timeline_file: []
-        }
-        
-        for file, default in defaults.items():
-            if not os.path.exists(file):
-                with open(file, 'w', encoding='utf-8') as f:
-                    json.dump(default, f, ensure_ascii=False, indent=2)
-    
-    def save_entry(self, journal_text, analysis_result):
-        """Save a complete journal entry with analysis."""
-        entry_id = str(datetime.datetime.now().timestamp())
-        
-        entry = {
-            "id": entry_id,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "date": datetime.datetime.now().strftime("%Y-%m-%d"),
-            "journal_text": journal_text,
-            "analysis": analysis_result,
-            "themes": analysis_result.get("primary_themes", []),
-            "emotions": analysis_result.get("emotional_state", []),
-            "bible_passages": analysis_result.get("bible_passages", []),
-            "practical_steps": analysis_result.get("practical_steps", []),
-            "word_count": len(journal_text.split())
-        }
-        
-        # Load existing entries
-        try:
-            with open(self.entries_file, 'r', encoding='utf-8') as f:
-                entries = json.load(f)
-        except:
-            entries = []
-        
-        # Add new entry
-        entries.append(entry)
-        
-        # Save back
-        with open(self.entries_file, 'w', encoding='utf-8') as f:
-            json.dump(entries, f, ensure_ascii=False, indent=2)
-        
-        # Update patterns and timeline
-        self._update_patterns(entries)
-        self._update_timeline(entry)
-        
-        return entry
-    
-    def _update_patterns(self, entries):
-        """Analyze patterns across all entries."""
-        if not entries:
-            return
-        
-        # Collect data
-        all_themes = []
-        all_emotions = []
-        all_verses = []
-        
-        for entry in entries:
-            all_themes.extend(entry.get("themes", []))
-            all_emotions.extend(entry.get("emotions", []))
-            for passage in entry.get("bible_passages", []):
-                all_verses.append(passage.get("reference", ""))
-        
-        # Calculate frequencies
-        theme_counter = Counter(all_themes)
-        emotion_counter = Counter(all_emotions)
-        verse_counter = Counter(all_verses)
-        
-        # Writing patterns
-        word_counts = [e.get("word_count", 0) for e in entries]
-        avg_word_count = sum(word_counts) / len(word_counts) if word_counts else 0
-        
-        # Build patterns object
-        patterns = {
-            "last_updated": datetime.datetime.now().isoformat(),
-            "total_entries": len(entries),
-            "theme_patterns": {
-                "most_common": dict(theme_counter.most_common(10)),  # Changed from 5 to 10
-                "all_frequencies": dict(theme_counter)
-            },
-            "emotion_patterns": {
-                "most_common": dict(emotion_counter.most_common(5)),
-                "trends": self._detect_emotion_trends(entries)
-            },
-            "bible_patterns": {
-                "most_referenced": dict(verse_counter.most_common(5)),
-                "favorite_books": self._analyze_bible_books(all_verses)
-            },
-            "writing_patterns": {
-                "average_length": avg_word_count,
-                "frequency_days": self._calculate_frequency(entries)
-            },
-            "growth_indicators": self._calculate_growth_indicators(entries)
-        }
-        
-        # Save patterns
-        with open(self.patterns_file, 'w', encoding='utf-8') as f:
-            json.dump(patterns, f, ensure_ascii=False, indent=2)
-    
-    def _detect_emotion_trends(self, entries):
-        """Detect emotion trends over time."""
-        if len(entries) < 2:
-            return {}
-        
-        # Group by week
-        weekly_emotions = {}
-        for entry in entries:
-            date = datetime.datetime.fromisoformat(entry["timestamp"])
-            week_key = f"{date.year}-W{date.isocalendar()[1]:02d}"
-            
-            if week_key not in weekly_emotions:
-                weekly_emotions[week_key] = []
-            
-            weekly_emotions[week_key].extend(entry.get("emotions", []))
-        
-        # Calculate most common per week
-        trends = {}
-        for week, emotions in weekly_emotions.items():
-            if emotions:
-                counter = Counter(emotions)
-                trends[week] = counter.most_common(2)
-        
-        return trends
-    
-    def _analyze_bible_books(self, verses):
-        """Analyze which Bible books are most referenced."""
-        books = []
-        for verse in verses:
-            if " " in verse:
-                book = verse.split(" ")[0]
-                books.append(book)
-        
-        return dict(Counter(books).most_common(5)) if books else {}
-    
-    def _calculate_frequency(self, entries):
-        """Calculate journaling frequency."""
-        if len(entries) < 2:
-            return "Just starting"
-        
-        dates = sorted([e["date"] for e in entries])
-        first_date = datetime.datetime.strptime(dates[0], "%Y-%m-%d")
-        last_date = datetime.datetime.strptime(dates[-1], "%Y-%m-%d")
-        days_diff = (last_date - first_date).days + 1
-        
-        freq = len(entries) / days_diff
-        
-        if freq >= 0.7:
-            return "Daily writer"
-        elif freq >= 0.3:
-            return "Regular writer"
-        elif freq >= 0.14:
-            return "Weekly writer"
-        else:
-            return "Occasional writer"
-    
-    def _calculate_growth_indicators(self, entries):
-        """Calculate growth indicators."""
-        if len(entries) < 3:
-            return {"stage": "Beginning", "indicators": []}
-        
-        recent = entries[-3:]  # Last 3 entries
-        older = entries[:3]    # First 3 entries
-        
-        # Compare themes
-        recent_themes = set()
-        older_themes = set()
-        
-        for entry in recent:
-            recent_themes.update(entry.get("themes", []))
-        for entry in older:
-            older_themes.update(entry.get("themes", []))
-        
-        indicators = []
-        
-        if len(recent_themes) > len(older_themes):
-            indicators.append("Exploring more spiritual themes")
-        
-        # Check for action steps
-        action_words = ["completed", "done", "finished", "accomplished", "achieved"]
-        recent_text = " ".join([e["journal_text"].lower() for e in recent])
-        if any(word in recent_text for word in action_words):
-            indicators.append("Taking practical steps forward")
-        
-        # Check for gratitude
-        gratitude_words = ["thank", "grateful", "appreciate", "blessed", "thankful"]
-        recent_gratitude = sum(1 for word in gratitude_words if word in recent_text)
-        older_text = " ".join([e["journal_text"].lower() for e in older])
-        older_gratitude = sum(1 for word in gratitude_words if word in older_text)
-        
-        if recent_gratitude > older_gratitude:
-            indicators.append("Growing in gratitude")
-        
-        return {
-            "stage": "Growing" if indicators else "Developing",
-            "indicators": indicators,
-            "theme_diversity_increase": len(recent_themes) - len(older_themes)
-        }
-    
-    def _update_timeline(self, new_entry):
-        """Update growth timeline with milestone detection."""
-        with open(self.timeline_file, 'r', encoding='utf-8') as f:
-            timeline = json.load(f)
-        
-        # Detect milestones
-        milestones = self._detect_milestones(new_entry, timeline)
-        
-        for milestone in milestones:
-            timeline.append({
-                "timestamp": new_entry["timestamp"],
-                "type": milestone["type"],
-                "description": milestone["description"],
-                "entry_id": new_entry["id"]
-            })
-        
-        # Keep only last 20 milestones
-        if len(timeline) > 20:
-            timeline = timeline[-20:]
-        
-        with open(self.timeline_file, 'w', encoding='utf-8') as f:
-            json.dump(timeline, f, ensure_ascii=False, indent=2)
-    
-    def _detect_milestones(self, entry, existing_timeline):
-        """Detect growth milestones in new entry."""
-        milestones = []
-        existing_types = [m["type"] for m in existing_timeline]
-        
-        # Longest entry
-        if entry.get("word_count", 0) > 300 and "long_reflection" not in existing_types:
-            milestones.append({
-                "type": "long_reflection",
-                "description": f"Deep reflection ({entry['word_count']} words)"
-            })
-        
-        # New theme
-        entry_themes = set(entry.get("themes", []))
-        if entry_themes and "new_theme" not in existing_types:
-            milestones.append({
-                "type": "new_theme",
-                "description": f"Exploring new theme: {list(entry_themes)[0]}"
-            })
-        
-        # Bible engagement
-        bible_passages = entry.get("bible_passages", [])
-        if len(bible_passages) >= 2 and "scripture_engagement" not in existing_types:
-            milestones.append({
-                "type": "scripture_engagement",
-                "description": "Engaging deeply with Scripture"
-            })
-        
-        # 5th entry milestone
-        entries = self.get_entries()
-        if len(entries) == 5 and "five_entries" not in existing_types:
-            milestones.append({
-                "type": "five_entries",
-                "description": "Completed 5 journal entries - building a habit!"
-            })
-        
-        return milestones
-    
-    def get_entries(self, limit=None):
-        """Get journal entries, optionally limited."""
-        try:
-            with open(self.entries_file, 'r', encoding='utf-8') as f:
-                entries = json.load(f)
-            
-            if limit:
-                return entries[-limit:]
-            return entries
-        except:
-            return []
-    
-    # ============================================
-    # NEW: MONTH FILTERING METHODS - ADDED TO FIX JANUARY 2026 ISSUE
-    # ============================================
-    
-    def get_entries_by_year_month(self, year_month: str):
-        """Get entries for a specific month (format: '2026-01')."""
-        entries = self.get_entries()
-        filtered = []
-        
-        for entry in entries:
-            entry_date = entry.get("date", "")
-            
-            # Parse date - assuming format "YYYY-MM-DD"
-            try:
-                if "-" in entry_date:
-                    parts = entry_date.split("-")
-                    if len(parts) >= 2:
-                        entry_year_month = f"{parts[0]}-{parts[1]}"
-                        if entry_year_month == year_month:
-                            filtered.append(entry)
-            except (ValueError, IndexError):
-                continue
-        
-        return filtered
-    
-    def get_all_months_with_entries(self):
-        """Get list of all months with entries (YYYY-MM format)."""
-        entries = self.get_entries()
-        months_set = set()
-        
-        for entry in entries:
-            entry_date = entry.get("date", "")
-            if "-" in entry_date:
-                parts = entry_date.split("-")
-                if len(parts) >= 2:
-                    months_set.add(f"{parts[0]}-{parts[1]}")
-        
-        # Sort descending (most recent first)
-        return sorted(list(months_set), reverse=True)
-    
-    def get_monthly_summary(self, year_month: str):
-        """Get detailed summary for a specific month."""
-        entries = self.get_entries_by_year_month(year_month)
-        
-        if not entries:
-            return {
-                "month": year_month,
-                "entry_count": 0,
-                "top_themes": {},
-                "top_emotions": {},
-                "average_words": 0,
-                "unique_scriptures": 0
-            }
-        
-        # Collect data
-        all_themes = []
-        all_emotions = []
-        word_counts = []
-        bible_verses = []
-        
-        for entry in entries:
-            all_themes.extend(entry.get("themes", []))
-            all_emotions.extend(entry.get("emotions", []))
-            word_counts.append(entry.get("word_count", 0))
-            for passage in entry.get("bible_passages", []):
-                bible_verses.append(passage.get("reference", ""))
-        
-        # Calculate stats
-        theme_counter = Counter(all_themes)
-        emotion_counter = Counter(all_emotions)
-        
-        return {
-            "month": year_month,
-            "entry_count": len(entries),
-            "top_themes": dict(theme_counter.most_common(5)),  # Show top 5 themes per month
-            "top_emotions": dict(emotion_counter.most_common(3)),
-            "average_words": sum(word_counts) // len(word_counts) if word_counts else 0,
-            "unique_scriptures": len(set(bible_verses)),
-            "first_entry_date": entries[0].get("date"),
-            "last_entry_date": entries[-1].get("date")
-        }
-    
-    def get_monthly_summaries(self):
-        """Get summaries for all months with entries."""
-        months = self.get_all_months_with_entries()
-        summaries = []
-        
-        for month in months:
-            summary = self.get_monthly_summary(month)
-            summaries.append(summary)
-        
-        return summaries
-    
-    def get_patterns(self):
-        """Get analyzed patterns."""
-        try:
-            with open(self.patterns_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {}
-    
-    def get_timeline(self):
-        """Get growth timeline."""
-        try:
-            with open(self.timeline_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
-    
-    def get_summary_insights(self):
-        """Generate summary insights for the user."""
-        patterns = self.get_patterns()
-        entries = self.get_entries()
-        
-        if not entries:
-            return {
-                "total_entries": 0,
-                "insights": ["Welcome to your spiritual journey!"],
-                "next_suggestion": "Write your first reflection to begin tracking your growth."
-            }
-        
-        # Build insights
-        insights = []
-        
-        # Theme insights
-        common_themes = patterns.get("theme_patterns", {}).get("most_common", {})
-        if common_themes:
-            themes_list = list(common_themes.items())
-            if themes_list:
-                top_theme, top_count = themes_list[0]
-                insights.append(f"Your spiritual heart centers on **{top_theme}** (appeared {top_count} times)")
-                
-                # Add secondary theme insight if available
-                if len(themes_list) > 1:
-                    second_theme, second_count = themes_list[1]
-                    insights.append(f"Secondary focus: **{second_theme}** ({second_count} occurrences)")
-        
-        # Growth indicators
-        growth = patterns.get("growth_indicators", {})
-        if growth.get("indicators"):
-            insights.extend([f"✓ {ind}" for ind in growth["indicators"]])
-        
-        # Writing pattern
-        writing = patterns.get("writing_patterns", {})
-        insights.append(f"Writing rhythm: **{writing.get('frequency_days', 'developing')}**")
-        
-        # Bible engagement
-        bible = patterns.get("bible_patterns", {})
-        top_book = list(bible.get("favorite_books", {}).keys())[0] if bible.get("favorite_books") else None
-        if top_book:
-            insights.append(f"Most engaged Scripture: **{top_book}**")
-        
-        return {
-            "total_entries": len(entries),
-            "insights": insights[:4],  # Show up to 4 insights
-            "next_suggestion": self._get_next_suggestion(patterns)
-        }
-    
-    def _get_next_suggestion(self, patterns):
-        """Get personalized suggestion for growth."""
-        total = patterns.get("total_entries", 0)
-        
-        if total < 3:
-            return "Try exploring different spiritual themes in your next reflection."
-        elif total < 10:
-            common_themes = patterns.get("theme_patterns", {}).get("most_common", {})
-            if common_themes and len(common_themes) >= 2:
-                themes = list(common_themes.keys())
-                return f"Consider how **{themes[0]}** and **{themes[1]}** connect in your spiritual journey."
-            return "Reflect on how your understanding has evolved since you started journaling."
-        else:
-            common_themes = patterns.get("theme_patterns", {}).get("most_common", {})
-            if common_themes:
-                theme = list(common_themes.keys())[0]
-                return f"Your deep focus on **{theme}** shows spiritual maturity. What new aspect of this theme could you explore?"
-        
-        return "Your consistent journaling reveals a beautiful spiritual journey. Keep listening to your heart."
+# The archive itself lives in journal_archive.py so it can run without Streamlit
+from journal_archive import JournalArchive
 
 # ============================================
 # ENHANCED GROWTH DASHBOARD WITH 10-THEME PIE CHART
@@ -950,6 +495,8 @@ def create_growth_dashboard(archive):
     
     st.markdown('<hr style="height: 1px; background: linear-gradient(90deg, transparent, #8AB4A1, transparent); margin: 2.5rem 0; border: none;">', unsafe_allow_html=True)
     
+    profiler.mark("dashboard metrics")
+    
     # ===== FIXED: MONTHLY SUMMARY SECTION =====
     st.markdown("""
         <div style='background: white; padding: 2rem; border-radius: 8px; border: 1px solid #E8E6DE; margin-bottom: 2rem;'>
@@ -962,24 +509,6 @@ def create_growth_dashboard(archive):
     # Get all monthly summaries using the new method
     monthly_summaries = archive.get_monthly_summaries()
     
-    # Debug info (optional - can remove after testing)
-    with st.expander("🔍 Debug: See all months", expanded=False):
-        st.write(f"Total entries: {len(entries)}")
-        all_months = archive.get_all_months_with_entries()
-        st.write(f"Months found: {all_months}")
-        
-        # Check specifically for January 2026
-        if "2026-01" in all_months:
-            st.success("✅ January 2026 found in months list!")
-            jan_entries = archive.get_entries_by_year_month("2026-01")
-            st.write(f"January 2026 entries: {len(jan_entries)}")
-            for entry in jan_entries[:3]:
-                st.write(f"  - {entry.get('date')}: {entry.get('journal_text', '')[:50]}...")
-        else:
-            st.warning("❌ January 2026 NOT found in months list")
-        
-        st.write(f"Monthly summaries: {len(monthly_summaries)}")
-    
     if not monthly_summaries:
         st.info("No monthly data available yet")
     else:
@@ -1026,16 +555,13 @@ def create_growth_dashboard(archive):
                         theme_display += f'<span style="background-color: #2D5A27; color: white; padding: 4px 10px; margin: 2px; border-radius: 15px; font-size: 13px; display: inline-block;">{theme} ({count})</span> '
                     
                     st.markdown(theme_display, unsafe_allow_html=True)
-                
-                # Check if this is January 2026
-                if summary["month"] == "2026-01":
-                    st.success(f"✅ Found {summary['entry_count']} entries for January 2026!")
-                    st.balloons()  # Celebrate!
     
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown('<hr style="height: 1px; background: linear-gradient(90deg, transparent, #8AB4A1, transparent); margin: 2.5rem 0; border: none;">', unsafe_allow_html=True)
     
+    profiler.mark("month summaries")
+    
     # ===== ENHANCED SHAPE OF MY HEART PIE CHART (10 THEMES) =====
     st.markdown("""
         <div style='background: white; padding: 2rem; border-radius: 8px; border: 1px solid #E8E6DE; margin-bottom: 2rem;'>
@@ -1078,7 +604,8 @@ def create_growth_dashboard(archive):
             '#6DA3C9', '#4E8EB9', '#C1D4E6', '#E8F4F8'
         ]
         
-        # Create enhanced donut chart
+        # Create enhanced donut chart (plotly is only loaded for the dashboard)
+        import plotly.graph_objects as go
         fig = go.Figure(data=[go.Pie(
             labels=labels,
             values=values,
@@ -1237,6 +764,8 @@ def create_growth_dashboard(archive):
     
     if st.button("📥 Export My Growth Report", use_container_width=True):
         _export_growth_report(archive)
+    
+    profiler.mark("charts")
 
 def _export_growth_report(archive):
     """Export growth report as JSON."""
@@ -1275,18 +804,50 @@ if 'selected_entry' not in st.session_state:
 if 'auto_archive' not in st.session_state:
     st.session_state.auto_archive = True
 
-# Initialize archive with user_id
-archive = JournalArchive(user_id)
+# One archive object per user, shared by that user's sessions and reruns,
+# so its in-memory caches survive reruns (writes invalidate them). Only recently
+# active users are kept, so memory doesn't grow with every visitor ever served.
+MAX_CACHED_ARCHIVES = 200
+ARCHIVE_TTL_SECONDS = 3600
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_ARCHIVES, ttl=ARCHIVE_TTL_SECONDS)
+def get_archive(user_id):
+    return JournalArchive(user_id)
+
+try:
+    archive = get_archive(user_id)
+except ValueError as e:
+    # Journal files in both the old and the new folder layout (see data_layout.py)
+    print(f"⚠️ Archive error: {e}")
+    st.error("Your journal needs attention from the site administrator before it can be opened.")
+    st.stop()
+# Pick up entries saved by other processes (http_api.py workers, scripts): one stat
+# per cached file on each full rerun; fragment reruns skip this and reuse what's loaded
+archive.refresh()
+profiler.mark("archive load")
+
+def show_profile():
+    """Collapsible per-section timings for this rerun (only when profiling)."""
+    report = profiler.report()
+    if report is None:
+        return
+    with st.expander("⏱️ Render Profile", expanded=False):
+        st.caption(f"{report['total_ms']:.1f} ms total • {report['reads']} file reads • "
+                   f"{report['bytes']:,} bytes parsed")
+        st.table([{"Section": name, "ms": round(ms, 2)} for name, ms in report["sections"]])
+
+# Partial reruns: a widget inside a fragment reruns only that function, not the
+# whole script. st.fragment is 1.37+ (experimental_fragment from 1.33); on older
+# versions the functions simply run as part of the full script.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
 
 # ============================================
 # SIDEBAR WITH TRANQUIL DESIGN + LOGOUT BUTTON
 # ============================================
 
-with st.sidebar:
-    # Welcome message with auth status
-    st.sidebar.success(f"Welcome, {user_name}!")
-    st.sidebar.caption(f"Logged in via {auth_method_display}")
-    
+@fragment
+def sidebar_panel():
+    """Navigation, quick stats and journal tools; its widgets rerun only this panel."""
     st.markdown("""
         <div style='background: #F9F7F1; padding: 1.5rem; border-radius: 8px; border: 1px solid #E8E6DE; margin-bottom: 1rem;'>
             <h3 style='color: #2D5A27; margin-top: 0;'>🧭 Navigation</h3>
@@ -1340,14 +901,10 @@ with st.sidebar:
         st.session_state.show_archive = True
         st.session_state.show_dashboard = False
         st.rerun()
-    
-    # Auto-archive toggle
-    st.markdown('<hr style="height: 1px; background: linear-gradient(90deg, transparent, #8AB4A1, transparent); margin: 1rem 0; border: none;">', unsafe_allow_html=True)
-    st.session_state.auto_archive = st.checkbox("💾 Auto-archive entries", value=st.session_state.auto_archive, 
-                              help="Automatically save each analysis session")
-    
-    st.markdown("</div>", unsafe_allow_html=True)
-    
+
+@fragment
+def sidebar_account():
+    """Sign-out and journal tips."""
     # ADDED: Logout button
     st.markdown("""
         <div style='background: #F0F7ED; padding: 1.5rem; border-radius: 8px; border-left: 4px solid #5A7F5C; margin-top: 1rem;'>
@@ -1355,9 +912,12 @@ with st.sidebar:
     """, unsafe_allow_html=True)
     
     if st.button("🚪 Sign Out", use_container_width=True):
-        # Clear session state
+        if st.session_state.get('session_token'):
+            open_user_store().end_session(st.session_state.session_token)
+        # Clear session state (the demo id stays, so Quick Start reopens the same journal)
         for key in list(st.session_state.keys()):
-            del st.session_state[key]
+            if key != 'demo_user_id':
+                del st.session_state[key]
         st.rerun()
     
     st.markdown("""
@@ -1377,14 +937,96 @@ with st.sidebar:
         </div>
     """, unsafe_allow_html=True)
 
+with st.sidebar:
+    # Welcome message with auth status
+    st.sidebar.success(f"Welcome, {user_name}!")
+    st.sidebar.caption(f"Logged in via {auth_method_display}")
+    
+    sidebar_panel()
+    
+    # Auto-archive toggle; outside the fragments so a change reruns the main area that reads it
+    st.markdown('<hr style="height: 1px; background: linear-gradient(90deg, transparent, #8AB4A1, transparent); margin: 1rem 0; border: none;">', unsafe_allow_html=True)
+    st.session_state.auto_archive = st.checkbox("💾 Auto-archive entries", value=st.session_state.auto_archive, 
+                              help="Automatically save each analysis session")
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    sidebar_account()
+
+profiler.mark("sidebar")
+
 # ============================================
 # MAIN CONTENT - DASHBOARD VIEW
 # ============================================
 
 if st.session_state.show_dashboard:
     create_growth_dashboard(archive)
+    show_profile()
     st.stop()
 
+ARCHIVE_PAGE_SIZE = 25
+
+@fragment
+def archive_entry_list(archive):
+    """Search, sort and page through archived entries; typing a search reruns only the list."""
+    # Archive controls
+    st.markdown("""
+        <div style='background: white; padding: 1.5rem; border-radius: 8px; border: 1px solid #E8E6DE; margin-bottom: 2rem;'>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search_term = st.text_input("🔍 Search entries", placeholder="Search by theme, emotion, or keyword")
+    with col2:
+        sort_order = st.selectbox("Sort by", ["Newest First", "Oldest First"])
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    # Lightweight rows (already sorted oldest first); full entries stay in the archive
+    rows = archive.get_entry_summaries()
+    if search_term:
+        matching = {e.get("id") for e in archive.search_entries(search_term)}
+        rows = [row for row in rows if row["id"] in matching]
+    if sort_order == "Newest First":
+        rows = rows[::-1]
+    
+    if not rows:
+        st.info("No entries match your search.")
+        return
+    
+    # One table per page instead of an expander per entry
+    pages = (len(rows) + ARCHIVE_PAGE_SIZE - 1) // ARCHIVE_PAGE_SIZE
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+    start = (page - 1) * ARCHIVE_PAGE_SIZE
+    page_rows = rows[start:start + ARCHIVE_PAGE_SIZE]
+    st.caption(f"Showing {start + 1}–{start + len(page_rows)} of {len(rows)} entries • select a row to open it")
+    
+    # A fresh key after each selection, so coming back to the archive doesn't reopen the same entry
+    table_key = f"archive_table_{st.session_state.get('archive_table_version', 0)}"
+    event = st.dataframe(
+        {
+            "Date": [row["date"] for row in page_rows],
+            "Themes": [row["themes"] for row in page_rows],
+            "Emotions": [row["emotions"] for row in page_rows],
+            "Words": [row["words"] for row in page_rows],
+            "Passages": [row["passages"] for row in page_rows],
+            "Preview": [row["preview"] for row in page_rows]
+        },
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=table_key
+    )
+    
+    selected = event.selection.rows if event is not None else []
+    if selected:
+        # Only the selected entry is loaded in full
+        st.session_state.selected_entry = archive.get_entry(page_rows[selected[0]]["id"])
+        st.session_state.archive_table_version = st.session_state.get('archive_table_version', 0) + 1
+        st.session_state.show_archive = False
+        st.rerun()
+
 # ============================================
 # MAIN CONTENT - ARCHIVE VIEW WITH FIXED SORTING
 # ============================================
@@ -1397,9 +1039,8 @@ if st.session_state.show_archive:
         </div>
     """, unsafe_allow_html=True)
     
-    entries = archive.get_entries()
-    
-    if not entries:
+    # Summary rows and cached counts only; full entries are loaded for the selected row
+    if not archive.get_entry_summaries():
         st.markdown("""
             <div style="background: white; border-left: 4px solid #8AB4A1; padding: 1.5rem; margin: 1rem 0; border-radius: 4px; box-shadow: 0 2px 8px rgba(0,0,0,0.04);">
                 <h3 style="color: #2D5A27; margin: 0 0 1rem 0;">📖 Archive Empty</h3>
@@ -1414,108 +1055,26 @@ if st.session_state.show_archive:
             st.rerun()
         st.stop()
     
-    # Archive controls
-    st.markdown("""
-        <div style='background: white; padding: 1.5rem; border-radius: 8px; border: 1px solid #E8E6DE; margin-bottom: 2rem;'>
-    """, unsafe_allow_html=True)
-    
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        search_term = st.text_input("🔍 Search entries", placeholder="Search by theme, emotion, or keyword")
-    with col2:
-        sort_order = st.selectbox("Sort by", ["Newest First", "Oldest First"])
-    
-    st.markdown("</div>", unsafe_allow_html=True)
-    
-    # Filter entries
-    filtered_entries = entries
-    if search_term:
-        search_lower = search_term.lower()
-        filtered_entries = [
-            e for e in entries 
-            if (search_lower in e.get("journal_text", "").lower() or
-                any(search_lower in theme.lower() for theme in e.get("themes", [])) or
-                any(search_lower in emotion.lower() for emotion in e.get("emotions", [])))
-        ]
-    
-    # FIXED: Proper sorting by date (not just reverse)
-    if sort_order == "Newest First":
-        # Sort by timestamp descending (newest first)
-        filtered_entries.sort(
-            key=lambda x: datetime.datetime.fromisoformat(x["timestamp"].replace('Z', '+00:00')), 
-            reverse=True
-        )
-    else:  # Oldest First
-        # Sort by timestamp ascending (oldest first)
-        filtered_entries.sort(
-            key=lambda x: datetime.datetime.fromisoformat(x["timestamp"].replace('Z', '+00:00')), 
-            reverse=False
-        )
+    archive_entry_list(archive)
     
-    # Display entries
-    for i, entry in enumerate(filtered_entries[-50:]):  # Show more entries (50)
-        date = datetime.datetime.fromisoformat(entry["timestamp"]).strftime("%b %d, %Y")
-        
-        # Debug: Show date for January 2026 entries
-        show_debug = False
-        if "2026-01" in entry.get("date", ""):
-            show_debug = True
-        
-        with st.expander(f"📅 {date} - {', '.join(entry.get('themes', ['Reflection'])[:2])}", expanded=False):
-            
-            if show_debug:
-                st.success(f"✅ January 2026 entry found! (Date: {entry.get('date')})")
-            
-            col_a, col_b = st.columns(2)
-            with col_a:
-                st.markdown(f"**Themes:** {', '.join(entry.get('themes', []))}")
-                st.markdown(f"**Emotions:** {', '.join(entry.get('emotions', []))}")
-            with col_b:
-                st.markdown(f"**Length:** {entry.get('word_count', 0)} words")
-                st.markdown(f"**Bible Passages:** {len(entry.get('bible_passages', []))}")
-            
-            st.markdown('<hr style="height: 1px; background: linear-gradient(90deg, transparent, #8AB4A1, transparent); margin: 1.5rem 0; border: none;">', unsafe_allow_html=True)
-            st.markdown("**Journal Preview:**")
-            st.markdown(entry.get("journal_text", "")[:200] + "..." if len(entry.get("journal_text", "")) > 200 else entry.get("journal_text", ""))
-            
-            if st.button(f"🔍 View Full Analysis", key=f"view_archive_{i}_{entry.get('id', i)}"):
-                st.session_state.selected_entry = entry
-                st.session_state.show_archive = False
-                st.rerun()
-    
-    # Show sorting debug info
-    with st.expander("🔍 Sorting Debug Info", expanded=False):
-        st.write(f"Total entries: {len(entries)}")
-        st.write(f"Filtered entries: {len(filtered_entries)}")
-        st.write(f"Sort order: {sort_order}")
-        
-        # Show dates of first 5 entries
-        st.write("First 5 entries in current order:")
-        for i, entry in enumerate(filtered_entries[:5]):
-            st.write(f"  {i+1}. {entry.get('date')} - {entry.get('timestamp')}")
-        
-        # Check for January 2026 entries
-        jan_2026 = [e for e in filtered_entries if "2026-01" in e.get("date", "")]
-        st.write(f"January 2026 entries in filtered list: {len(jan_2026)}")
-        if jan_2026:
-            st.success("✅ January 2026 entries found!")
-            for e in jan_2026:
-                st.write(f"  - {e.get('date')}: {e.get('journal_text', '')[:50]}...")
+    profiler.mark("entry list")
     
     # Archive stats
     st.markdown('<hr style="height: 1px; background: linear-gradient(90deg, transparent, #8AB4A1, transparent); margin: 1.5rem 0; border: none;">', unsafe_allow_html=True)
     st.markdown("### 📊 Archive Statistics")
     
-    if entries:
-        all_themes = [theme for entry in entries for theme in entry.get('themes', [])]
-        if all_themes:
-            theme_counts = pd.Series(all_themes).value_counts()
-            st.bar_chart(theme_counts.head(10))  # Show top 10 in bar chart
+    theme_counts = archive.get_theme_counts(10)  # Show top 10 in bar chart
+    if theme_counts:
+        # pandas is only loaded for the archive statistics
+        import pandas as pd
+        st.bar_chart(pd.Series(dict(theme_counts)))
     
     if st.button("← Back to Journal", use_container_width=True):
         st.session_state.show_archive = False
         st.rerun()
     
+    profiler.mark("archive stats")
+    show_profile()
     st.stop()
 
 # ============================================
@@ -1540,6 +1099,11 @@ with col1:
         key="journal_input"
     )
     
+    # Instant local theme preview while the full analysis is pending
+    preview_themes = detect_themes(journal) if journal else []
+    if preview_themes:
+        st.caption(f"✨ Themes noticed so far: {', '.join(preview_themes)}")
+    
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Analysis button
@@ -1549,6 +1113,12 @@ with col1:
                 result = analyze_spiritual_journal(journal)
                 st.session_state.result = result
                 
+                # Fetch (and check) the verses the results will show while the page renders
+                st.session_state.verse_prefetch = prefetch_verses(
+                    result.get("bible_passages", []) +
+                    get_bible_verse_suggestions(result.get("primary_themes", []))
+                )
+                
                 # Auto-archive if enabled
                 if st.session_state.auto_archive:
                     try:
@@ -1649,6 +1219,12 @@ with col1:
                         <h3 style='color: #2D5A27; margin: 0 0 1rem 0;'>📖 Scripture for You</h3>
                 """, unsafe_allow_html=True)
                 
+                # Verse checks from the background prefetch, if it has finished
+                prefetch = st.session_state.get("verse_prefetch")
+                verse_checks = {}
+                if prefetch is not None and prefetch.done() and prefetch.exception() is None:
+                    verse_checks = prefetch.result()
+                
                 for passage in passages[:3]:
                     st.markdown(f"""
                         <div style='margin-bottom: 1.5rem; padding-left: 1rem; border-left: 3px solid #8AB4A1;'>
@@ -1659,6 +1235,9 @@ with col1:
                             </div>
                         </div>
                     """, unsafe_allow_html=True)
+                    check = verse_checks.get(passage.get('reference'))
+                    if check and check["verified"] is False:
+                        st.caption(f"ℹ️ The quoted text may not match this reference. WEB reads: \"{check['text']}\"")
                 
                 st.markdown("</div>", unsafe_allow_html=True)
             
@@ -1695,14 +1274,49 @@ with col1:
                         <p style='font-size: 1.1rem; color: #2D5A27;'>{encouragement}</p>
                     </div>
                 """, unsafe_allow_html=True)
-            
+
+            # Request cost and latency
+            metrics = result.get("analysis_metrics")
+            if metrics:
+                st.caption(
+                    f"⏱️ {metrics['latency_ms'] / 1000:.1f}s • {metrics['total_tokens']} tokens "
+                    f"({metrics['prompt_tokens']} in / {metrics['completion_tokens']} out) • "
+                    f"{metrics['requests']} request{'s' if metrics['requests'] != 1 else ''}"
+                )
+
             # Archive button
             if not st.session_state.auto_archive:
                 if st.button("💾 Save to Archive", type="secondary", use_container_width=True):
                     archive.save_entry(journal, result)
                     st.success("Entry archived!")
 
-with col2:
+profiler.mark("journal")
+
+def passage_html(reference, limit=None):
+    """Verse text for display, with verse numbers when a passage spans several verses."""
+    passage = get_bible_passage(reference, "WEB")
+    if not passage:
+        text = get_bible_verse(reference, "WEB")
+        return text[:limit] + "..." if limit and len(text) > limit else text
+    
+    verses = passage["verses"]
+    if len(verses) == 1:
+        text = verses[0]["text"]
+        return text[:limit] + "..." if limit and len(text) > limit else text
+    
+    parts = []
+    length = 0
+    for verse in verses:
+        parts.append(f"<sup>{verse['verse']}</sup>{verse['text']}")
+        length += len(verse["text"])
+        if limit and length > limit:
+            parts.append("...")
+            break
+    return " ".join(parts)
+
+@fragment
+def quick_bible_lookup():
+    """Suggested verses, manual lookup and Scripture search; reruns on its own."""
     st.markdown("""
         <div style='background: #F9F7F1; padding: 1.5rem; border-radius: 8px; border: 1px solid #E8E6DE; margin-bottom: 1rem;'>
             <h3 style='color: #2D5A27; margin-top: 0;'>🔍 Quick Bible Lookup</h3>
@@ -1716,11 +1330,11 @@ with col2:
             if st.button(f"{suggestion.get('reference', 'Bible Verse')}", 
                        key=f"btn_{suggestion.get('reference', '')}",
                        use_container_width=True):
-                verse_text = get_bible_verse(suggestion.get('reference', 'John 3:16'), "WEB")
+                verse_text = passage_html(suggestion.get('reference', 'John 3:16'), limit=200)
                 st.markdown(f"""
                     <div style='background: white; border-left: 4px solid #8AB4A1; padding: 1.5rem; margin: 1rem 0; border-radius: 4px; box-shadow: 0 2px 8px rgba(0,0,0,0.04);'>
                         <div style='font-weight: 500; color: #2D5A27;'>{suggestion.get('reference', 'Bible Verse')}</div>
-                        <div style='font-style: italic; color: #5A7F5C; margin-top: 0.5rem;'>{verse_text[:200] + "..." if len(verse_text) > 200 else verse_text}</div>
+                        <div style='font-style: italic; color: #5A7F5C; margin-top: 0.5rem;'>{verse_text}</div>
                     </div>
                 """, unsafe_allow_html=True)
     
@@ -1728,7 +1342,7 @@ with col2:
     st.markdown("**🔎 Look Up Any Verse**")
     manual_verse = st.text_input("Reference:", "Matthew 6:33", key="manual_verse")
     if st.button("Get This Verse", use_container_width=True):
-        text = get_bible_verse(manual_verse, "WEB")
+        text = passage_html(manual_verse)
         if text.startswith("❌"):
             st.error(text)
         else:
@@ -1739,8 +1353,30 @@ with col2:
                 </div>
             """, unsafe_allow_html=True)
     
+    # Keyword search over the offline Bible
+    st.markdown("**📖 Search Scripture**")
+    search_query = st.text_input("Words or \"a phrase\":", placeholder='anxious, "my shepherd"', key="scripture_search")
+    if search_query.strip():
+        results = search_scripture(search_query, "WEB", k=5)
+        if results is None:
+            st.caption("Search needs the offline Bible index (tools/build_bible_search.py).")
+        elif not results:
+            st.caption("No verses found.")
+        for found in results or []:
+            st.markdown(f"""
+                <div style='background: white; border-left: 4px solid #8AB4A1; padding: 0.75rem 1rem; margin: 0.5rem 0; border-radius: 4px;'>
+                    <div style='font-weight: 500; color: #2D5A27;'>{found['reference']}</div>
+                    <div style='font-style: italic; color: #5A7F5C; margin-top: 0.25rem;'>{found['text'][:200] + "..." if len(found['text']) > 200 else found['text']}</div>
+                </div>
+            """, unsafe_allow_html=True)
+    
     st.markdown("</div>", unsafe_allow_html=True)
 
+with col2:
+    quick_bible_lookup()
+
+profiler.mark("bible lookup")
+
 # ============================================
 # ENTRY DETAIL VIEW (if selected from archive)
 # ============================================
@@ -1861,4 +1497,6 @@ st.markdown("""
             🌿 MyGrow AI Spiritual Director v2.0 • 📚 Automatic Archiving • 📈 Growth Tracking • 💝 Personalized Guidance
         </p>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+show_profile()
\ No newline at end of file
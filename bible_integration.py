@@ -1,117 +1,335 @@
 ﻿# bible_integration.py - CLEAN VERSION (NO STREAMLIT)
-import requests
+import json
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from types import MappingProxyType
+from bible_search import open_index
+from bible_store import open_store
+from scripture_refs import BOOK_NAMES, format_reference, parse_reference, reference_key
+from versification import chapter_range, verse_range
+from metrics import get_metrics
+from resilience import Deadline, DeadlineExceeded, retry_call
+from verse_cache import NEGATIVE_TTL, NOT_FOUND_TTL, get_verse_cache
+
+BIBLE_API_URL = os.getenv("BIBLE_API_URL", "https://bible-api.com")
+
+# Budget for one remote lookup, retries included, and the connect timeout within it
+REMOTE_DEADLINE = 10.0
+CONNECT_TIMEOUT = 3.05
+REMOTE_RETRIES = 2
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Concurrent remote lookups for get_bible_verses()
+MAX_FETCH_WORKERS = 8
+
+# Share of the quoted words found in the real passage. Other translations of the right
+# verse, and quotes of one verse from a range, score about 0.65 or more; a different
+# verse shares only common words and scores about 0.1-0.3
+VERIFY_MIN_SIMILARITY = 0.4
+
+_WORDS = re.compile(r"[a-z']+")
+
+_session = None
+_executor = None
+_prefetch_executor = None
+_http_lock = threading.Lock()
+
+# Canonical book order and aliases live in scripture_refs (book_id = position + 1, matches the offline store)
+BIBLE_BOOK_NAMES = BOOK_NAMES
+
+def get_local_passage(verse_ref, version="WEB"):
+    """[(chapter, verse, text)] for a reference from the offline store, or None if unavailable."""
+    store = open_store(version)
+    ref = parse_reference(verse_ref) if store else None
+    if not ref:
+        return None
+    
+    # A range (or a whole chapter) is one contiguous slice of the store
+    if ref.verse_start is None:
+        verses = store.get_passage(ref.book_id, ref.chapter)
+    else:
+        verses = store.get_passage(ref.book_id, ref.chapter, ref.verse_start, ref.verse_end)
+    return [(ref.chapter, verse, text) for verse, text in verses] or None
+
+def get_local_verse(verse_ref, version="WEB"):
+    """Look a verse (or verse range) up in the offline store. Returns None if unavailable."""
+    verses = get_local_passage(verse_ref, version)
+    return _passage_text(verses) if verses else None
 
 def get_bible_verse(verse_ref, version="WEB"):
     """Get text for a specific Bible verse"""
+    verses, failure = _lookup_passage(verse_ref, version)
+    if verses:
+        return _passage_text(verses)
+    if failure == "timeout":
+        return "The scripture reflection is taking a moment... Try again shortly."
+    return _fallback_verse_text(verse_ref)
+
+def get_bible_passage(verse_ref, version="WEB"):
+    """Structured passage: {"reference", "verses": [{"chapter", "verse", "text"}], "text"}, or None."""
+    verses, _failure = _lookup_passage(verse_ref, version)
+    if not verses:
+        return None
+    ref = parse_reference(verse_ref)
+    return {
+        "reference": format_reference(ref) if ref else verse_ref.strip(),
+        "verses": [{"chapter": chapter, "verse": verse, "text": text} for chapter, verse, text in verses],
+        "text": _passage_text(verses)
+    }
+
+def _passage_text(verses):
+    return " ".join(text for _chapter, _verse, text in verses)
+
+def _lookup_passage(verse_ref, version):
+    """Store, then cache, then network. Returns ([(chapter, verse, text)], failure_reason)."""
+    started = time.perf_counter()
+    
+    # Offline store first when one has been built (sub-millisecond, no network); otherwise bible-api.com
+    local_verses = get_local_passage(verse_ref, version)
+    if local_verses:
+        _observe_lookup(started, "store")
+        return local_verses, None
+    
+    # Shared cache in front of the network; recent failures are cached too
+    cache = get_verse_cache()
+    key = _cache_key(verse_ref, version)
+    hit, cached = cache.get(key)
+    verses, failure = None, None
+    if hit and cached is not None:
+        verses = _decode_verses(cached)
+        hit = verses is not None
+    if not hit:
+        verses, failure = _fetch_remote_passage(verse_ref, version)
+        if verses:
+            cache.set(key, json.dumps(verses, ensure_ascii=False))
+        elif failure == "not_found":
+            cache.set_failure(key, NOT_FOUND_TTL)
+        elif failure != "disabled":
+            cache.set_failure(key, NEGATIVE_TTL)
+    _observe_lookup(started, "cache" if hit else "remote")
+    return verses, failure
+
+def _decode_verses(cached):
+    """Cached [[chapter, verse, text], ...]; None for entries in an older format."""
+    try:
+        verses = json.loads(cached)
+    except ValueError:
+        return None
+    if not isinstance(verses, list):
+        return None
+    return [tuple(verse) for verse in verses]
+
+def _cache_key(verse_ref, version):
+    """Cache key shared by equivalent spellings of a reference ("Ps 23.1" == "Psalm 23:1")."""
+    return f"{version.upper()}|{reference_key(verse_ref)}"
+
+def _observe_lookup(started, source):
+    get_metrics().observe("verse.lookup_ms", (time.perf_counter() - started) * 1000, source=source)
+
+def _fetch_remote_passage(verse_ref, version):
+    """Fetch a passage from bible-api.com. Returns ([(chapter, verse, text)], failure_reason)."""
+    # The remote API is an optional fallback (MYGROW_BIBLE_REMOTE=0 disables it)
+    if os.getenv("MYGROW_BIBLE_REMOTE", "1") == "0":
+        return None, "disabled"
+    
+    import requests
+    
     try:
-        # Clean the verse reference
-        clean_ref = verse_ref.replace(" ", "%20")
+        # Send the canonical spelling so the API sees one form per verse
+        ref = parse_reference(verse_ref)
+        clean_ref = (format_reference(ref) if ref else verse_ref.strip()).replace(" ", "%20")
+        
+        # Fetch from Bible API; every attempt shares one deadline, so a click never waits past it
+        url = f"{BIBLE_API_URL}/{clean_ref}"
         
-        # Fetch from Bible API
-        url = f"https://bible-api.com/{clean_ref}"
-        response = requests.get(url, timeout=10)
+        def attempt(remaining):
+            response = _get_session().get(url, params={"translation": version.lower()},
+                                          timeout=(min(CONNECT_TIMEOUT, remaining), remaining))
+            if response.status_code in _RETRY_STATUSES:
+                raise _RetryableStatus(response.status_code)
+            return response
+        
+        def is_transient(e):
+            return isinstance(e, (_RetryableStatus, requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        
+        response = retry_call(attempt, Deadline(REMOTE_DEADLINE), is_transient,
+                              retries=REMOTE_RETRIES, base_delay=0.3, max_delay=1.0)
         
         if response.status_code == 200:
             data = response.json()
-            if "text" in data:
-                # Clean up the text
-                text = data["text"]
-                # Remove verse numbers
-                text = re.sub(r'\d+\s', '', text)
-                return text.strip()
+            # Per-verse entries keep verse boundaries (and numbers inside the text) intact
+            verses = [
+                (int(verse["chapter"]), int(verse["verse"]), " ".join(verse["text"].split()))
+                for verse in data.get("verses", []) if verse.get("text", "").strip()
+            ]
+            if not verses and data.get("text", "").strip():
+                verses = [(ref.chapter if ref else 0, ref.verse_start if ref and ref.verse_start else 0,
+                           " ".join(data["text"].split()))]
+            if verses:
+                get_metrics().incr("verse.remote", result="ok")
+                return verses, None
+        
+        failure = "not_found" if response.status_code == 404 else "error"
     
-    except requests.exceptions.Timeout:
-        return "The scripture reflection is taking a moment... Try again shortly."
+    except (requests.exceptions.Timeout, DeadlineExceeded):
+        failure = "timeout"
+    except _RetryableStatus:
+        failure = "error"
     except Exception as e:
         print(f"⚠️ Bible API error: {e}")
+        failure = "error"
     
-    # Fallback verses
-    fallback_verses = {
+    get_metrics().incr("verse.remote", result=failure)
+    return None, failure
+
+# Well-known verses to show when a lookup fails, keyed by parsed reference
+_FALLBACK_VERSES = MappingProxyType({
+    parse_reference(ref): text for ref, text in {
         "John 3:16": "For God so loved the world that he gave his one and only Son, that whoever believes in him shall not perish but have eternal life.",
         "Psalm 23:1": "The Lord is my shepherd, I lack nothing.",
         "Philippians 4:6": "Do not be anxious about anything, but in every situation, by prayer and petition, with thanksgiving, present your requests to God.",
         "Matthew 11:28": "Come to me, all you who are weary and burdened, and I will give you rest.",
         "Jeremiah 29:11": "For I know the plans I have for you,' declares the Lord, 'plans to prosper you and not to harm you, plans to give you hope and a future."
-    }
-    
-    # Try to match the reference
-    for ref, text in fallback_verses.items():
-        if ref in verse_ref or verse_ref in ref:
+    }.items()
+})
+
+def _fallback_verse_text(verse_ref):
+    """Well-known verses to show when a lookup fails."""
+    ref = parse_reference(verse_ref)
+    if ref and ref.verse_start is not None:
+        # Exact match, then the first verse of a range ("John 3:16-18" -> "John 3:16")
+        text = _FALLBACK_VERSES.get(ref) or _FALLBACK_VERSES.get(ref._replace(verse_end=ref.verse_start))
+        if text:
             return text
     
     return "The word of God is living and active. May this scripture speak to your heart today."
 
+def get_bible_verses(verse_refs, version="WEB"):
+    """Resolve many references at once. Returns {reference: text}.
+    
+    Duplicates are looked up once and remote fetches run concurrently, so N
+    references cost roughly one round-trip.
+    """
+    unique = {}
+    for ref in verse_refs:
+        if ref:
+            unique.setdefault(_cache_key(ref, version), ref)
+    
+    refs = list(unique.values())
+    if len(refs) <= 1:
+        texts = [get_bible_verse(ref, version) for ref in refs]
+    else:
+        texts = list(_get_executor().map(lambda ref: get_bible_verse(ref, version), refs))
+    by_key = {_cache_key(ref, version): text for ref, text in zip(refs, texts)}
+    
+    return {ref: by_key[_cache_key(ref, version)] for ref in verse_refs if ref}
+
+def prefetch_verses(passages, version="WEB"):
+    """Warm the verse cache in the background. Returns a Future of {reference: check}.
+    
+    `passages` are references or dicts with a "reference" and, for passages the
+    model quoted, its "text". Each check is {"text", "similarity", "verified"};
+    verified is None when there was nothing to compare.
+    """
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        with _http_lock:
+            if _prefetch_executor is None:
+                # Separate from the fetch pool so queued prefetches can't starve their own fetches
+                _prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="verse-prefetch")
+    return _prefetch_executor.submit(_prefetch, list(passages), version)
+
+def _prefetch(passages, version):
+    expected = {}
+    refs = []
+    for passage in passages:
+        if isinstance(passage, dict):
+            ref, quoted = passage.get("reference"), passage.get("text")
+        else:
+            ref, quoted = passage, None
+        if ref and ref not in expected:
+            refs.append(ref)
+            expected[ref] = quoted
+    
+    lookups = _get_executor().map(lambda ref: _lookup_passage(ref, version), refs)
+    checks = {}
+    for ref, (verses, _failure) in zip(refs, lookups):
+        text = _passage_text(verses) if verses else None
+        similarity = _text_similarity(expected[ref], text) if expected[ref] and text else None
+        verified = None if similarity is None else similarity >= VERIFY_MIN_SIMILARITY
+        checks[ref] = {"text": text, "similarity": similarity, "verified": verified}
+        get_metrics().incr("verse.prefetch", result="unavailable" if not text else
+                           "unchecked" if verified is None else "verified" if verified else "mismatch")
+    return checks
+
+def _text_similarity(quoted, actual):
+    """Fraction (0-1) of the quoted words that appear in the actual text, ignoring case and punctuation."""
+    words_quoted = _WORDS.findall(quoted.lower())
+    words_actual = Counter(_WORDS.findall(actual.lower()))
+    if not words_quoted or not words_actual:
+        return 0.0
+    found = sum((Counter(words_quoted) & words_actual).values())
+    return round(found / len(words_quoted), 3)
+
+class _RetryableStatus(Exception):
+    """A 429 or 5xx from bible-api.com, worth another attempt if time allows."""
+
+def _get_session():
+    """Shared keep-alive session (retries are done by _fetch_remote_passage, within its deadline)."""
+    global _session
+    if _session is None:
+        with _http_lock:
+            if _session is None:
+                # requests/urllib3 are only imported once a remote lookup is needed
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_FETCH_WORKERS * 2, max_retries=0)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = "MyGrow-Journal/2.0"
+                _session = session
+    return _session
+
+def _get_executor():
+    """Shared thread pool for concurrent verse fetches."""
+    global _executor
+    if _executor is None:
+        with _http_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="verse-fetch")
+    return _executor
+
+def search_scripture(query, version="WEB", k=10):
+    """Ranked keyword search over the offline Bible. Returns None if no index is installed."""
+    index = open_index(version)
+    if index is None:
+        return None
+    started = time.perf_counter()
+    results = index.search(query, k)
+    get_metrics().observe("verse.search_ms", (time.perf_counter() - started) * 1000)
+    return results
+
+def get_verse_cache_stats():
+    """Hit ratio and counters for the shared verse cache."""
+    return get_verse_cache().stats()
+
 def get_book_list():
     """Get list of Bible books"""
-    try:
-        response = requests.get("https://bible-api.com/books")
-        if response.status_code == 200:
-            data = response.json()
-            return [book["name"] for book in data.get("books", [])]
-    except Exception as e:
-        print(f"⚠️ Books API error: {e}")
-    
-    # Fallback list
-    return [
-        "Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy",
-        "Joshua", "Judges", "Ruth", "1 Samuel", "2 Samuel",
-        "1 Kings", "2 Kings", "1 Chronicles", "2 Chronicles",
-        "Ezra", "Nehemiah", "Esther", "Job", "Psalms",
-        "Proverbs", "Ecclesiastes", "Song of Solomon",
-        "Isaiah", "Jeremiah", "Lamentations", "Ezekiel",
-        "Daniel", "Hosea", "Joel", "Amos", "Obadiah",
-        "Jonah", "Micah", "Nahum", "Habakkuk", "Zephaniah",
-        "Haggai", "Zechariah", "Malachi",
-        "Matthew", "Mark", "Luke", "John", "Acts",
-        "Romans", "1 Corinthians", "2 Corinthians",
-        "Galatians", "Ephesians", "Philippians", "Colossians",
-        "1 Thessalonians", "2 Thessalonians", "1 Timothy",
-        "2 Timothy", "Titus", "Philemon", "Hebrews",
-        "James", "1 Peter", "2 Peter", "1 John",
-        "2 John", "3 John", "Jude", "Revelation"
-    ]
+    # The canon is static; no need to ask the API
+    return list(BIBLE_BOOK_NAMES)
 
 def get_chapter_list(book_name):
     """Get number of chapters in a book"""
-    chapter_ranges = {
-        "Genesis": 50, "Exodus": 40, "Leviticus": 27, "Numbers": 36, "Deuteronomy": 34,
-        "Joshua": 24, "Judges": 21, "Ruth": 4, "1 Samuel": 31, "2 Samuel": 24,
-        "1 Kings": 22, "2 Kings": 25, "1 Chronicles": 29, "2 Chronicles": 36,
-        "Ezra": 10, "Nehemiah": 13, "Esther": 10, "Job": 42, "Psalms": 150,
-        "Proverbs": 31, "Ecclesiastes": 12, "Song of Solomon": 8,
-        "Isaiah": 66, "Jeremiah": 52, "Lamentations": 5, "Ezekiel": 48,
-        "Daniel": 12, "Hosea": 14, "Joel": 3, "Amos": 9, "Obadiah": 1,
-        "Jonah": 4, "Micah": 7, "Nahum": 3, "Habakkuk": 3, "Zephaniah": 3,
-        "Haggai": 2, "Zechariah": 14, "Malachi": 4,
-        "Matthew": 28, "Mark": 16, "Luke": 24, "John": 21, "Acts": 28,
-        "Romans": 16, "1 Corinthians": 16, "2 Corinthians": 13,
-        "Galatians": 6, "Ephesians": 6, "Philippians": 4, "Colossians": 4,
-        "1 Thessalonians": 5, "2 Thessalonians": 3, "1 Timothy": 6,
-        "2 Timothy": 4, "Titus": 3, "Philemon": 1, "Hebrews": 13,
-        "James": 5, "1 Peter": 5, "2 Peter": 3, "1 John": 5,
-        "2 John": 1, "3 John": 1, "Jude": 1, "Revelation": 22
-    }
-    
-    if book_name in chapter_ranges:
-        return list(range(1, chapter_ranges[book_name] + 1))
-    return list(range(1, 31))
+    chapters = chapter_range(book_name)
+    return list(chapters) if chapters else list(range(1, 31))
 
 def get_verse_list(book_name, chapter_number):
     """Get number of verses in a chapter"""
-    key_chapters = {
-        ("Psalms", 23): 6,
-        ("Psalms", 91): 16,
-        ("Matthew", 5): 48,
-        ("Matthew", 6): 34,
-        ("John", 3): 36,
-        ("John", 14): 31,
-        ("Romans", 8): 39,
-        ("1 Corinthians", 13): 13,
-        ("Philippians", 4): 23,
-    }
-    
-    key = (book_name, int(chapter_number))
-    if key in key_chapters:
-        return list(range(1, key_chapters[key] + 1))
-    return list(range(1, 31))
\ No newline at end of file
+    verses = verse_range(book_name, chapter_number)
+    return list(verses) if verses else list(range(1, 31))
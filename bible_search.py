@@ -0,0 +1,283 @@
+# bible_search.py - Keyword search over the offline Bible store (NO STREAMLIT)
+#
+# An inverted index built once from the verse store (tools/build_bible_search.py)
+# and memory-mapped at runtime. Documents are verses, identified by their
+# position in the store. Ranking is BM25; quoted phrases must appear in order.
+# Like the store, the index is optional and not shipped: until both are built,
+# search_scripture() returns None and the lookup panel says how to build them.
+#
+# File layout (little-endian, every section 4-byte aligned):
+#   magic         8 bytes              b"MGSRCH01"
+#   header        uint32 x 4, float32  doc_count, term_count, posting_count, store_count, avg_doc_len
+#   doc_lens      doc_count x uint16   indexed tokens per verse
+#   term_offsets  (T + 1) x uint32     start of each term in the term blob
+#   post_offsets  (T + 1) x uint32     first posting of each term
+#   post_docs     P x uint32           verse positions, ascending per term
+#   post_tfs      P x uint16           term frequency in that verse
+#   terms         UTF-8, sorted, concatenated
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+
+from bible_store import DATA_DIR, open_store, split_key
+from scripture_refs import ScriptureRef, format_reference
+
+MAGIC = b"MGSRCH01"
+_HEADER = struct.Struct("<IIIIf")
+HEADER_SIZE = 8 + _HEADER.size
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_WORDS = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_QUOTED = re.compile(r'"([^"]+)"')
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from had has have he her him his i if in into is it its
+me my not of on or our out so that the their them then there they this to up us was we
+were what when which who will with you your shall unto o
+""".split())
+
+# Longest first; "s" is handled separately so "anxious" and "grass" keep their ending
+_SUFFIXES = ("fulness", "ousness", "iveness", "ations", "ation", "ness", "ings", "ing", "edly", "ed", "ly", "ful")
+
+
+def stem(word):
+    """Light suffix stripping: "shepherds", "shepherding" -> "shepherd"; "loved", "loves" -> "lov"."""
+    if len(word) <= 3:
+        return word
+    if word.endswith("'s"):
+        word = word[:-2]
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("es") and word[-3] in "sxz" or word.endswith(("ches", "shes")):
+        word = word[:-2]
+    elif word.endswith("s") and word[-2] not in "sui'":
+        word = word[:-1]
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Stemmed tokens with stopwords removed, in order."""
+    return [stem(word) for word in _WORDS.findall(text.lower()) if word not in STOPWORDS]
+
+
+def index_path(version="WEB"):
+    """Path of the search index for a translation (next to its store file)."""
+    directory = os.getenv("MYGROW_BIBLE_DIR", DATA_DIR)
+    return os.path.join(directory, f"bible_{version.lower()}.mgi")
+
+
+def _aligned(size):
+    return (size + 3) & ~3
+
+
+class SearchIndex:
+    """Read-only BM25 search over a memory-mapped index and its verse store."""
+
+    def __init__(self, path, store):
+        self.path = path
+        self.store = store
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        if bytes(view[:8]) != MAGIC:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{path} is not a MyGrow search index")
+
+        doc_count, term_count, posting_count, store_count, avg_doc_len = _HEADER.unpack_from(view, 8)
+        if store is not None and store_count != store.count:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{path} was built for a store with {store_count} verses, not {store.count}")
+
+        sections = {}
+        at = HEADER_SIZE
+        for name, fmt, count in (("doc_lens", "H", doc_count), ("term_offsets", "I", term_count + 1),
+                                 ("post_offsets", "I", term_count + 1), ("post_docs", "I", posting_count),
+                                 ("post_tfs", "H", posting_count)):
+            size = count * (2 if fmt == "H" else 4)
+            raw = view[at:at + size]
+            if sys.byteorder == "little":
+                sections[name] = raw.cast(fmt)
+            else:
+                # Copy the little-endian bytes (array(fmt, raw) would make one element per byte)
+                sections[name] = array(fmt)
+                sections[name].frombytes(raw)
+                sections[name].byteswap()
+            at = _aligned(at + size)
+
+        self._doc_lens = sections["doc_lens"]
+        self._post_offsets = sections["post_offsets"]
+        self._post_docs = sections["post_docs"]
+        self._post_tfs = sections["post_tfs"]
+        self._view = view
+        self._sections = sections
+        self.doc_count = doc_count
+        self.avg_doc_len = avg_doc_len or 1.0
+        # BM25 length normalization per verse, computed once
+        self._norms = array("d", (K1 * (1 - B + B * n / self.avg_doc_len) for n in self._doc_lens))
+
+        # Term dictionary: ~13k entries, decoded once
+        term_offsets = sections["term_offsets"]
+        blob = bytes(view[at:at + term_offsets[term_count]])
+        self._terms = {
+            blob[term_offsets[i]:term_offsets[i + 1]].decode("utf-8"): i for i in range(term_count)
+        }
+
+    def postings(self, term):
+        """(docs, tfs) memoryview slices for a stemmed term; empty if unknown."""
+        term_id = self._terms.get(term)
+        if term_id is None:
+            return (), ()
+        start, end = self._post_offsets[term_id], self._post_offsets[term_id + 1]
+        return self._post_docs[start:end], self._post_tfs[start:end]
+
+    def search(self, query, k=10):
+        """Top-k verses for a query as [{"reference", "text", "score"}].
+
+        Words are OR-ed and ranked by BM25; "quoted phrases" must appear in order.
+        """
+        phrases = [tokenize(p) for p in _QUOTED.findall(query)]
+        phrases = [p for p in phrases if p]
+        terms = list(dict.fromkeys(tokenize(_QUOTED.sub(" ", query)) + [t for p in phrases for t in p]))
+        if not terms:
+            return []
+
+        scores = {}
+        norms = self._norms
+        for term in terms:
+            docs, tfs = self.postings(term)
+            if not len(docs):
+                continue
+            idf = math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc, tf in zip(docs, tfs):
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norms[doc])
+
+        if not phrases:
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        else:
+            # Verses holding every phrase term, best first; check phrase order on the text until k match
+            postings = sorted((self.postings(t)[0] for p in phrases for t in set(p)), key=len)
+            required = set(postings[0])
+            for docs in postings[1:]:
+                required.intersection_update(docs)
+            top = []
+            for doc in sorted(required, key=scores.__getitem__, reverse=True):
+                tokens = tokenize(self.store.text_at(doc))
+                if all(_contains(tokens, p) for p in phrases):
+                    top.append((doc, scores[doc]))
+                    if len(top) == k:
+                        break
+
+        results = []
+        for doc, score in top:
+            book_id, chapter, verse = split_key(self.store.key_at(doc))
+            results.append({
+                "reference": format_reference(ScriptureRef(book_id, chapter, verse, verse)),
+                "text": self.store.text_at(doc),
+                "score": round(score, 3)
+            })
+        return results
+
+    def close(self):
+        for view in list(self._sections.values()) + [self._view]:
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+
+def _contains(tokens, phrase):
+    n = len(phrase)
+    return any(tokens[i:i + n] == phrase for i in range(len(tokens) - n + 1))
+
+
+def write_index(path, store):
+    """Build the inverted index for every verse in a store."""
+    postings = {}
+    doc_lens = array("H")
+    for doc in range(store.count):
+        tokens = tokenize(store.text_at(doc))
+        doc_lens.append(min(len(tokens), 0xFFFF))
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            postings.setdefault(token, []).append((doc, tf))
+
+    terms = sorted(postings)
+    term_offsets = array("I", [0])
+    post_offsets = array("I", [0])
+    post_docs = array("I")
+    post_tfs = array("H")
+    blob = bytearray()
+    for term in terms:
+        blob += term.encode("utf-8")
+        term_offsets.append(len(blob))
+        for doc, tf in postings[term]:
+            post_docs.append(doc)
+            post_tfs.append(min(tf, 0xFFFF))
+        post_offsets.append(len(post_docs))
+
+    avg_doc_len = sum(doc_lens) / len(doc_lens) if doc_lens else 0.0
+    if sys.byteorder != "little":
+        for table in (doc_lens, term_offsets, post_offsets, post_docs, post_tfs):
+            table.byteswap()
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(doc_lens), len(terms), len(post_docs), store.count, avg_doc_len))
+        for table in (doc_lens, term_offsets, post_offsets, post_docs, post_tfs):
+            data = table.tobytes()
+            f.write(data)
+            f.write(b"\0" * (_aligned(len(data)) - len(data)))
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return len(terms), len(post_docs)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def open_index(version="WEB"):
+    """Shared search index for a translation, or None if it (or its store) isn't installed.
+
+    Missing and unreadable files aren't remembered, so an index built (or fixed)
+    while the app runs is picked up.
+    """
+    version = version.upper()
+    if version in _indexes:
+        return _indexes[version]
+
+    path = index_path(version)
+    store = open_store(version)
+    if store is None or not os.path.exists(path):
+        return None
+    with _indexes_lock:
+        if version not in _indexes:
+            try:
+                _indexes[version] = SearchIndex(path, store)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Search index error: {e}")
+                return None
+    return _indexes[version]
@@ -0,0 +1,189 @@
+# bible_store.py - Offline verse store in one memory-mapped file (NO STREAMLIT)
+#
+# File layout (little-endian):
+#   magic    8 bytes          b"MGBIBLE1"
+#   count    uint32           number of verses N
+#   text_at  uint32           byte offset of the text blob
+#   keys     N x uint32       (book_id << 16) | (chapter << 8) | verse, ascending
+#   offsets  (N + 1) x uint32 start of each verse in the blob; the last entry is the blob length
+#   blob     UTF-8 verse text, concatenated in key order
+#
+# The store is optional and not shipped with the app: build it with
+# tools/build_bible_store.py (the WEB translation is public domain). Until a
+# store is installed, every lookup goes to bible-api.com, which stays the default.
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+MAGIC = b"MGBIBLE1"
+HEADER_SIZE = 16
+
+# Where built stores are looked for: data/bible_<version>.mgb next to this module (override with MYGROW_BIBLE_DIR)
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def verse_key(book_id, chapter, verse):
+    """Pack a (book, chapter, verse) reference into one sortable integer."""
+    if not (0 <= chapter <= 0xFF and 0 <= verse <= 0xFF):
+        raise ValueError(f"Chapter and verse must be 0-255, got {chapter}:{verse}")
+    return (book_id << 16) | (chapter << 8) | verse
+
+
+def split_key(key):
+    """Inverse of verse_key()."""
+    return key >> 16, (key >> 8) & 0xFF, key & 0xFF
+
+
+def _swapped(raw):
+    """A little-endian uint32 table copied into native byte order."""
+    table = array("I")
+    table.frombytes(raw)
+    table.byteswap()
+    return table
+
+
+def store_path(version="WEB"):
+    """Path of the store file for a translation."""
+    directory = os.getenv("MYGROW_BIBLE_DIR", DATA_DIR)
+    return os.path.join(directory, f"bible_{version.lower()}.mgb")
+
+
+class BibleStore:
+    """Read-only verse lookups over a memory-mapped store file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        if bytes(view[:8]) != MAGIC:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{path} is not a MyGrow Bible store")
+
+        count, text_at = struct.unpack_from("<II", view, 8)
+        keys_end = HEADER_SIZE + 4 * count
+        if sys.byteorder == "little":
+            self._keys = view[HEADER_SIZE:keys_end].cast("I")
+            self._offsets = view[keys_end:keys_end + 4 * (count + 1)].cast("I")
+        else:
+            # Big-endian hosts can't cast the little-endian tables in place
+            self._keys = _swapped(view[HEADER_SIZE:keys_end])
+            self._offsets = _swapped(view[keys_end:keys_end + 4 * (count + 1)])
+        self._blob = view[text_at:]
+        self._view = view
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def index_of(self, book_id, chapter, verse):
+        """Position of a verse in the store, or -1 if it isn't there."""
+        key = verse_key(book_id, chapter, verse)
+        i = bisect_left(self._keys, key)
+        if i < self.count and self._keys[i] == key:
+            return i
+        return -1
+
+    def text_at(self, index):
+        """Verse text at a store position (decoded straight from the mapped bytes)."""
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def key_at(self, index):
+        return self._keys[index]
+
+    def get_verse(self, book_id, chapter, verse):
+        """Text of one verse, or None."""
+        i = self.index_of(book_id, chapter, verse)
+        return self.text_at(i) if i >= 0 else None
+
+    def passage_range(self, book_id, chapter, first=1, last=255):
+        """Store positions [start, end) of verses first..last of a chapter (one contiguous run)."""
+        start = bisect_left(self._keys, verse_key(book_id, chapter, max(first, 0)))
+        end = bisect_right(self._keys, verse_key(book_id, chapter, min(last, 255)), start)
+        return start, end
+
+    def get_passage(self, book_id, chapter, first=1, last=255):
+        """[(verse, text)] for a verse range; the defaults cover the whole chapter."""
+        start, end = self.passage_range(book_id, chapter, first, last)
+        return [(self._keys[i] & 0xFF, self.text_at(i)) for i in range(start, end)]
+
+    def iter_verses(self):
+        """Yield (book_id, chapter, verse, text) in canonical order."""
+        for i in range(self.count):
+            yield (*split_key(self._keys[i]), self.text_at(i))
+
+    def close(self):
+        for view in (self._keys, self._offsets, self._blob, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+
+def write_store(path, verses):
+    """Write (book_id, chapter, verse, text) rows to a store file."""
+    rows = sorted((verse_key(b, c, v), text) for b, c, v, text in verses)
+
+    keys = array("I")
+    offsets = array("I")
+    blob = bytearray()
+    last_key = None
+    for key, text in rows:
+        if key == last_key:
+            raise ValueError(f"Duplicate verse {split_key(key)}")
+        last_key = key
+        keys.append(key)
+        offsets.append(len(blob))
+        blob += " ".join(text.split()).encode("utf-8")
+    offsets.append(len(blob))
+
+    if sys.byteorder != "little":
+        keys.byteswap()
+        offsets.byteswap()
+
+    text_at = HEADER_SIZE + 4 * len(keys) + 4 * len(offsets)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", len(keys), text_at))
+        f.write(keys.tobytes())
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(version="WEB"):
+    """Shared store for a translation, or None if its file isn't installed.
+
+    Missing and unreadable files aren't remembered, so a store built (or fixed)
+    while the app runs is picked up.
+    """
+    version = version.upper()
+    if version in _stores:
+        return _stores[version]
+
+    path = store_path(version)
+    if not os.path.exists(path):
+        return None
+    with _stores_lock:
+        if version not in _stores:
+            try:
+                _stores[version] = BibleStore(path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Bible store error: {e}")
+                return None
+    return _stores[version]
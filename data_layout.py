@@ -0,0 +1,186 @@
+# data_layout.py - Where each user's files live under the data directory (NO STREAMLIT)
+#
+# Users are fanned out by a hash of their id: <root>/ab/cd/<user_id>, where
+# "abcd" are the first hex digits of sha1(user_id). The 65,536 leaf folders keep
+# every directory small even at millions of users, which filesystems without
+# hashed directory indexes need (ext3 also stops at 32,000 subfolders). It is
+# not faster on ext4, where tools/bench_user_data.py measured opens and full
+# scans slightly slower than the flat layout at 10^6 users. <root>/manifest.json
+# records the layout so a future change can be detected instead of guessed.
+#
+# Folders from the old flat layout (<root>/<user_id>) are moved into place the
+# first time their user is opened, so the migration happens online;
+# tools/migrate_user_data.py moves the rest in bulk. If the user already has a
+# sharded folder the old files are moved into it, and a file that exists in both
+# stops the user from opening until someone merges them. A flat-layout folder
+# whose name is two hex digits can't be told apart from a shard and is left alone.
+import errno
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+LAYOUT = "sha1-2x2"
+MANIFEST = "manifest.json"
+
+_SHARD = re.compile(r"[0-9a-f]{2}")
+
+_checked_roots = set()
+_lock = threading.Lock()
+
+
+def data_root(root=None):
+    """The data directory: `root`, else MYGROW_DATA_DIR, else "user_data"."""
+    return root or os.getenv("MYGROW_DATA_DIR", "user_data")
+
+
+def shard_path(user_id, root=None):
+    """<root>/ab/cd/<user_id> for a user id."""
+    digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+    return os.path.join(data_root(root), digest[:2], digest[2:4], user_id)
+
+
+def user_dir(user_id, root=None):
+    """The user's folder (it may not exist yet), moving flat-layout files into place first.
+
+    Raises ValueError if the same file exists in both layouts (see migrate_user).
+    """
+    root = data_root(root)
+    check_layout(root)
+    migrate_user(user_id, root)
+    return shard_path(user_id, root)
+
+
+def migrate_user(user_id, root=None):
+    """Move <root>/<user_id> to its shard. True if this call moved anything.
+
+    When the shard folder already exists, the old files are moved into it one by
+    one. A file present in both is left where it is and ValueError is raised, so
+    the user's older entries are never hidden behind the newer folder.
+    """
+    root = data_root(root)
+    legacy = os.path.join(root, user_id)
+    if _SHARD.fullmatch(user_id) or not os.path.isdir(legacy):
+        return False
+    target = shard_path(user_id, root)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.rename(legacy, target)
+        return True
+    except FileNotFoundError:
+        # Another process or thread moved it first
+        return False
+    except OSError as e:
+        if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+            print(f"⚠️ User data migration error for {user_id}: {e}")
+            return False
+    return _merge_into(user_id, legacy, target)
+
+
+def _merge_into(user_id, legacy, target):
+    """Move a flat-layout folder's files into an existing shard folder."""
+    moved = False
+    conflicts = []
+    for name in _listdir(legacy):
+        source = os.path.join(legacy, name)
+        if name == ".lock":
+            # Lock files carry no data
+            _remove(source)
+            continue
+        if os.path.exists(os.path.join(target, name)):
+            conflicts.append(name)
+            continue
+        try:
+            os.rename(source, os.path.join(target, name))
+            moved = True
+        except FileNotFoundError:
+            pass
+    if conflicts:
+        raise ValueError(f"User {user_id} has {', '.join(sorted(conflicts))} in both {legacy} and {target}; "
+                         f"merge them by hand")
+    try:
+        os.rmdir(legacy)
+    except OSError:
+        pass
+    return moved
+
+
+def _listdir(path):
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def legacy_users(root=None):
+    """User ids still in the flat layout."""
+    root = data_root(root)
+    try:
+        with os.scandir(root) as entries:
+            return [entry.name for entry in entries if entry.is_dir() and not _SHARD.fullmatch(entry.name)]
+    except FileNotFoundError:
+        return []
+
+
+def iter_users(root=None):
+    """Every user id with a folder, sharded or not yet migrated."""
+    root = data_root(root)
+    for first in _subdirs(root):
+        if not _SHARD.fullmatch(first):
+            yield first
+            continue
+        for second in _subdirs(os.path.join(root, first)):
+            yield from _subdirs(os.path.join(root, first, second))
+
+
+def _subdirs(path):
+    try:
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return []
+
+
+def read_manifest(root=None):
+    """The layout manifest, or None if the data directory has none yet."""
+    try:
+        with open(os.path.join(data_root(root), MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(root, manifest):
+    """Replace the manifest in one step, so readers never see half of it."""
+    root = data_root(root)
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, MANIFEST)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def check_layout(root=None):
+    """Create the manifest on first use; refuse a data directory laid out some other way."""
+    root = data_root(root)
+    if root in _checked_roots:
+        return
+    with _lock:
+        if root in _checked_roots:
+            return
+        manifest = read_manifest(root)
+        if manifest is None:
+            write_manifest(root, {"layout": LAYOUT, "created_at": time.time()})
+        elif manifest.get("layout") != LAYOUT:
+            raise ValueError(f"{root} uses layout {manifest.get('layout')!r}, expected {LAYOUT!r}")
+        _checked_roots.add(root)
@@ -0,0 +1,201 @@
+# http_api.py - Local JSON API over service.py (NO STREAMLIT)
+#
+# A plain WSGI app on the standard library, for load tests and scripting:
+#
+#   GET  /health
+#   POST /analyze                       {"journal_text"}
+#   GET  /users/<id>/entries            ?limit=N&month=YYYY-MM
+#   POST /users/<id>/entries            {"journal_text", "analysis"?}  (analyzes when omitted)
+#   GET  /users/<id>/entries/search     ?q=words&limit=N
+#   GET  /users/<id>/dashboard
+#   GET  /verses                        ?ref=John+3:16&version=WEB
+#   GET  /scripture/search              ?q=words&k=N&version=WEB
+#
+# Usage:
+#   python http_api.py --port 8600 --workers 4
+#
+# With --workers N (Linux/macOS) N processes bind the same port with SO_REUSEPORT
+# and the kernel spreads connections across them; each process serves requests on
+# threads.
+import argparse
+import json
+import os
+import socket
+import sys
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import service
+
+MAX_BODY_BYTES = 1_000_000
+
+_STATUS = {200: "200 OK", 201: "201 Created", 400: "400 Bad Request", 404: "404 Not Found",
+           405: "405 Method Not Allowed", 413: "413 Payload Too Large", 500: "500 Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _query(environ):
+    return {key: values[-1] for key, values in parse_qs(environ.get("QUERY_STRING", "")).items()}
+
+
+def _int(query, name, default=None):
+    try:
+        return int(query[name]) if name in query else default
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+
+
+def _body(environ):
+    try:
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    if length < 0:
+        # read(-1) would read until the client hangs up, past the size cap
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    try:
+        body = json.loads(environ["wsgi.input"].read(length) or b"{}")
+    except ValueError:
+        raise HTTPError(400, "Body must be JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "Body must be a JSON object")
+    return body
+
+
+def _journal_text(body):
+    text = body.get("journal_text")
+    if not isinstance(text, str) or not text.strip():
+        raise HTTPError(400, "journal_text is required")
+    return text
+
+
+def route(method, parts, environ):
+    """(status, payload) for one request."""
+    query = _query(environ)
+
+    if parts == ["health"]:
+        return 200, {"status": "ok", "pid": os.getpid()}
+
+    if parts == ["analyze"]:
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+        return 200, service.analyze(_journal_text(_body(environ)))
+
+    if parts == ["verses"]:
+        passage = service.lookup_verse(query.get("ref", ""), query.get("version", "WEB"))
+        if passage is None:
+            raise HTTPError(404, "Verse not found")
+        return 200, passage
+
+    if parts == ["scripture", "search"]:
+        results = service.search_scripture(query.get("q", ""), query.get("version", "WEB"), _int(query, "k", 10))
+        if results is None:
+            raise HTTPError(404, "Scripture search index is not installed")
+        return 200, {"results": results}
+
+    if len(parts) >= 3 and parts[0] == "users":
+        user_id, rest = parts[1], parts[2:]
+        if rest == ["entries"] and method == "POST":
+            body = _body(environ)
+            analysis = body.get("analysis")
+            if analysis is not None and not isinstance(analysis, dict):
+                raise HTTPError(400, "analysis must be an object")
+            return 201, service.save_entry(user_id, _journal_text(body), analysis)
+        if method != "GET":
+            raise HTTPError(405, "Use GET")
+        if rest == ["entries"]:
+            return 200, {"entries": service.list_entries(user_id, _int(query, "limit"), query.get("month"))}
+        if rest == ["entries", "search"]:
+            return 200, {"entries": service.search_entries(user_id, query.get("q", ""), _int(query, "limit", 50))}
+        if rest == ["dashboard"]:
+            return 200, service.dashboard_model(user_id)
+
+    raise HTTPError(404, "Not found")
+
+
+def app(environ, start_response):
+    """WSGI entry point."""
+    method = environ.get("REQUEST_METHOD", "GET")
+    parts = [part for part in environ.get("PATH_INFO", "").split("/") if part]
+    try:
+        status, payload = route(method, parts, environ)
+    except HTTPError as e:
+        status, payload = e.status, {"error": str(e)}
+    except ValueError as e:
+        status, payload = 400, {"error": str(e)}
+    except Exception as e:
+        print(f"⚠️ API error: {e}")
+        status, payload = 500, {"error": "Internal error"}
+
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    start_response(_STATUS[status], [("Content-Type", "application/json; charset=utf-8"),
+                                     ("Content-Length", str(len(data)))])
+    return [data]
+
+
+class _Server(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    reuse_port = False
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8600, workers=1, quiet=False):
+    """Serve the API; with workers > 1, fork that many processes sharing the port."""
+    handler = _QuietHandler if quiet else WSGIRequestHandler
+    _Server.reuse_port = workers > 1
+    if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        sys.exit("--workers needs SO_REUSEPORT (Linux or macOS)")
+
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            children = None
+            break
+        children.append(pid)
+
+    server = make_server(host, port, app, server_class=_Server, handler_class=handler)
+    if children is not None:
+        print(f"MyGrow API on http://{host}:{port} ({workers} worker{'s' if workers > 1 else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for pid in children or ():
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MyGrow local JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1, help="Processes sharing the port (SO_REUSEPORT)")
+    parser.add_argument("--quiet", action="store_true", help="Don't log each request")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.quiet)
+
+
+if __name__ == "__main__":
+    main()
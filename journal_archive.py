@@ -0,0 +1,590 @@
+# journal_archive.py - Per-user journal archive on disk (NO STREAMLIT)
+#
+# Each user has a folder under MYGROW_DATA_DIR (default "user_data", sharded as
+# described in data_layout.py) holding journal_entries.json, user_patterns.json
+# and growth_timeline.json. The folder is created by the first write, so opening
+# an archive for a visitor who never saves anything leaves nothing behind. An archive
+# object keeps the parsed files and anything derived from them in memory until
+# its next write, so one object per user should be shared (the app caches it with
+# st.cache_resource, service.py keeps a dict). refresh() picks up writes made by
+# other processes; files are replaced whole, so a reader never sees half a write.
+import copy
+import datetime
+import json
+import os
+import threading
+from collections import Counter
+
+import profiler
+from data_layout import user_dir
+from scripture_refs import book_name, format_reference, parse_reference
+
+
+def _timestamp_key(timestamp):
+    """Sort key for an ISO timestamp ("Z" suffix allowed); unparseable ones sort first."""
+    try:
+        return datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return float("-inf")
+
+
+def _signature(stat):
+    """What refresh() compares; every write swaps in a new inode, so it changes even within one mtime tick."""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class JournalArchive:
+    def __init__(self, user_id, data_root=None):
+        # User-specific data directory (created on first write)
+        self.user_id = user_id
+        self.data_dir = user_dir(user_id, data_root)
+        
+        # MODIFIED: All file paths are now inside the user's folder
+        self.entries_file = os.path.join(self.data_dir, "journal_entries.json")
+        self.patterns_file = os.path.join(self.data_dir, "user_patterns.json")
+        self.timeline_file = os.path.join(self.data_dir, "growth_timeline.json")
+        
+        # Parsed files and results derived from them, kept until the next write.
+        # Every write goes through this object and bumps `version`, so reruns
+        # with no new data are served from memory.
+        self.version = 0
+        self._lock = threading.RLock()
+        self._files = {}
+        self._signatures = {}
+        self._derived = {}
+    
+    def _read(self, path, default):
+        """Parsed contents of a data file, read from disk only once."""
+        with self._lock:
+            if path not in self._files:
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                        self._signatures[path] = _signature(os.fstat(f.fileno()))
+                    profiler.count_read(len(data))
+                    self._files[path] = json.loads(data)
+                except FileNotFoundError:
+                    # Nothing saved yet: remember that, so reruns don't keep looking
+                    self._files[path] = default
+                    self._signatures[path] = None
+                except (OSError, ValueError):
+                    return default
+            return self._files[path]
+    
+    def _write(self, path, data):
+        """Write a data file and invalidate everything derived from the archive."""
+        with self._lock:
+            os.makedirs(self.data_dir, exist_ok=True)
+            # Write aside and swap in, so another process never reads a half-written file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            self._files[path] = data
+            self._signatures[path] = _signature(os.stat(path))
+            self.version += 1
+            self._derived.clear()
+    
+    def refresh(self):
+        """Forget files another process has rewritten since we read them (one stat per file)."""
+        with self._lock:
+            for path in list(self._files):
+                try:
+                    signature = _signature(os.stat(path))
+                except OSError:
+                    signature = None
+                if signature != self._signatures.get(path):
+                    del self._files[path]
+                    self.version += 1
+                    self._derived.clear()
+    
+    def invalidate(self):
+        """Forget every cached file, so the next read comes from disk whatever the timestamps say."""
+        with self._lock:
+            self._files.clear()
+            self._signatures.clear()
+            self.version += 1
+            self._derived.clear()
+    
+    def _derive(self, key, compute):
+        """Memoize a derived result under (key, archive version)."""
+        with self._lock:
+            cached = self._derived.get(key)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            version = self.version
+        value = compute()
+        with self._lock:
+            if self.version == version:
+                self._derived[key] = (version, value)
+        return value
+    
+    def save_entry(self, journal_text, analysis_result):
+        """Save a complete journal entry with analysis."""
+        entry_id = str(datetime.datetime.now().timestamp())
+        
+        entry = {
+            "id": entry_id,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "date": datetime.datetime.now().strftime("%Y-%m-%d"),
+            "journal_text": journal_text,
+            "analysis": analysis_result,
+            "themes": analysis_result.get("primary_themes", []),
+            "emotions": analysis_result.get("emotional_state", []),
+            "bible_passages": analysis_result.get("bible_passages", []),
+            "practical_steps": analysis_result.get("practical_steps", []),
+            "word_count": len(journal_text.split())
+        }
+        
+        with self._lock:
+            # Add the new entry to a copy so readers never see a half-written list
+            entries = self.get_entries()
+            entries.append(entry)
+            self._write(self.entries_file, entries)
+            
+            # Update patterns and timeline
+            self._update_patterns(entries)
+            self._update_timeline(entry)
+        
+        return entry
+    
+    def _update_patterns(self, entries):
+        """Analyze patterns across all entries."""
+        if not entries:
+            return
+        
+        # Collect data
+        all_themes = []
+        all_emotions = []
+        all_verses = []
+        
+        for entry in entries:
+            all_themes.extend(entry.get("themes", []))
+            all_emotions.extend(entry.get("emotions", []))
+            for passage in entry.get("bible_passages", []):
+                # "Psalm 23:1" and "Psalms 23:1 " count as the same verse
+                reference = passage.get("reference", "")
+                parsed = parse_reference(reference)
+                all_verses.append(format_reference(parsed) if parsed else reference.strip())
+        
+        # Calculate frequencies
+        theme_counter = Counter(all_themes)
+        emotion_counter = Counter(all_emotions)
+        verse_counter = Counter(all_verses)
+        
+        # Writing patterns
+        word_counts = [e.get("word_count", 0) for e in entries]
+        avg_word_count = sum(word_counts) / len(word_counts) if word_counts else 0
+        
+        # Build patterns object
+        patterns = {
+            "last_updated": datetime.datetime.now().isoformat(),
+            "total_entries": len(entries),
+            "theme_patterns": {
+                "most_common": dict(theme_counter.most_common(10)),  # Changed from 5 to 10
+                "all_frequencies": dict(theme_counter)
+            },
+            "emotion_patterns": {
+                "most_common": dict(emotion_counter.most_common(5)),
+                "trends": self._detect_emotion_trends(entries)
+            },
+            "bible_patterns": {
+                "most_referenced": dict(verse_counter.most_common(5)),
+                "favorite_books": self._analyze_bible_books(all_verses)
+            },
+            "writing_patterns": {
+                "average_length": avg_word_count,
+                "frequency_days": self._calculate_frequency(entries)
+            },
+            "growth_indicators": self._calculate_growth_indicators(entries)
+        }
+        
+        # Save patterns
+        self._write(self.patterns_file, patterns)
+    
+    def _detect_emotion_trends(self, entries):
+        """Detect emotion trends over time."""
+        if len(entries) < 2:
+            return {}
+        
+        # Group by week
+        weekly_emotions = {}
+        for entry in entries:
+            date = datetime.datetime.fromisoformat(entry["timestamp"])
+            week_key = f"{date.year}-W{date.isocalendar()[1]:02d}"
+            
+            if week_key not in weekly_emotions:
+                weekly_emotions[week_key] = []
+            
+            weekly_emotions[week_key].extend(entry.get("emotions", []))
+        
+        # Calculate most common per week
+        trends = {}
+        for week, emotions in weekly_emotions.items():
+            if emotions:
+                counter = Counter(emotions)
+                trends[week] = counter.most_common(2)
+        
+        return trends
+    
+    def _analyze_bible_books(self, verses):
+        """Analyze which Bible books are most referenced."""
+        books = []
+        for verse in verses:
+            # Parsed, so "1 Corinthians 13:4" counts as "1 Corinthians" rather than "1"
+            parsed = parse_reference(verse)
+            if parsed:
+                books.append(book_name(parsed.book_id))
+        
+        return dict(Counter(books).most_common(5)) if books else {}
+    
+    def _calculate_frequency(self, entries):
+        """Calculate journaling frequency."""
+        if len(entries) < 2:
+            return "Just starting"
+        
+        dates = sorted([e["date"] for e in entries])
+        first_date = datetime.datetime.strptime(dates[0], "%Y-%m-%d")
+        last_date = datetime.datetime.strptime(dates[-1], "%Y-%m-%d")
+        days_diff = (last_date - first_date).days + 1
+        
+        freq = len(entries) / days_diff
+        
+        if freq >= 0.7:
+            return "Daily writer"
+        elif freq >= 0.3:
+            return "Regular writer"
+        elif freq >= 0.14:
+            return "Weekly writer"
+        else:
+            return "Occasional writer"
+    
+    def _calculate_growth_indicators(self, entries):
+        """Calculate growth indicators."""
+        if len(entries) < 3:
+            return {"stage": "Beginning", "indicators": []}
+        
+        recent = entries[-3:]  # Last 3 entries
+        older = entries[:3]    # First 3 entries
+        
+        # Compare themes
+        recent_themes = set()
+        older_themes = set()
+        
+        for entry in recent:
+            recent_themes.update(entry.get("themes", []))
+        for entry in older:
+            older_themes.update(entry.get("themes", []))
+        
+        indicators = []
+        
+        if len(recent_themes) > len(older_themes):
+            indicators.append("Exploring more spiritual themes")
+        
+        # Check for action steps
+        action_words = ["completed", "done", "finished", "accomplished", "achieved"]
+        recent_text = " ".join([e["journal_text"].lower() for e in recent])
+        if any(word in recent_text for word in action_words):
+            indicators.append("Taking practical steps forward")
+        
+        # Check for gratitude
+        gratitude_words = ["thank", "grateful", "appreciate", "blessed", "thankful"]
+        recent_gratitude = sum(1 for word in gratitude_words if word in recent_text)
+        older_text = " ".join([e["journal_text"].lower() for e in older])
+        older_gratitude = sum(1 for word in gratitude_words if word in older_text)
+        
+        if recent_gratitude > older_gratitude:
+            indicators.append("Growing in gratitude")
+        
+        return {
+            "stage": "Growing" if indicators else "Developing",
+            "indicators": indicators,
+            "theme_diversity_increase": len(recent_themes) - len(older_themes)
+        }
+    
+    def _update_timeline(self, new_entry):
+        """Update growth timeline with milestone detection."""
+        timeline = self.get_timeline()
+        
+        # Detect milestones
+        milestones = self._detect_milestones(new_entry, timeline)
+        
+        for milestone in milestones:
+            timeline.append({
+                "timestamp": new_entry["timestamp"],
+                "type": milestone["type"],
+                "description": milestone["description"],
+                "entry_id": new_entry["id"]
+            })
+        
+        # Keep only last 20 milestones
+        if len(timeline) > 20:
+            timeline = timeline[-20:]
+        
+        self._write(self.timeline_file, timeline)
+    
+    def _detect_milestones(self, entry, existing_timeline):
+        """Detect growth milestones in new entry."""
+        milestones = []
+        existing_types = [m["type"] for m in existing_timeline]
+        
+        # Longest entry
+        if entry.get("word_count", 0) > 300 and "long_reflection" not in existing_types:
+            milestones.append({
+                "type": "long_reflection",
+                "description": f"Deep reflection ({entry['word_count']} words)"
+            })
+        
+        # New theme
+        entry_themes = set(entry.get("themes", []))
+        if entry_themes and "new_theme" not in existing_types:
+            milestones.append({
+                "type": "new_theme",
+                "description": f"Exploring new theme: {list(entry_themes)[0]}"
+            })
+        
+        # Bible engagement
+        bible_passages = entry.get("bible_passages", [])
+        if len(bible_passages) >= 2 and "scripture_engagement" not in existing_types:
+            milestones.append({
+                "type": "scripture_engagement",
+                "description": "Engaging deeply with Scripture"
+            })
+        
+        # 5th entry milestone
+        entries = self.get_entries()
+        if len(entries) == 5 and "five_entries" not in existing_types:
+            milestones.append({
+                "type": "five_entries",
+                "description": "Completed 5 journal entries - building a habit!"
+            })
+        
+        return milestones
+    
+    def get_entries(self, limit=None):
+        """Get journal entries, optionally limited."""
+        # A new list each call, so callers can sort or filter it freely
+        entries = self._read(self.entries_file, [])
+        if limit:
+            return entries[-limit:]
+        return list(entries)
+    
+    # ============================================
+    # NEW: MONTH FILTERING METHODS - ADDED TO FIX JANUARY 2026 ISSUE
+    # ============================================
+    
+    def _entries_by_month(self):
+        """Entries grouped by month (YYYY-MM), built in one pass per archive version."""
+        def group():
+            months = {}
+            for entry in self._read(self.entries_file, []):
+                entry_date = entry.get("date", "")
+                
+                # Parse date - assuming format "YYYY-MM-DD"
+                if "-" in entry_date:
+                    parts = entry_date.split("-")
+                    if len(parts) >= 2:
+                        months.setdefault(f"{parts[0]}-{parts[1]}", []).append(entry)
+            return months
+        
+        return self._derive(("entries_by_month",), group)
+    
+    def get_entry(self, entry_id):
+        """The full entry with this id, or None."""
+        def index():
+            return {entry.get("id"): entry for entry in self._read(self.entries_file, [])}
+        
+        entry = self._derive(("entries_by_id",), index).get(entry_id)
+        return dict(entry) if entry is not None else None
+    
+    def get_entry_summaries(self):
+        """Lightweight rows for the archive list, oldest first (no journal text or analysis)."""
+        return self._derive(("entry_summaries",), self._build_entry_summaries)
+    
+    def _build_entry_summaries(self):
+        rows = []
+        for entry in self._read(self.entries_file, []):
+            text = entry.get("journal_text", "")
+            rows.append({
+                "id": entry.get("id"),
+                "timestamp": entry.get("timestamp", ""),
+                "date": entry.get("date", ""),
+                "themes": ", ".join(entry.get("themes", [])),
+                "emotions": ", ".join(entry.get("emotions", [])),
+                "words": entry.get("word_count", 0),
+                "passages": len(entry.get("bible_passages", [])),
+                "preview": text[:80] + "..." if len(text) > 80 else text
+            })
+        rows.sort(key=lambda row: _timestamp_key(row["timestamp"]))
+        return rows
+    
+    def get_theme_counts(self, limit=10):
+        """[(theme, entries tagged with it)] for the most common themes, most common first."""
+        def count():
+            return Counter(theme for entry in self._read(self.entries_file, []) for theme in entry.get("themes", []))
+        
+        return self._derive(("theme_counts",), count).most_common(limit)
+    
+    def search_entries(self, query):
+        """Entries whose text, themes or emotions contain the query (case-insensitive)."""
+        query = query.lower()
+        return [
+            e for e in self._read(self.entries_file, [])
+            if (query in e.get("journal_text", "").lower() or
+                any(query in theme.lower() for theme in e.get("themes", [])) or
+                any(query in emotion.lower() for emotion in e.get("emotions", [])))
+        ]
+    
+    def get_entries_by_year_month(self, year_month: str):
+        """Get entries for a specific month (format: '2026-01')."""
+        return list(self._entries_by_month().get(year_month, []))
+    
+    def get_all_months_with_entries(self):
+        """Get list of all months with entries (YYYY-MM format)."""
+        # Sort descending (most recent first)
+        return sorted(self._entries_by_month(), reverse=True)
+    
+    def get_monthly_summary(self, year_month: str):
+        """Get detailed summary for a specific month."""
+        return self._derive(("monthly_summary", year_month), lambda: self._build_monthly_summary(year_month))
+    
+    def _build_monthly_summary(self, year_month):
+        entries = self._entries_by_month().get(year_month, [])
+        
+        if not entries:
+            return {
+                "month": year_month,
+                "entry_count": 0,
+                "top_themes": {},
+                "top_emotions": {},
+                "average_words": 0,
+                "unique_scriptures": 0
+            }
+        
+        # Collect data
+        all_themes = []
+        all_emotions = []
+        word_counts = []
+        bible_verses = []
+        
+        for entry in entries:
+            all_themes.extend(entry.get("themes", []))
+            all_emotions.extend(entry.get("emotions", []))
+            word_counts.append(entry.get("word_count", 0))
+            for passage in entry.get("bible_passages", []):
+                bible_verses.append(passage.get("reference", ""))
+        
+        # Calculate stats
+        theme_counter = Counter(all_themes)
+        emotion_counter = Counter(all_emotions)
+        
+        return {
+            "month": year_month,
+            "entry_count": len(entries),
+            "top_themes": dict(theme_counter.most_common(5)),  # Show top 5 themes per month
+            "top_emotions": dict(emotion_counter.most_common(3)),
+            "average_words": sum(word_counts) // len(word_counts) if word_counts else 0,
+            "unique_scriptures": len(set(bible_verses)),
+            "first_entry_date": entries[0].get("date"),
+            "last_entry_date": entries[-1].get("date")
+        }
+    
+    def get_monthly_summaries(self):
+        """Get summaries for all months with entries."""
+        months = self.get_all_months_with_entries()
+        return [self.get_monthly_summary(month) for month in months]
+    
+    def backfill_detected_themes(self):
+        """Recompute detected themes for every archived entry."""
+        from ai_analyzer import backfill_detected_themes
+        
+        with self._lock:
+            # Fresh entry and analysis dicts: the cached ones are shared with every reader
+            entries = [
+                dict(entry, analysis=dict(entry["analysis"])) if isinstance(entry.get("analysis"), dict) else entry
+                for entry in self._read(self.entries_file, [])
+            ]
+            updated = backfill_detected_themes(entries)
+            if updated:
+                self._write(self.entries_file, entries)
+        return updated
+    
+    def get_patterns(self):
+        """Get analyzed patterns (a copy; the cached patterns are shared)."""
+        return copy.deepcopy(self._read(self.patterns_file, {}))
+    
+    def get_timeline(self):
+        """Get growth timeline (a copy; the cached timeline is shared)."""
+        return [dict(item) for item in self._read(self.timeline_file, [])]
+    
+    def get_summary_insights(self):
+        """Generate summary insights for the user."""
+        return self._derive(("summary_insights",), self._build_summary_insights)
+    
+    def _build_summary_insights(self):
+        patterns = self.get_patterns()
+        entries = self.get_entries()
+        
+        if not entries:
+            return {
+                "total_entries": 0,
+                "insights": ["Welcome to your spiritual journey!"],
+                "next_suggestion": "Write your first reflection to begin tracking your growth."
+            }
+        
+        # Build insights
+        insights = []
+        
+        # Theme insights
+        common_themes = patterns.get("theme_patterns", {}).get("most_common", {})
+        if common_themes:
+            themes_list = list(common_themes.items())
+            if themes_list:
+                top_theme, top_count = themes_list[0]
+                insights.append(f"Your spiritual heart centers on **{top_theme}** (appeared {top_count} times)")
+                
+                # Add secondary theme insight if available
+                if len(themes_list) > 1:
+                    second_theme, second_count = themes_list[1]
+                    insights.append(f"Secondary focus: **{second_theme}** ({second_count} occurrences)")
+        
+        # Growth indicators
+        growth = patterns.get("growth_indicators", {})
+        if growth.get("indicators"):
+            insights.extend([f"✓ {ind}" for ind in growth["indicators"]])
+        
+        # Writing pattern
+        writing = patterns.get("writing_patterns", {})
+        insights.append(f"Writing rhythm: **{writing.get('frequency_days', 'developing')}**")
+        
+        # Bible engagement
+        bible = patterns.get("bible_patterns", {})
+        top_book = list(bible.get("favorite_books", {}).keys())[0] if bible.get("favorite_books") else None
+        if top_book:
+            insights.append(f"Most engaged Scripture: **{top_book}**")
+        
+        return {
+            "total_entries": len(entries),
+            "insights": insights[:4],  # Show up to 4 insights
+            "next_suggestion": self._get_next_suggestion(patterns)
+        }
+    
+    def _get_next_suggestion(self, patterns):
+        """Get personalized suggestion for growth."""
+        total = patterns.get("total_entries", 0)
+        
+        if total < 3:
+            return "Try exploring different spiritual themes in your next reflection."
+        elif total < 10:
+            common_themes = patterns.get("theme_patterns", {}).get("most_common", {})
+            if common_themes and len(common_themes) >= 2:
+                themes = list(common_themes.keys())
+                return f"Consider how **{themes[0]}** and **{themes[1]}** connect in your spiritual journey."
+            return "Reflect on how your understanding has evolved since you started journaling."
+        else:
+            common_themes = patterns.get("theme_patterns", {}).get("most_common", {})
+            if common_themes:
+                theme = list(common_themes.keys())[0]
+                return f"Your deep focus on **{theme}** shows spiritual maturity. What new aspect of this theme could you explore?"
+        
+        return "Your consistent journaling reveals a beautiful spiritual journey. Keep listening to your heart."
@@ -0,0 +1,264 @@
+# metrics.py - Pluggable counters and timings for the app's hot paths (NO STREAMLIT)
+#
+# Pick sinks with MYGROW_METRICS (comma separated):
+#   memory                       - keep counters/percentiles in process (default)
+#   log                          - one log line per metric via the "mygrow.metrics" logger
+#   prometheus:/path/to/file.prom - Prometheus text file for the node_exporter textfile collector
+import atexit
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    """No-op metrics sink; subclasses override incr() and observe()."""
+
+    def incr(self, name, value=1, **labels):
+        """Add to a counter."""
+
+    def observe(self, name, value, **labels):
+        """Record one sample (a timing in ms, a token count, a size)."""
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of a block in milliseconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000, **labels)
+
+
+class InMemoryMetrics(Metrics):
+    """Counters plus a bounded window of samples per series, for percentiles."""
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._counters = {}
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.window)
+                self._totals[key] = [0, 0.0]
+            self._samples[key].append(value)
+            self._totals[key][0] += 1
+            self._totals[key][1] += value
+
+    def counter(self, name, **labels):
+        """Current value of a counter."""
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def percentile(self, name, pct, **labels):
+        """Percentile of the recent samples of a series, or None."""
+        with self._lock:
+            samples = sorted(self._samples.get((name, _label_key(labels)), ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+    def snapshot(self):
+        """Plain-dict view: counters plus count/sum/p50/p95/p99 per series."""
+        with self._lock:
+            counters = dict(self._counters)
+            series = {key: (sorted(samples), tuple(self._totals[key])) for key, samples in self._samples.items()}
+
+        def label_name(name, labels):
+            return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+        summaries = {}
+        for (name, labels), (samples, (count, total)) in series.items():
+            summaries[label_name(name, labels)] = {
+                "count": count,
+                "sum": round(total, 3),
+                "p50": samples[int(len(samples) * 0.50)],
+                "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            }
+        return {
+            "counters": {label_name(name, labels): value for (name, labels), value in counters.items()},
+            "summaries": summaries
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+            self._totals.clear()
+
+
+class LogMetrics(Metrics):
+    """Emit every metric as a log line."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("mygrow.metrics")
+        self.level = level
+
+    def _log(self, kind, name, value, labels):
+        if self.logger.isEnabledFor(self.level):
+            extra = " ".join(f"{k}={v}" for k, v in sorted(labels.items()))
+            self.logger.log(self.level, "%s %s=%s %s", kind, name, round(value, 3), extra)
+
+    def incr(self, name, value=1, **labels):
+        self._log("counter", name, value, labels)
+
+    def observe(self, name, value, **labels):
+        self._log("sample", name, value, labels)
+
+
+class PrometheusFileMetrics(InMemoryMetrics):
+    """In-memory metrics periodically written as a Prometheus text file.
+
+    Counters become `mygrow_<name>_total`; samples become summaries with
+    0.5/0.95/0.99 quantiles over the recent window.
+    """
+
+    def __init__(self, path, flush_interval=10.0, window=1024):
+        super().__init__(window)
+        self.path = path
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def incr(self, name, value=1, **labels):
+        super().incr(name, value, **labels)
+        self._maybe_flush()
+
+    def observe(self, name, value, **labels):
+        super().observe(name, value, **labels)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def render(self):
+        """Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            series = sorted(
+                (key, sorted(samples), tuple(self._totals[key])) for key, samples in self._samples.items()
+            )
+
+        def metric_name(name):
+            return "mygrow_" + _NAME_CHARS.sub("_", name)
+
+        def labels_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in pairs) + "}"
+
+        lines = []
+        declared = set()
+        for (name, labels), value in counters:
+            metric = metric_name(name) + "_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{labels_text(labels)} {value}")
+
+        for (name, labels), samples, (count, total) in series:
+            metric = metric_name(name)
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} summary")
+                declared.add(metric)
+            for q in (0.5, 0.95, 0.99):
+                value = samples[min(len(samples) - 1, int(len(samples) * q))]
+                lines.append(f"{metric}{labels_text(labels, [('quantile', q)])} {value}")
+            lines.append(f"{metric}_sum{labels_text(labels)} {total}")
+            lines.append(f"{metric}_count{labels_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Atomically rewrite the metrics file."""
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(self.render())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ Metrics write error: {e}")
+
+
+class FanoutMetrics(Metrics):
+    """Send every metric to several sinks."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def incr(self, name, value=1, **labels):
+        for sink in self.sinks:
+            sink.incr(name, value, **labels)
+
+    def observe(self, name, value, **labels):
+        for sink in self.sinks:
+            sink.observe(name, value, **labels)
+
+
+def metrics_from_spec(spec):
+    """Build a sink from a MYGROW_METRICS-style spec string."""
+    sinks = []
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        kind, _, arg = part.partition(":")
+        kind = kind.lower()
+        if kind == "memory":
+            sinks.append(InMemoryMetrics())
+        elif kind == "log":
+            sinks.append(LogMetrics())
+        elif kind in ("prometheus", "prom"):
+            sinks.append(PrometheusFileMetrics(arg or "metrics/mygrow.prom"))
+        elif kind in ("none", "off"):
+            continue
+        else:
+            print(f"⚠️ Unknown metrics sink: {part}")
+    if not sinks:
+        return Metrics()
+    return sinks[0] if len(sinks) == 1 else FanoutMetrics(*sinks)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Process-wide metrics sink (configured from MYGROW_METRICS on first use)."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = metrics_from_spec(os.getenv("MYGROW_METRICS", "memory"))
+    return _metrics
+
+
+def set_metrics(metrics):
+    """Replace the process-wide metrics sink (tests, benchmarks, custom backends)."""
+    global _metrics
+    _metrics = metrics
+    return metrics
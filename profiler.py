@@ -0,0 +1,58 @@
+# profiler.py - Opt-in per-rerun render profiler (NO STREAMLIT)
+#
+# Enabled with ?profile=1 in the URL or MYGROW_PROFILE=1 in the environment.
+# The app calls start() at the top of every rerun and mark(name) at the end of
+# each section; a mark records the time since the previous one. Data-file reads
+# report themselves through count_read(). State is per thread, because Streamlit
+# runs each session's script in its own thread. When profiling is off every call
+# is one attribute lookup.
+import os
+import threading
+import time
+
+_state = threading.local()
+
+
+def start(requested=False):
+    """Begin profiling this rerun if it was requested (or MYGROW_PROFILE=1)."""
+    if requested or os.getenv("MYGROW_PROFILE") == "1":
+        now = time.perf_counter()
+        _state.profile = {"started": now, "last": now, "sections": [], "reads": 0, "bytes": 0}
+    else:
+        _state.profile = None
+
+
+def enabled():
+    return getattr(_state, "profile", None) is not None
+
+
+def mark(section):
+    """Close a section: everything since the previous mark is charged to it."""
+    profile = getattr(_state, "profile", None)
+    if profile is None:
+        return
+    now = time.perf_counter()
+    profile["sections"].append((section, (now - profile["last"]) * 1000))
+    profile["last"] = now
+
+
+def count_read(nbytes):
+    """Record one file read of nbytes parsed bytes."""
+    profile = getattr(_state, "profile", None)
+    if profile is None:
+        return
+    profile["reads"] += 1
+    profile["bytes"] += nbytes
+
+
+def report():
+    """This rerun's breakdown so far, or None when profiling is off."""
+    profile = getattr(_state, "profile", None)
+    if profile is None:
+        return None
+    return {
+        "total_ms": (time.perf_counter() - profile["started"]) * 1000,
+        "sections": list(profile["sections"]),
+        "reads": profile["reads"],
+        "bytes": profile["bytes"]
+    }
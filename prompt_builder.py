@@ -0,0 +1,216 @@
+# prompt_builder.py - Token-budgeted prompts for journal analysis (NO STREAMLIT)
+import re
+
+# Rough token estimate used for budgeting (DeepSeek/GPT tokenizers average ~4 chars per token)
+CHARS_PER_TOKEN = 4
+
+# Journal text above this size is split into chunks and summarized first (map-reduce)
+INPUT_TOKEN_BUDGET = 3000
+CHUNK_TOKENS = 1500
+MAX_CHUNKS = 8
+CHUNK_SUMMARY_TOKENS = 300
+
+SYSTEM_PROMPT = """You are a wise, experienced spiritual director with 30 years of counseling experience.
+                    You combine psychological insight with deep biblical wisdom. You notice subtle spiritual patterns
+                    and provide transformative, practical guidance. Your responses are compassionate yet challenging,
+                    always pointing toward spiritual growth and deeper relationship with God."""
+
+ANALYSIS_PROMPT_TEMPLATE = """As a seasoned spiritual director with theological training, provide a DEEP analysis of this journal entry:
+
+{entry_label}:
+"{journal_text}"
+
+Provide analysis in this EXACT JSON format:
+{{
+  "analysis_summary": "Brief overall assessment of the spiritual state",
+  "primary_themes": ["theme1", "theme2", "theme3", "theme4"],
+  "emotional_state": ["emotion1", "emotion2", "emotion3"],
+  "core_question": "The central spiritual question emerging",
+  "key_insight": "Most important spiritual insight (2-3 sentences)",
+  "bible_passages": [
+    {{
+      "reference": "Scripture reference",
+      "text": "Full verse text",
+      "why_it_fits": "Detailed explanation of relevance (2-3 sentences)",
+      "application": "How to apply this Scripture practically"
+    }},
+    {{
+      "reference": "Second Scripture reference",
+      "text": "Full verse text",
+      "why_it_fits": "Detailed explanation",
+      "application": "Practical application"
+    }}
+  ],
+  "practical_steps": [
+    "Specific, actionable step 1",
+    "Specific, actionable step 2",
+    "Specific, actionable step 3"
+  ],
+  "prayer_starter": "A heartfelt prayer paragraph (3-4 sentences)",
+  "encouragement": "Personalized encouragement message (2-3 sentences)",
+  "growth_areas": ["Area 1 for growth", "Area 2 for growth"],
+  "scriptural_promise": "A specific Bible promise that applies"
+}}
+
+Guidelines:
+1. Be psychologically astute and spiritually deep
+2. Identify both surface and underlying themes
+3. Provide SPECIFIC Bible passages with full context
+4. Make practical steps CONCRETE and doable
+5. Prayer should be authentic and heartfelt
+6. Insight should be transformative, not just observational
+7. Connect emotions to spiritual truths"""
+
+CHUNK_SUMMARY_SYSTEM_PROMPT = "You condense long personal journals and pasted conversations for a spiritual director."
+
+CHUNK_SUMMARY_TEMPLATE = """This is part {index} of {total} of a long journal entry (it may include a pasted AI conversation,
+with the writer's lines tagged "Me:" and the assistant's tagged "AI:").
+
+Summarize ONLY what the writer reveals about themselves in under {max_words} words:
+- struggles, emotions and questions in their own words (keep short quotes; ignore the AI's advice)
+- any Scripture, prayers or spiritual practices they mention
+- decisions, hopes or fears they express
+Skip assistant boilerplate, greetings and formatting.
+
+PART {index}:
+\"\"\"{chunk}\"\"\""""
+
+# Boilerplate that shows up when users paste whole chatbot conversations
+_BOILERPLATE_LINES = re.compile(
+    r"^\s*(?:copy code|copy|edit|regenerate(?: response)?|share|like|dislike|"
+    r"was this (?:response|answer) helpful\??|chatgpt can make mistakes.*|"
+    r"[-=_*#~]{3,})\s*$",
+    re.IGNORECASE,
+)
+# Speaker labels are shortened, not dropped, so the writer's words stay apart from the AI's advice
+_SPEAKER_LABELS = re.compile(
+    r"^\s*(?:(?P<writer>you said|user|me)|chatgpt said|assistant|ai|deepseek|claude|gemini|copilot)\s*:\s*",
+    re.IGNORECASE | re.MULTILINE,
+)
+_INLINE_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _speaker_tag(match):
+    return "Me: " if match.group("writer") else "AI: "
+
+
+def compress_text(text):
+    """Strip pasted-conversation boilerplate and redundant whitespace; speakers become "Me:"/"AI:"."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _SPEAKER_LABELS.sub(_speaker_tag, text)
+
+    kept = []
+    seen = set()
+    for line in text.split("\n"):
+        line = _INLINE_SPACES.sub(" ", line).strip()
+        if _BOILERPLATE_LINES.match(line):
+            continue
+        # Drop long lines repeated verbatim (quoted replies, re-pasted answers)
+        if len(line) > 40:
+            if line in seen:
+                continue
+            seen.add(line)
+        kept.append(line)
+
+    return _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip()
+
+
+def _split_oversized(paragraph, max_chars):
+    """Split a single paragraph that is larger than one chunk."""
+    pieces = []
+    current = ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text, chunk_tokens=CHUNK_TOKENS, max_chunks=MAX_CHUNKS):
+    """Split text on paragraph boundaries into at most max_chunks chunks."""
+    # Grow the chunk size when the text would need more than max_chunks chunks
+    chunk_tokens = max(chunk_tokens, -(-estimate_tokens(text) // max_chunks))
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+
+    paragraphs = []
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) > max_chars:
+            paragraphs.extend(_split_oversized(paragraph, max_chars))
+        else:
+            paragraphs.append(paragraph)
+
+    chunks = []
+    current = ""
+    for paragraph in paragraphs:
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+
+    # Sentence splitting can overshoot by a piece; fold the tail into the last chunk
+    while len(chunks) > max_chunks:
+        tail = chunks.pop()
+        chunks[-1] = f"{chunks[-1]}\n\n{tail}"
+
+    return chunks
+
+
+def plan_prompt(journal_text, budget=INPUT_TOKEN_BUDGET):
+    """Decide how a journal entry is sent to the model.
+
+    Returns a dict with the text to send, its token estimate and, when the text
+    is still over budget after compression, the chunks to summarize before the
+    final analysis. Entries within budget are sent as written.
+    """
+    original_tokens = estimate_tokens(journal_text)
+    text = compress_text(journal_text) if original_tokens > budget else journal_text.strip()
+    tokens = estimate_tokens(text)
+
+    return {
+        "text": text,
+        "original_tokens": original_tokens,
+        "input_tokens": tokens,
+        "chunks": chunk_text(text) if tokens > budget else []
+    }
+
+
+def build_analysis_prompt(journal_text, condensed=False):
+    """Build the main analysis prompt."""
+    entry_label = "JOURNAL ENTRY (condensed from a longer reflection)" if condensed else "JOURNAL ENTRY"
+    return ANALYSIS_PROMPT_TEMPLATE.format(entry_label=entry_label, journal_text=journal_text)
+
+
+def build_chunk_prompt(chunk, index, total):
+    """Build the summarization prompt for one chunk of a long entry."""
+    max_words = int(CHUNK_SUMMARY_TOKENS * 0.6)
+    return CHUNK_SUMMARY_TEMPLATE.format(index=index, total=total, max_words=max_words, chunk=chunk)
+
+
+def merge_chunk_summaries(summaries):
+    """Join chunk summaries into the condensed entry used for the final analysis."""
+    return "\n\n".join(
+        f"[Part {i} of {len(summaries)}]\n{summary.strip()}"
+        for i, summary in enumerate(summaries, 1)
+    )
@@ -0,0 +1,164 @@
+# resilience.py - Deadlines, retries, hedging and circuit breaking for remote calls (NO STREAMLIT)
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class DeadlineExceeded(Exception):
+    """The request budget ran out before a call succeeded."""
+
+
+class Deadline:
+    """A fixed time budget shared by every attempt of one request."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    """Fail fast while a remote service is unhealthy.
+
+    closed    - calls go through; consecutive failures are counted
+    open      - calls are refused until reset_timeout has passed
+    half_open - one probe call is let through; success closes the circuit,
+                failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return True if a call may be attempted now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open: let exactly one probe through
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """End a call that says nothing about the service's health (a half-open probe may be retried)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies (seconds)."""
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        """Latency at the given percentile, or None until enough samples exist."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def retry_call(fn, deadline, is_transient, retries=2, base_delay=0.25, max_delay=2.0, on_retry=None):
+    """Call fn(timeout) until it succeeds, retrying transient errors within the deadline.
+
+    Backoff uses full jitter: a random sleep in [0, min(max_delay, base_delay * 2**attempt)].
+    """
+    attempt = 0
+    while True:
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {deadline.seconds:.0f}s exceeded")
+        try:
+            return fn(remaining)
+        except Exception as e:
+            if attempt >= retries or not is_transient(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if delay >= deadline.remaining():
+                raise
+            if on_retry:
+                on_retry(e)
+            time.sleep(delay)
+            attempt += 1
+
+
+def hedged_call(fn, timeout, hedge_after, executor):
+    """Call fn(timeout); if it hasn't answered after hedge_after seconds, fire a second copy.
+
+    Returns the first successful result. The slower call is left to finish in
+    the background.
+    """
+    expires_at = time.monotonic() + timeout
+    primary = executor.submit(fn, timeout)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    remaining = expires_at - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Request timed out before hedging")
+
+    pending = {primary, executor.submit(fn, remaining)}
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, expires_at - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded("Hedged request timed out")
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
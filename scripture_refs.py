@@ -0,0 +1,218 @@
+# scripture_refs.py - Canonical scripture reference parsing (NO STREAMLIT)
+#
+# "Psalm 23:1", "psalms 23:1 ", "Ps 23.1" and "Psa. 23:1" all parse to the
+# same ScriptureRef(book_id=19, chapter=23, verse_start=1, verse_end=1), so
+# caches, fallbacks and statistics can key on one canonical form.
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Canonical book order; book_id = position + 1
+BOOK_NAMES = (
+    "Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy",
+    "Joshua", "Judges", "Ruth", "1 Samuel", "2 Samuel",
+    "1 Kings", "2 Kings", "1 Chronicles", "2 Chronicles",
+    "Ezra", "Nehemiah", "Esther", "Job", "Psalms",
+    "Proverbs", "Ecclesiastes", "Song of Solomon",
+    "Isaiah", "Jeremiah", "Lamentations", "Ezekiel",
+    "Daniel", "Hosea", "Joel", "Amos", "Obadiah",
+    "Jonah", "Micah", "Nahum", "Habakkuk", "Zephaniah",
+    "Haggai", "Zechariah", "Malachi",
+    "Matthew", "Mark", "Luke", "John", "Acts",
+    "Romans", "1 Corinthians", "2 Corinthians",
+    "Galatians", "Ephesians", "Philippians", "Colossians",
+    "1 Thessalonians", "2 Thessalonians", "1 Timothy",
+    "2 Timothy", "Titus", "Philemon", "Hebrews",
+    "James", "1 Peter", "2 Peter", "1 John",
+    "2 John", "3 John", "Jude", "Revelation"
+)
+
+# Common abbreviations and alternate names (numbered books list the part after the number)
+_BOOK_ALIASES = {
+    "Genesis": ["gen", "ge", "gn"],
+    "Exodus": ["exod", "exo", "ex"],
+    "Leviticus": ["lev", "le", "lv"],
+    "Numbers": ["num", "nu", "nm", "nb"],
+    "Deuteronomy": ["deut", "deu", "dt"],
+    "Joshua": ["josh", "jos", "jsh"],
+    "Judges": ["judg", "jdg", "jg", "jdgs"],
+    "Ruth": ["rth", "ru"],
+    "Samuel": ["sam", "sa", "sm"],
+    "Kings": ["kgs", "ki", "kin"],
+    "Chronicles": ["chron", "chr", "ch"],
+    "Ezra": ["ezr"],
+    "Nehemiah": ["neh", "ne"],
+    "Esther": ["esth", "est", "es"],
+    "Job": ["jb"],
+    "Psalms": ["psalm", "ps", "psa", "pss", "psm"],
+    "Proverbs": ["prov", "pro", "prv", "pr", "proverb"],
+    "Ecclesiastes": ["eccl", "eccles", "ecc", "ec", "qoheleth"],
+    "Song of Solomon": ["song of songs", "song", "songs", "sos", "so", "canticles", "song of sol", "sg"],
+    "Isaiah": ["isa", "is"],
+    "Jeremiah": ["jer", "je", "jr"],
+    "Lamentations": ["lam", "la"],
+    "Ezekiel": ["ezek", "eze", "ezk"],
+    "Daniel": ["dan", "da", "dn"],
+    "Hosea": ["hos", "ho"],
+    "Joel": ["jl"],
+    "Amos": ["am"],
+    "Obadiah": ["obad", "ob"],
+    "Jonah": ["jon", "jnh"],
+    "Micah": ["mic", "mc"],
+    "Nahum": ["nah", "na"],
+    "Habakkuk": ["hab", "hb"],
+    "Zephaniah": ["zeph", "zep", "zp"],
+    "Haggai": ["hag", "hg"],
+    "Zechariah": ["zech", "zec", "zc"],
+    "Malachi": ["mal", "ml"],
+    "Matthew": ["matt", "mat", "mt"],
+    "Mark": ["mrk", "mar", "mk", "mr"],
+    "Luke": ["luk", "lk"],
+    "John": ["joh", "jhn", "jn"],
+    "Acts": ["act", "ac", "acts of the apostles"],
+    "Romans": ["rom", "ro", "rm"],
+    "Corinthians": ["cor", "co"],
+    "Galatians": ["gal", "ga"],
+    "Ephesians": ["eph", "ephes"],
+    "Philippians": ["phil", "php", "pp"],
+    "Colossians": ["col", "co"],
+    "Thessalonians": ["thess", "thes", "th"],
+    "Timothy": ["tim", "ti"],
+    "Titus": ["tit"],
+    "Philemon": ["philem", "phm", "pm"],
+    "Hebrews": ["heb"],
+    "James": ["jas", "jm"],
+    "Peter": ["pet", "pe", "pt"],
+    "Jude": ["jud", "jd"],
+    "Revelation": ["rev", "re", "revelations", "apocalypse", "the revelation"],
+}
+
+# Ordinal spellings for numbered books ("1 John", "1st John", "I John", "First John", "1John")
+_ORDINALS = {
+    "1": "1", "1st": "1", "i": "1", "first": "1",
+    "2": "2", "2nd": "2", "ii": "2", "second": "2",
+    "3": "3", "3rd": "3", "iii": "3", "third": "3",
+}
+
+# Books with a single chapter, where "Jude 3" means verse 3 (Obadiah, Philemon, 2 John, 3 John, Jude)
+_SINGLE_CHAPTER_BOOKS = frozenset({31, 57, 63, 64, 65})
+
+ScriptureRef = namedtuple("ScriptureRef", ["book_id", "chapter", "verse_start", "verse_end"])
+ScriptureRef.__doc__ = """Canonical reference. verse_start/verse_end are None for a whole chapter."""
+
+_REFERENCE = re.compile(
+    r"^(?P<book>[1-3]?\s*[a-z][a-z ]*?)\s*"
+    r"(?P<chapter>\d+)"
+    r"(?:\s*[:.]\s*(?P<start>\d+)(?:\s*[-–—]\s*(?:(?P<end_chapter>\d+)\s*[:.]\s*)?(?P<end>\d+))?"
+    r"|\s*[-–—]\s*(?P<bare_end>\d+))?$"
+)
+# Digits may touch the name ("1cor"); roman numerals and words need a space ("i cor", not "is")
+_ORDINAL_PREFIX = re.compile(r"^(?:(1st|2nd|3rd|[1-3])\s*|(iii|ii|i|first|second|third)\s+)(?=[a-z])")
+# Periods after abbreviations ("Psa.") but not between numbers ("23.1")
+_ABBREVIATION_DOT = re.compile(r"(?<!\d)\.|\.(?!\d)")
+
+
+def _normalize_book(text):
+    """Lowercase, drop periods and collapse whitespace; '1cor' -> '1 cor'."""
+    text = " ".join(text.lower().replace(".", " ").split())
+    match = _ORDINAL_PREFIX.match(text)
+    if match:
+        text = f"{_ORDINALS[match.group(1) or match.group(2)]} {text[match.end():]}"
+    return text
+
+
+def _build_alias_table():
+    table = {}
+    for book_id, name in enumerate(BOOK_NAMES, 1):
+        number, _, base = name.partition(" ") if name[0].isdigit() else ("", "", name)
+        forms = [base.lower()] + _BOOK_ALIASES.get(base, [])
+        for form in forms:
+            alias = _normalize_book(f"{number} {form}" if number else form)
+            # First writer wins so "co" stays Corinthians and "jn" stays John
+            table.setdefault(alias, book_id)
+    return table
+
+
+# Built once at import; O(1) alias -> book_id
+BOOK_ALIASES = _build_alias_table()
+
+
+def book_id_for(name):
+    """book_id for any spelling of a book name, or None."""
+    return BOOK_ALIASES.get(_normalize_book(name))
+
+
+def book_name(book_id):
+    """Canonical book name for a book_id."""
+    return BOOK_NAMES[book_id - 1]
+
+
+@lru_cache(maxsize=8192)
+def parse_reference(text):
+    """Parse "Book C", "Book C:V", "Book C:V-W" or "Book C:V-C:W" into a ScriptureRef, or None.
+
+    For one-chapter books a lone number is a verse: "Jude 3" is Jude 1:3.
+    Chapters and verses that don't exist ("Genesis 51:1", "John 3:99") give None.
+    """
+    if not text:
+        return None
+    normalized = " ".join(_ABBREVIATION_DOT.sub(" ", text.lower()).split())
+    match = _REFERENCE.match(normalized)
+    if not match:
+        return None
+
+    book_id = book_id_for(match.group("book"))
+    if not book_id:
+        return None
+
+    chapter = int(match.group("chapter"))
+    if book_id in _SINGLE_CHAPTER_BOOKS and match.group("start") is None:
+        # "Jude 3" / "Jude 3-5": the number is a verse
+        start = chapter
+        end = int(match.group("bare_end")) if match.group("bare_end") else start
+        chapter = 1
+    elif match.group("bare_end") is not None:
+        # Chapter ranges ("Genesis 1-3") aren't supported
+        return None
+    elif match.group("start") is None:
+        return ScriptureRef(book_id, chapter, None, None) if chapter and _in_range(book_id, chapter) else None
+    else:
+        start = int(match.group("start"))
+        end = int(match.group("end")) if match.group("end") else start
+        # "Genesis 1:1-1:3" repeats the chapter; a range across chapters can't be represented
+        if match.group("end_chapter") and int(match.group("end_chapter")) != chapter:
+            return None
+
+    if not chapter or not start or end < start:
+        return None
+    if not _in_range(book_id, chapter, end):
+        return None
+    return ScriptureRef(book_id, chapter, start, end)
+
+
+def _in_range(book_id, chapter, verse=None):
+    """True if the chapter (and verse) exist in the standard versification."""
+    from versification import chapter_count, verse_count  # versification imports this module
+    if chapter > chapter_count(book_id):
+        return False
+    return verse is None or verse <= verse_count(book_id, chapter)
+
+
+def format_reference(ref):
+    """Display form: "Psalm 23:1-3", "1 Corinthians 13:4-7", "John 3"."""
+    name = "Psalm" if ref.book_id == 19 else book_name(ref.book_id)
+    if ref.verse_start is None:
+        return f"{name} {ref.chapter}"
+    if ref.verse_end != ref.verse_start:
+        return f"{name} {ref.chapter}:{ref.verse_start}-{ref.verse_end}"
+    return f"{name} {ref.chapter}:{ref.verse_start}"
+
+
+def reference_key(text):
+    """Canonical string key for a reference; unparseable text falls back to normalized text."""
+    ref = parse_reference(text)
+    if ref is None:
+        return " ".join((text or "").lower().split())
+    if ref.verse_start is None:
+        return f"{ref.book_id}:{ref.chapter}"
+    return f"{ref.book_id}:{ref.chapter}:{ref.verse_start}-{ref.verse_end}"
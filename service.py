@@ -0,0 +1,120 @@
+# service.py - Headless MyGrow operations (NO STREAMLIT)
+#
+# Everything the app does with an archive, an analysis or a verse, callable from
+# scripts, http_api.py and the load tests. Archives are shared per user within a
+# process. Several processes may serve the same users (http_api.py --workers):
+# every call revalidates the archive with refresh() (a few stats, no reads) and
+# saves take an exclusive lock file in the user's folder.
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+from journal_archive import JournalArchive
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+_USER_ID = re.compile(r"[A-Za-z0-9_.@-]{1,128}")
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(user_id, data_root=None):
+    """Shared archive for a user; raises ValueError for ids that aren't safe folder names."""
+    if not _USER_ID.fullmatch(user_id or "") or user_id in (".", ".."):
+        raise ValueError(f"Invalid user id: {user_id!r}")
+    key = (data_root, user_id)
+    archive = _archives.get(key)
+    if archive is None:
+        with _archives_lock:
+            archive = _archives.get(key)
+            if archive is None:
+                archive = _archives[key] = JournalArchive(user_id, data_root)
+    archive.refresh()
+    return archive
+
+
+def clear_cache():
+    """Forget the shared archives (the next call rereads every user's files)."""
+    with _archives_lock:
+        _archives.clear()
+
+
+@contextmanager
+def _exclusive(archive):
+    """Hold the user's lock file so saves from other processes don't interleave."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(archive.data_dir, exist_ok=True)
+    with open(os.path.join(archive.data_dir, ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _check_limit(limit):
+    if limit is not None and limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+
+
+def analyze(journal_text):
+    """Full spiritual-direction analysis of a journal entry (falls back offline)."""
+    from ai_analyzer import analyze_spiritual_journal
+    return analyze_spiritual_journal(journal_text)
+
+
+def save_entry(user_id, journal_text, analysis=None, data_root=None):
+    """Archive an entry, analyzing it first unless an analysis is given. Returns the entry."""
+    if analysis is None:
+        analysis = analyze(journal_text)
+    archive = get_archive(user_id, data_root)
+    with _exclusive(archive):
+        # Reread under the lock: mtimes can be too coarse to show a save made a moment ago
+        archive.invalidate()
+        return archive.save_entry(journal_text, analysis)
+
+
+def list_entries(user_id, limit=None, month=None, data_root=None):
+    """Entries oldest first, optionally for one month (YYYY-MM) and/or only the last `limit`."""
+    _check_limit(limit)
+    archive = get_archive(user_id, data_root)
+    entries = archive.get_entries_by_year_month(month) if month else archive.get_entries()
+    return entries[-limit:] if limit else entries
+
+
+def search_entries(user_id, query, limit=50, data_root=None):
+    """Entries whose text, themes or emotions contain the query, newest first."""
+    _check_limit(limit)
+    matches = get_archive(user_id, data_root).search_entries(query)
+    matches.reverse()
+    return matches[:limit]
+
+
+def dashboard_model(user_id, data_root=None):
+    """The data behind the growth dashboard, without any rendering."""
+    archive = get_archive(user_id, data_root)
+    return {
+        "summary": archive.get_summary_insights(),
+        "patterns": archive.get_patterns(),
+        "monthly_summaries": archive.get_monthly_summaries(),
+        "timeline": archive.get_timeline()
+    }
+
+
+def lookup_verse(reference, version="WEB"):
+    """{"reference", "verses", "text"} for a reference, or None if it can't be found."""
+    from bible_integration import get_bible_passage
+    return get_bible_passage(reference, version)
+
+
+def search_scripture(query, version="WEB", k=10):
+    """Ranked verses for a query, or None when the offline search index isn't installed."""
+    from bible_integration import search_scripture as search
+    return search(query, version, k)
@@ -0,0 +1,8 @@
+# conftest.py - Puts the repo root and tools/ on sys.path for the tests (NO STREAMLIT)
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, "tools")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,21 @@
+# test_http_api.py - Request body limits
+import io
+
+import pytest
+
+from http_api import MAX_BODY_BYTES, HTTPError, _body
+
+
+def _environ(length, data=b'{"journal_text": "hi"}'):
+    return {"CONTENT_LENGTH": str(length), "wsgi.input": io.BytesIO(data)}
+
+
+def test_body_is_parsed():
+    assert _body(_environ(22)) == {"journal_text": "hi"}
+
+
+@pytest.mark.parametrize("length, status", [(-1, 400), (MAX_BODY_BYTES + 1, 413)])
+def test_bad_lengths_are_rejected(length, status):
+    with pytest.raises(HTTPError) as raised:
+        _body(_environ(length))
+    assert raised.value.status == status
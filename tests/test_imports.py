@@ -0,0 +1,13 @@
+# test_imports.py - Import-time budget for the non-UI modules (see tools/check_imports.py)
+import pytest
+
+from check_imports import DEFAULT_BUDGET_MS, DEFAULT_MODULES, HEAVY_MODULES, measure
+
+
+@pytest.mark.parametrize("module", DEFAULT_MODULES)
+def test_import_budget(module):
+    runs = [measure(module) for _ in range(3)]
+    best = min(run["ms"] for run in runs)
+    assert best <= DEFAULT_BUDGET_MS, f"{module} took {best:.1f} ms"
+    assert not {name.split(".")[0] for name in runs[0]["modules"]} & set(HEAVY_MODULES)
+    assert not [event for run in runs for event in run["events"]]
@@ -0,0 +1,22 @@
+# test_prompt_builder.py - Prompt compression keeps who said what
+from prompt_builder import INPUT_TOKEN_BUDGET, compress_text, plan_prompt
+
+CONVERSATION = "You said: I feel far from God\nChatGPT said:\nTry a short daily prayer.\nCopy code\nUser: thanks"
+
+
+def test_speakers_are_tagged_not_dropped():
+    assert compress_text(CONVERSATION) == "Me: I feel far from God\nAI: Try a short daily prayer.\nMe: thanks"
+
+
+def test_entries_within_budget_are_sent_as_written():
+    plan = plan_prompt(CONVERSATION + "\n")
+    assert plan["text"] == CONVERSATION
+    assert plan["chunks"] == []
+
+
+def test_long_entries_are_compressed_and_chunked():
+    text = CONVERSATION + "\n\n" + "\n\n".join(f"Day {i}: " + "word " * 200 for i in range(40))
+    plan = plan_prompt(text)
+    assert plan["original_tokens"] > INPUT_TOKEN_BUDGET
+    assert plan["text"].startswith("Me: I feel far from God\nAI: ")
+    assert len(plan["chunks"]) > 1
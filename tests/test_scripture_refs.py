@@ -0,0 +1,45 @@
+# test_scripture_refs.py - Reference parsing and the verse-key packing it feeds
+import pytest
+
+from bible_store import split_key, verse_key
+from scripture_refs import ScriptureRef, format_reference, parse_reference, reference_key
+
+
+@pytest.mark.parametrize("text", ["Psalm 23:1", "psalms 23:1 ", "Ps 23.1", "Psa. 23:1"])
+def test_spellings_share_one_reference(text):
+    assert parse_reference(text) == ScriptureRef(19, 23, 1, 1)
+
+
+def test_ranges_and_chapters():
+    assert parse_reference("1 Corinthians 13:4-7") == ScriptureRef(46, 13, 4, 7)
+    assert parse_reference("Genesis 1:1-1:3") == ScriptureRef(1, 1, 1, 3)
+    assert parse_reference("John 3") == ScriptureRef(43, 3, None, None)
+    assert format_reference(parse_reference("psalm 23:1-3")) == "Psalm 23:1-3"
+
+
+def test_single_chapter_books_take_a_verse():
+    assert parse_reference("Jude 3") == ScriptureRef(65, 1, 3, 3)
+    assert parse_reference("Jude 3-5") == ScriptureRef(65, 1, 3, 5)
+    assert parse_reference("Philemon 1:6") == ScriptureRef(57, 1, 6, 6)
+
+
+@pytest.mark.parametrize("text", [
+    "", "Hezekiah 1:1", "Genesis 1-3", "Genesis 1:1-2:3", "John 3:5-2",
+    "Genesis 51:1", "Genesis 257:1", "John 3:99", "Psalm 0:1",
+])
+def test_unrepresentable_references_give_none(text):
+    assert parse_reference(text) is None
+
+
+def test_reference_key_falls_back_to_text():
+    assert reference_key("Ps 23.1") == reference_key("Psalm 23:1")
+    assert reference_key("  Not  A Verse ") == "not a verse"
+
+
+def test_verse_key_round_trip_and_range():
+    assert split_key(verse_key(66, 22, 21)) == (66, 22, 21)
+    assert verse_key(1, 1, 2) < verse_key(1, 2, 1) < verse_key(2, 1, 1)
+    with pytest.raises(ValueError):
+        verse_key(1, 256, 1)
+    with pytest.raises(ValueError):
+        verse_key(1, 1, -1)
@@ -0,0 +1,188 @@
+# test_stores.py - Verse store, user store, data layout and journal archive on a scratch directory
+import json
+import os
+from array import array
+
+import pytest
+
+import bible_store
+import data_layout
+import service
+from journal_archive import JournalArchive
+from user_store import UserStore
+
+ANALYSIS = {"primary_themes": ["Faith"], "emotional_state": ["hopeful"], "bible_passages": [], "practical_steps": []}
+
+
+def test_bible_store_round_trip(tmp_path, monkeypatch):
+    verses = [(43, 3, 16, "For God so loved the world,"), (1, 1, 1, "In the beginning..."),
+              (43, 3, 17, "For God didn't send  his Son"), (19, 23, 1, "Yahweh is my shepherd; “I”")]
+    path = str(tmp_path / "bible_test.mgb")
+    assert bible_store.write_store(path, verses) == 4
+
+    store = bible_store.BibleStore(path)
+    try:
+        assert len(store) == 4
+        assert store.get_verse(19, 23, 1) == "Yahweh is my shepherd; “I”"
+        assert store.get_verse(19, 23, 2) is None
+        assert store.get_passage(43, 3) == [(16, "For God so loved the world,"), (17, "For God didn't send his Son")]
+        assert [row[:3] for row in store.iter_verses()] == [(1, 1, 1), (19, 23, 1), (43, 3, 16), (43, 3, 17)]
+    finally:
+        store.close()
+
+    with pytest.raises(ValueError):
+        bible_store.write_store(path, verses + [(1, 1, 1, "again")])
+
+
+def test_open_store_picks_up_a_store_built_later(tmp_path, monkeypatch):
+    monkeypatch.setenv("MYGROW_BIBLE_DIR", str(tmp_path))
+    assert bible_store.open_store("pytest") is None
+    bible_store.write_store(bible_store.store_path("pytest"), [(1, 1, 1, "In the beginning...")])
+    store = bible_store.open_store("pytest")
+    try:
+        assert store.get_verse(1, 1, 1) == "In the beginning..."
+    finally:
+        bible_store._stores.pop("PYTEST").close()
+
+
+def test_open_store_retries_a_store_that_failed_to_open(tmp_path, monkeypatch):
+    monkeypatch.setenv("MYGROW_BIBLE_DIR", str(tmp_path))
+    with open(bible_store.store_path("pytest"), "wb") as f:
+        f.write(b"half a file")
+    assert bible_store.open_store("pytest") is None
+    bible_store.write_store(bible_store.store_path("pytest"), [(1, 1, 1, "In the beginning...")])
+    try:
+        assert bible_store.open_store("pytest").get_verse(1, 1, 1) == "In the beginning..."
+    finally:
+        bible_store._stores.pop("PYTEST").close()
+
+
+def test_swapped_tables_have_one_element_per_uint32():
+    # Big-endian hosts copy the tables; simulate one by swapping back
+    table = bible_store._swapped(array("I", [1, 0x01020304]).tobytes())
+    table.byteswap()
+    assert list(table) == [1, 0x01020304]
+
+
+def test_user_store_accounts_and_sessions(tmp_path):
+    store = UserStore(str(tmp_path / "users.sqlite3"), scrypt_n=2 ** 4)
+    user = store.register("Bob@X.com", "secret1", "Bob")
+    # Ids come from the email as typed, so folders made before accounts were stored still match
+    assert user["sub"] == "user_3baf5283"
+    assert user["email"] == "bob@x.com"
+    with pytest.raises(ValueError):
+        store.register("bob@x.com", "secret1")
+    with pytest.raises(ValueError):
+        store.register("carol@x.com", "short")
+
+    assert store.authenticate(" BOB@x.com", "secret1")["sub"] == "user_3baf5283"
+    assert store.authenticate("bob@x.com", "wrong!!") is None
+    assert store.authenticate("nobody@x.com", "secret1") is None
+    assert store.authenticate("user@example.com", "password123")["sub"] == "user_001"
+
+    token = store.create_session(user)
+    assert store.verify_session(token)["sub"] == "user_3baf5283"
+    # A second process sees the session through the database
+    assert UserStore(store.path, scrypt_n=2 ** 4).verify_session(token)["sub"] == "user_3baf5283"
+    store.end_session(token)
+    assert store.verify_session(token) is None
+    assert store.verify_session("") is None
+
+
+def _write_legacy(root, user_id, files):
+    folder = os.path.join(root, user_id)
+    os.makedirs(folder)
+    for name, data in files.items():
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+
+def test_shard_path_and_migration(tmp_path):
+    root = str(tmp_path)
+    path = data_layout.shard_path("user_001", root)
+    parts = os.path.relpath(path, root).split(os.sep)
+    assert len(parts) == 3 and parts[2] == "user_001" and all(len(part) == 2 for part in parts[:2])
+
+    _write_legacy(root, "user_001", {"journal_entries.json": [{"id": "1"}]})
+    assert data_layout.legacy_users(root) == ["user_001"]
+    assert data_layout.user_dir("user_001", root) == path
+    assert os.path.exists(os.path.join(path, "journal_entries.json"))
+    assert data_layout.legacy_users(root) == []
+    assert list(data_layout.iter_users(root)) == ["user_001"]
+    assert data_layout.read_manifest(root)["layout"] == data_layout.LAYOUT
+    assert data_layout.migrate_user("user_001", root) is False
+
+
+def test_migration_merges_into_an_existing_shard(tmp_path):
+    root = str(tmp_path)
+    target = data_layout.shard_path("user_002", root)
+    os.makedirs(target)
+    with open(os.path.join(target, "user_patterns.json"), "w", encoding="utf-8") as f:
+        json.dump({}, f)
+    _write_legacy(root, "user_002", {"journal_entries.json": [{"id": "1"}], ".lock": ""})
+
+    assert data_layout.migrate_user("user_002", root) is True
+    assert sorted(os.listdir(target)) == ["journal_entries.json", "user_patterns.json"]
+    assert not os.path.exists(os.path.join(root, "user_002"))
+
+
+def test_migration_refuses_files_in_both_layouts(tmp_path):
+    root = str(tmp_path)
+    target = data_layout.shard_path("user_003", root)
+    os.makedirs(target)
+    with open(os.path.join(target, "journal_entries.json"), "w", encoding="utf-8") as f:
+        json.dump([{"id": "new"}], f)
+    _write_legacy(root, "user_003", {"journal_entries.json": [{"id": "old"}]})
+
+    with pytest.raises(ValueError, match="journal_entries.json"):
+        data_layout.user_dir("user_003", root)
+    # Both copies are left for someone to merge
+    assert os.path.exists(os.path.join(root, "user_003", "journal_entries.json"))
+    with pytest.raises(ValueError):
+        JournalArchive("user_003", root)
+
+
+def test_archive_writes_whole_files_and_hands_out_copies(tmp_path):
+    archive = JournalArchive("user_004", str(tmp_path))
+    assert archive.get_entries() == []
+    assert not os.path.exists(archive.data_dir)
+
+    entry = archive.save_entry("Grateful for a quiet morning.", ANALYSIS)
+    assert [name for name in os.listdir(archive.data_dir) if name.endswith(".tmp")] == []
+    with open(archive.entries_file, encoding="utf-8") as f:
+        assert [item["id"] for item in json.load(f)] == [entry["id"]]
+
+    archive.get_entries().clear()
+    archive.get_entry(entry["id"])["journal_text"] = "changed"
+    archive.get_patterns().clear()
+    for item in archive.get_timeline():
+        item.clear()
+    assert archive.get_entry(entry["id"])["journal_text"] == "Grateful for a quiet morning."
+    assert len(archive.get_entries()) == 1
+    assert archive.get_patterns()
+    assert all(archive.get_timeline())
+
+    # A write from another process is seen after invalidate(), even within one mtime tick
+    other = JournalArchive("user_004", str(tmp_path))
+    other.save_entry("Second entry.", ANALYSIS)
+    archive.invalidate()
+    assert len(archive.get_entries()) == 2
+    assert archive.get_theme_counts() == [("Faith", 2)]
+
+
+def test_service_validates_limits_and_user_ids(tmp_path):
+    root = str(tmp_path)
+    service.save_entry("user_005", "First.", ANALYSIS, data_root=root)
+    service.save_entry("user_005", "Second.", ANALYSIS, data_root=root)
+    try:
+        assert [e["journal_text"] for e in service.list_entries("user_005", limit=1, data_root=root)] == ["Second."]
+        assert len(service.search_entries("user_005", "faith", data_root=root)) == 2
+        for limit in (0, -1):
+            with pytest.raises(ValueError):
+                service.list_entries("user_005", limit=limit, data_root=root)
+            with pytest.raises(ValueError):
+                service.search_entries("user_005", "faith", limit=limit, data_root=root)
+        with pytest.raises(ValueError):
+            service.get_archive("../etc", root)
+    finally:
+        service.clear_cache()
@@ -0,0 +1,209 @@
+# theme_index.py - Theme -> verse recommendations (NO STREAMLIT)
+#
+# tools/build_theme_index.py scores every verse in the offline store against
+# each theme's lexicon (TF-IDF, cosine-normalized per verse) and writes the
+# top verses per theme to data/bible_<version>.themes.json. At runtime a theme
+# string is normalized, matched to lexicon themes by name or keyword, and the
+# precomputed lists are merged; unknown themes fall back to a BM25 search.
+# Results are memoized per normalized theme. The index is optional and not
+# shipped; without it recommend_verses() returns nothing and callers keep their
+# curated verses.
+import json
+import math
+import os
+import threading
+from functools import lru_cache
+
+from bible_search import open_index, tokenize
+from bible_store import DATA_DIR, split_key
+from scripture_refs import ScriptureRef, format_reference
+
+# Verses kept per theme in the built index
+TOP_VERSES_PER_THEME = 25
+
+# Scripture vocabulary per theme, added to the SPIRITUAL_THEMES keywords at build time.
+# Theme names come from the analysis prompt and the curated suggestion list.
+THEME_LEXICON = {
+    "Faith": ["faith", "believe", "faithful", "trust", "righteousness"],
+    "Hope": ["hope", "wait", "promise", "future", "expectation"],
+    "Love": ["love", "beloved", "kindness", "compassion", "lovingkindness"],
+    "Peace": ["peace", "rest", "quiet", "still", "calm"],
+    "Joy": ["joy", "rejoice", "glad", "delight", "sing"],
+    "Patience": ["patience", "endure", "perseverance", "wait", "longsuffering"],
+    "Gratitude": ["thanks", "thanksgiving", "praise", "grateful", "bless"],
+    "Forgiveness": ["forgive", "mercy", "pardon", "sin", "transgression"],
+    "Humility": ["humble", "lowly", "meek", "pride", "servant"],
+    "Wisdom": ["wisdom", "understanding", "knowledge", "instruction", "discernment"],
+    "Anxiety": ["anxious", "worry", "afraid", "fear", "trouble", "cares"],
+    "Guidance": ["guide", "lead", "path", "way", "direct", "counsel"],
+    "Grief": ["mourn", "weep", "sorrow", "tears", "comfort", "brokenhearted"],
+    "Fear": ["fear", "afraid", "dismayed", "terror", "courage"],
+    "Strength": ["strength", "strong", "power", "mighty", "weary"],
+    "Prayer": ["pray", "prayer", "ask", "cry", "hear", "supplication"],
+    "Grace": ["grace", "gift", "favor", "mercy", "free"],
+    "Provision": ["provide", "bread", "supply", "need", "shepherd"],
+    "Healing": ["heal", "health", "sick", "restore", "wound"],
+    "Loneliness": ["alone", "lonely", "forsake", "near", "presence"],
+    "Purpose": ["purpose", "plan", "calling", "work", "good"],
+    "Identity": ["child", "children", "chosen", "created", "image"],
+    "Courage": ["courage", "bold", "strong", "afraid", "dismayed"],
+    "Obedience": ["obey", "commandment", "keep", "walk", "statutes"],
+    "Repentance": ["repent", "turn", "return", "confess", "cleanse"],
+    "Surrender": ["yield", "submit", "offer", "sacrifice", "lay"],
+}
+
+_themes = {}
+_themes_lock = threading.Lock()
+
+
+def themes_path(version="WEB"):
+    """Path of the theme index for a translation (next to its store file)."""
+    directory = os.getenv("MYGROW_BIBLE_DIR", DATA_DIR)
+    return os.path.join(directory, f"bible_{version.lower()}.themes.json")
+
+
+def normalize_theme(theme):
+    """Case- and whitespace-insensitive theme key."""
+    return " ".join(str(theme).lower().split())
+
+
+def build_theme_index(store, themes, top_k=TOP_VERSES_PER_THEME):
+    """Score every verse against each theme lexicon. Returns the index as a dict.
+
+    `themes` maps theme names to keyword lists (SPIRITUAL_THEMES merged with THEME_LEXICON).
+    """
+    # Corpus statistics: document frequency and per-verse term counts
+    verse_terms = []
+    df = {}
+    for doc in range(store.count):
+        counts = {}
+        for token in tokenize(store.text_at(doc)):
+            counts[token] = counts.get(token, 0) + 1
+        verse_terms.append(counts)
+        for token in counts:
+            df[token] = df.get(token, 0) + 1
+
+    n = store.count
+    idf = {term: math.log(n / count) for term, count in df.items()}
+    postings = {}
+    norms = []
+    for doc, counts in enumerate(verse_terms):
+        weights = {term: (1 + math.log(tf)) * idf[term] for term, tf in counts.items()}
+        norms.append(math.sqrt(sum(w * w for w in weights.values())) or 1.0)
+        for term, weight in weights.items():
+            postings.setdefault(term, []).append((doc, weight))
+
+    index = {"version": 1, "verse_count": n, "themes": {}, "keywords": {}}
+    for theme, keywords in themes.items():
+        # The theme name counts double; every stemmed keyword once
+        query = {}
+        for word, weight in [(theme, 2.0)] + [(k, 1.0) for k in keywords]:
+            for term in tokenize(word):
+                query[term] = max(query.get(term, 0.0), weight)
+                index["keywords"].setdefault(term, [])
+                if theme not in index["keywords"][term]:
+                    index["keywords"][term].append(theme)
+
+        scores = {}
+        for term, weight in query.items():
+            for doc, verse_weight in postings.get(term, ()):
+                scores[doc] = scores.get(doc, 0.0) + weight * verse_weight
+        ranked = sorted(scores, key=lambda doc: scores[doc] / norms[doc], reverse=True)[:top_k]
+        verses = []
+        for doc in ranked:
+            book_id, chapter, verse = split_key(store.key_at(doc))
+            verses.append([format_reference(ScriptureRef(book_id, chapter, verse, verse)),
+                           round(scores[doc] / norms[doc], 4)])
+        index["themes"][theme] = verses
+    return index
+
+
+def write_theme_index(path, index):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_theme_index(version="WEB"):
+    """Built theme index for a translation, or None if it isn't installed.
+
+    A missing file isn't remembered, so an index built while the app runs is picked up.
+    """
+    version = version.upper()
+    if version in _themes:
+        return _themes[version]
+
+    path = themes_path(version)
+    if not os.path.exists(path):
+        return None
+    with _themes_lock:
+        if version not in _themes:
+            index = None
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                index = {
+                    "themes": {normalize_theme(t): (t, tuple(ref for ref, _score in verses))
+                               for t, verses in data.get("themes", {}).items()},
+                    "keywords": {term: tuple(themes) for term, themes in data.get("keywords", {}).items()}
+                }
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Theme index error: {e}")
+            _themes[version] = index
+    return _themes[version]
+
+
+@lru_cache(maxsize=2048)
+def _recommend(theme_key, k, version):
+    index = load_theme_index(version)
+    # Exact theme name, then every lexicon theme one of its words belongs to
+    matched = index["themes"].get(theme_key)
+    sources = [matched] if matched else []
+    if not sources:
+        for term in tokenize(theme_key):
+            for name in index["keywords"].get(term, ()):
+                entry = index["themes"][normalize_theme(name)]
+                if entry not in sources:
+                    sources.append(entry)
+    if sources:
+        # Round-robin across the matched themes so one theme doesn't crowd out the rest
+        picked = []
+        for rank in range(max(len(refs) for _name, refs in sources)):
+            for name, refs in sources:
+                if rank < len(refs) and all(ref != refs[rank] for _n, ref in picked):
+                    picked.append((name, refs[rank]))
+            if len(picked) >= k:
+                break
+        return tuple(picked[:k])
+
+    # Theme words the lexicon doesn't know: rank verses directly
+    search = open_index(version)
+    if search is None:
+        # Raised rather than returned so lru_cache doesn't keep the miss
+        raise LookupError("No search index")
+    return tuple((theme_key.title(), hit["reference"]) for hit in search.search(theme_key, k))
+
+
+def recommend_verses(theme, k=5, version="WEB"):
+    """[(matched_theme, reference)] for any theme string, best first. Memoized per normalized theme.
+
+    Nothing is memoized while an index is missing, so building one takes effect without a restart.
+    """
+    version = version.upper()
+    if load_theme_index(version) is None:
+        return []
+    try:
+        return list(_recommend(normalize_theme(theme), k, version))
+    except LookupError:
+        return []
+
+
+def clear_cache():
+    """Forget memoized recommendations (after rebuilding the index)."""
+    _recommend.cache_clear()
+    with _themes_lock:
+        _themes.clear()
@@ -0,0 +1,146 @@
+"""End-to-end latency benchmark for analyze_spiritual_journal.
+
+Runs the real analysis path (secret lookup, client setup, request,
+json.loads, enhance_analysis) against the local DeepSeek stub, a cassette
+replay, or any OpenAI-compatible endpoint, and reports p50/p95/p99 per phase.
+
+Usage:
+  python tools/bench_analysis.py --iterations 200 --concurrency 8
+  python tools/bench_analysis.py --latency-ms 1500 --error-rate 0.05 --malformed-rate 0.02
+  python tools/bench_analysis.py --mode replay --cassette cassettes/deepseek.jsonl
+  python tools/bench_analysis.py --base-url https://api.deepseek.com   # real API, needs DEEPSEEK_API_KEY
+"""
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import git_revision, print_table, summarize, write_json
+from deepseek_stub import StubConfig, run_stub_server
+
+SAMPLE_ENTRIES = [
+    "Today I felt anxious about work again. I keep trying to trust God with my job but the worry "
+    "comes back every night. What I'm seeking: peace and guidance for the next step.",
+    "I am grateful for my family this week. We had dinner together and I felt real thankfulness "
+    "and calm. I want to keep this gratitude even when things get hard, and to be more patient with my kids.",
+    "I have been struggling to forgive my brother. Part of me wants reconciliation and part of me "
+    "wants him to feel what I felt. I read about mercy in Matthew 18 and it convicted me. "
+    "I prayed but it felt empty. How do I let go when I still feel the hurt? " * 3,
+]
+
+PHASES = ["secrets", "client", "prompt", "request", "parse", "enhance"]
+
+
+def long_entry(paragraphs=120):
+    """A pasted AI conversation long enough to trigger the map-reduce path."""
+    turns = []
+    for i in range(paragraphs):
+        turns.append(f"You said:\nDay {i}: I worried about money and my health, and I asked God for peace and trust.")
+        turns.append(f"ChatGPT said:\nThat sounds heavy. On day {i} you noticed fear but also small signs "
+                     f"of hope and care from friends. What helped you feel calm?")
+    return "\n\n".join(turns)
+
+
+def run(args):
+    if not args.base_url:
+        config = StubConfig(
+            mode=args.mode, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+            tokens_per_sec=args.tokens_per_sec, error_rate=args.error_rate,
+            malformed_rate=args.malformed_rate, cassette=args.cassette, seed=args.seed
+        )
+        server, base_url = run_stub_server(config)
+        os.environ.setdefault("DEEPSEEK_API_KEY", "stub-key")
+    else:
+        server, base_url = None, args.base_url
+    os.environ["DEEPSEEK_BASE_URL"] = base_url
+
+    # Import after the environment is set so settings resolve to the stub
+    from ai_analyzer import analyze_spiritual_journal
+    from metrics import InMemoryMetrics, set_metrics
+    metrics = set_metrics(InMemoryMetrics(window=max(1024, args.iterations)))
+
+    entries = SAMPLE_ENTRIES + ([long_entry()] if args.long else [])
+
+    def one(i):
+        started = time.perf_counter()
+        result = analyze_spiritual_journal(entries[i % len(entries)])
+        return (time.perf_counter() - started) * 1000, result
+
+    # Warm-up: imports, DNS, first TLS handshake
+    for i in range(min(args.warmup, args.iterations)):
+        one(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(one, range(args.iterations)))
+    wall = time.perf_counter() - started
+
+    if server:
+        server.shutdown()
+
+    end_to_end = []
+    phases = {phase: [] for phase in PHASES}
+    tokens = []
+    fallbacks = Counter()
+    for elapsed, result in outcomes:
+        end_to_end.append(elapsed)
+        if result.get("is_fallback"):
+            fallbacks[result.get("error", "unknown").split(":")[0]] += 1
+            continue
+        analysis_metrics = result.get("analysis_metrics", {})
+        for phase, value in analysis_metrics.get("timings_ms", {}).items():
+            phases.setdefault(phase, []).append(value)
+        tokens.append(analysis_metrics.get("total_tokens", 0))
+
+    rows = {"end_to_end": summarize(end_to_end)}
+    rows.update({phase: summarize(values) for phase, values in phases.items()})
+    print_table(f"analyze_spiritual_journal (ms) - {args.iterations} runs, concurrency {args.concurrency}", rows)
+    print(f"\nThroughput: {args.iterations / wall:.1f} analyses/s over {wall:.1f}s")
+    print(f"Fallbacks: {sum(fallbacks.values())} {dict(fallbacks) if fallbacks else ''}")
+    if tokens:
+        print(f"Tokens per analysis: mean {sum(tokens) / len(tokens):.0f}")
+    counters = metrics.snapshot()["counters"]
+    if counters:
+        print("Counters: " + ", ".join(f"{name}={value}" for name, value in sorted(counters.items())))
+
+    report = {
+        "revision": git_revision(),
+        "endpoint": "stub" if server else base_url,
+        "config": vars(args),
+        "throughput_per_sec": round(args.iterations / wall, 2),
+        "fallbacks": dict(fallbacks),
+        "timings_ms": rows,
+        "metrics": metrics.snapshot()
+    }
+    if args.output:
+        write_json(args.output, report)
+        print(f"Saved {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--long", action="store_true", help="Include a long pasted conversation (map-reduce path)")
+    parser.add_argument("--base-url", help="Benchmark a real endpoint instead of the bundled stub")
+    parser.add_argument("--mode", choices=["stub", "replay"], default="stub")
+    parser.add_argument("--cassette", help="Cassette to replay (with --mode replay)")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if args.mode == "replay" and not args.cassette:
+        parser.error("--cassette is required with --mode replay")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
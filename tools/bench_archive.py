@@ -0,0 +1,134 @@
+"""Benchmark JournalArchive operations on synthetic archives of growing size.
+
+For each archive size (default 10, 1k, 10k and 100k entries) a synthetic
+journal (realistic themes, emotions, passages and timestamps spread over three
+years) is written to a scratch data directory, then each operation is timed:
+
+  cold - a fresh archive object, so the time includes reading and parsing the files
+  warm - the shared, already-loaded archive (what a rerun or API call sees)
+
+Operations: get_entries, get_monthly_summaries, get_summary_insights, archive
+search, dashboard aggregation, and save_entry (on the loaded archive).
+
+Usage:
+  python tools/bench_archive.py
+  python tools/bench_archive.py --sizes 10 1000 --runs 10 --output bench/archive.json
+  python tools/bench_archive.py --compare bench/archive-main.json
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from bench_utils import git_revision, print_table, summarize, synthetic_entries, write_json
+
+import service
+from data_layout import shard_path
+from journal_archive import JournalArchive
+
+USER = "bench_archive"
+
+OPERATIONS = {
+    "get_entries": lambda root: service.get_archive(USER, root).get_entries(),
+    "get_monthly_summaries": lambda root: service.get_archive(USER, root).get_monthly_summaries(),
+    "get_summary_insights": lambda root: service.get_archive(USER, root).get_summary_insights(),
+    "search": lambda root: service.search_entries(USER, "grateful", data_root=root),
+    "dashboard": lambda root: service.dashboard_model(USER, root),
+}
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def bench_size(count, args):
+    """{"cold": {...}, "warm": {...}, "file_mb": ...} for an archive of `count` entries."""
+    root = tempfile.mkdtemp(prefix="mygrow-bench-archive-")
+    try:
+        user_dir = shard_path(USER, root)
+        os.makedirs(user_dir)
+        entries_file = os.path.join(user_dir, "journal_entries.json")
+        with open(entries_file, "w", encoding="utf-8") as f:
+            json.dump(synthetic_entries(count - 1, seed=args.seed), f, ensure_ascii=False, indent=2)
+        # The last entry goes through save_entry so patterns and timeline are as the app leaves them
+        entries = synthetic_entries(1, seed=args.seed + 1)
+        archive = JournalArchive(USER, root)
+        archive.save_entry(entries[0]["journal_text"], entries[0]["analysis"])
+        file_mb = os.path.getsize(entries_file) / 1024 / 1024
+
+        cold, warm = {}, {}
+        for name, operation in OPERATIONS.items():
+            cold[name] = []
+            for _ in range(args.runs):
+                service.clear_cache()
+                cold[name].append(_timed(operation, root))
+            warm[name] = [_timed(operation, root) for _ in range(args.runs)]
+
+        archive = service.get_archive(USER, root)
+        warm["save_entry"] = [_timed(archive.save_entry, entries[0]["journal_text"], entries[0]["analysis"])
+                              for _ in range(args.saves)]
+        service.clear_cache()
+        return {
+            "entries": count,
+            "file_mb": round(file_mb, 2),
+            "cold_ms": {name: summarize(samples) for name, samples in cold.items()},
+            "warm_ms": {name: summarize(samples) for name, samples in warm.items()}
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(report, baseline_path, threshold):
+    """Print mean-time ratios against an earlier report (>1 is slower now)."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} (revision {baseline.get('revision', 'unknown')}), mean ratio now/then:")
+    before = {result["entries"]: result for result in baseline.get("sizes", [])}
+    for result in report["sizes"]:
+        old = before.get(result["entries"])
+        if not old:
+            continue
+        for kind in ("cold_ms", "warm_ms"):
+            for name, stats in result[kind].items():
+                old_stats = old.get(kind, {}).get(name)
+                if old_stats and old_stats.get("mean") and stats.get("mean"):
+                    ratio = stats["mean"] / old_stats["mean"]
+                    flag = "  ⚠️" if ratio > 1 + threshold else ""
+                    print(f"  {result['entries']:>7} {kind[:4]} {name:<24}{ratio:>7.2f}x{flag}")
+
+
+def run(args):
+    sizes = []
+    for count in args.sizes:
+        result = bench_size(count, args)
+        sizes.append(result)
+        print_table(f"{count:,} entries ({result['file_mb']} MB) - cold (ms), {args.runs} runs", result["cold_ms"])
+        print_table("warm (ms)", result["warm_ms"])
+
+    report = {"revision": git_revision(), "config": vars(args), "sizes": sizes}
+    if args.compare:
+        compare(report, args.compare, args.threshold)
+    if args.output:
+        write_json(args.output, report)
+        print(f"Saved {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per operation")
+    parser.add_argument("--saves", type=int, default=3, help="Timed save_entry calls per size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Flag slowdowns above this fraction")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
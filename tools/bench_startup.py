@@ -0,0 +1,167 @@
+"""Cold-start benchmark for app.py.
+
+Reports
+  - cold import time of the heavy dependencies and the app modules, each in a
+    fresh interpreter,
+  - first-render and warm-rerun time of the auth page, the journal view, the
+    archive and the dashboard, each in a fresh interpreter via Streamlit's
+    AppTest, plus which heavy modules that view ended up loading.
+
+Each view runs in a scratch working directory, so user_data/ is never touched.
+The journal, archive and dashboard views use a seeded archive of --entries entries.
+
+Usage:
+  python tools/bench_startup.py
+  python tools/bench_startup.py --runs 5 --entries 200 --output startup.json
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from bench_utils import REPO_ROOT, git_revision, print_table, summarize, write_json
+from check_imports import HEAVY_MODULES, measure
+
+from data_layout import shard_path
+
+IMPORTS = ["streamlit", "pandas", "plotly.graph_objects", "openai", "requests", "ai_analyzer", "bible_integration"]
+
+BENCH_USER = {"sub": "bench_startup", "email": "bench@example.com", "name": "Bench"}
+SIGNED_IN = {
+    "auth_initialized": True,
+    "is_authenticated": True,
+    "user_info": BENCH_USER,
+    "auth_method": "demo"
+}
+VIEWS = {
+    "auth_page": {},
+    "journal": SIGNED_IN,
+    "archive": dict(SIGNED_IN, show_archive=True),
+    "dashboard": dict(SIGNED_IN, show_dashboard=True),
+}
+
+# Runs in the child interpreter: one AppTest, first render then a rerun
+_CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {repo!r})
+from streamlit.testing.v1 import AppTest
+before = set(sys.modules)
+app = AppTest.from_file({app!r}, default_timeout=120)
+for key, value in {state!r}.items():
+    app.session_state[key] = value
+started = time.perf_counter()
+app.run()
+first = (time.perf_counter() - started) * 1000
+started = time.perf_counter()
+app.run()
+rerun = (time.perf_counter() - started) * 1000
+loaded = sorted({{name.split(".")[0] for name in set(sys.modules) - before}})
+print(json.dumps({{"first_ms": first, "rerun_ms": rerun, "loaded": loaded,
+                  "exceptions": [str(e.value) for e in app.exception]}}))
+"""
+
+
+def seed_archive(workdir, count):
+    """A synthetic archive for the bench user, so the dashboard has data to chart."""
+    themes = ["Faith", "Hope", "Peace", "Anxiety", "Gratitude", "Love", "Guidance", "Patience"]
+    emotions = ["Reflective", "Anxious", "Grateful", "Hopeful", "Weary"]
+    rng = random.Random(7)
+    start = datetime.datetime(2025, 1, 1, 7, 30)
+    entries = []
+    for i in range(count):
+        when = start + datetime.timedelta(days=i * 365 // max(count, 1), minutes=i)
+        text = " ".join(rng.choice(["I prayed", "I worried", "I was grateful", "I trusted God", "I waited"])
+                        for _ in range(40))
+        analysis = {"primary_themes": rng.sample(themes, 2), "emotional_state": rng.sample(emotions, 2),
+                    "bible_passages": [{"reference": "Philippians 4:6", "text": "", "why_it_fits": ""}]}
+        entries.append({
+            "id": str(when.timestamp()), "timestamp": when.isoformat(), "date": when.strftime("%Y-%m-%d"),
+            "journal_text": text, "analysis": analysis, "themes": analysis["primary_themes"],
+            "emotions": analysis["emotional_state"], "bible_passages": analysis["bible_passages"],
+            "practical_steps": [], "word_count": len(text.split())
+        })
+    user_dir = shard_path(BENCH_USER["sub"], os.path.join(workdir, "user_data"))
+    os.makedirs(user_dir, exist_ok=True)
+    with open(os.path.join(user_dir, "journal_entries.json"), "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+
+
+def render(view, entries):
+    """First render and rerun of one view in a fresh interpreter."""
+    workdir = tempfile.mkdtemp(prefix="mygrow-startup-")
+    try:
+        if VIEWS[view]:
+            seed_archive(workdir, entries)
+        code = _CHILD.format(repo=REPO_ROOT, app=os.path.join(REPO_ROOT, "app.py"), state=VIEWS[view])
+        env = dict(os.environ, MYGROW_BIBLE_REMOTE="0")
+        output = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args):
+    imports = {}
+    for module in IMPORTS:
+        try:
+            imports[module] = [measure(module)["ms"] for _ in range(args.runs)]
+        except subprocess.CalledProcessError:
+            print(f"⚠️ {module} is not installed; skipped")
+    print_table(f"Cold import (ms) - fresh interpreter, {args.runs} runs", {
+        module: summarize(samples) for module, samples in imports.items()
+    })
+
+    first, rerun, loaded, problems = {}, {}, {}, {}
+    for view in args.views:
+        for _ in range(args.runs):
+            try:
+                result = render(view, args.entries)
+            except subprocess.CalledProcessError as e:
+                sys.exit(f"❌ {view} failed to render:\n{e.stderr.strip()[-2000:]}")
+            first.setdefault(view, []).append(result["first_ms"])
+            rerun.setdefault(view, []).append(result["rerun_ms"])
+            loaded[view] = [name for name in result["loaded"] if name in HEAVY_MODULES]
+            if result["exceptions"]:
+                problems[view] = result["exceptions"]
+
+    print_table(f"First render (ms) - {args.runs} runs, {args.entries} archived entries",
+                {view: summarize(samples) for view, samples in first.items()})
+    print_table("Warm rerun (ms)", {view: summarize(samples) for view, samples in rerun.items()})
+    print("\nHeavy modules loaded per view:")
+    for view, names in loaded.items():
+        print(f"  {view:<12} {', '.join(names) or '-'}")
+    for view, errors in problems.items():
+        print(f"⚠️ {view} raised: {errors}")
+
+    report = {
+        "revision": git_revision(),
+        "config": vars(args),
+        "import_ms": {module: summarize(samples) for module, samples in imports.items()},
+        "first_render_ms": {view: summarize(samples) for view, samples in first.items()},
+        "rerun_ms": {view: summarize(samples) for view, samples in rerun.items()},
+        "heavy_modules": loaded,
+        "exceptions": problems
+    }
+    if args.output:
+        write_json(args.output, report)
+        print(f"Saved {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--entries", type=int, default=50, help="Archived entries for the signed-in views")
+    parser.add_argument("--views", nargs="+", choices=list(VIEWS), default=list(VIEWS))
+    parser.add_argument("--output", help="Write the results as JSON")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
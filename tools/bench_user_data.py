@@ -0,0 +1,189 @@
+"""Benchmark the user data layout at large user counts: flat folders vs sharded.
+
+For each user count (default 100k; pass --users 1000000 for a million) a scratch
+data directory is filled with one small archive per user in the old flat layout
+(<root>/<user_id>), measured, migrated with data_layout.migrate_user (timed),
+and measured again in the sharded layout (<root>/ab/cd/<user_id>):
+
+  open    - resolve a random user's folder, read and parse journal_entries.json
+  create  - create a new user's folder and first file next to the existing ones
+  list    - enumerate every user id
+  backup  - walk the tree and stat every file (what an incremental backup does);
+            with --tar, also write an uncompressed tar of the whole directory
+
+The files are freshly written, so open times are page-cache hits; they show the
+cost of the directory lookups, not of the disk.
+
+Usage:
+  python tools/bench_user_data.py
+  python tools/bench_user_data.py --users 100000 1000000 --tar --output bench/user_data.json
+  python tools/bench_user_data.py --data-dir /mnt/ssd/scratch   # measure a real filesystem
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tarfile
+import tempfile
+import time
+
+from bench_utils import git_revision, print_table, summarize, synthetic_entries, write_json
+
+import data_layout
+
+ENTRIES_FILE = "journal_entries.json"
+
+
+def _user_ids(count):
+    return [f"user_{i:08x}" for i in range(count)]
+
+
+def _flat_path(user_id, root):
+    return os.path.join(root, user_id)
+
+
+def build_flat(root, users, data):
+    """Write one archive per user in the flat layout."""
+    for i, user_id in enumerate(users, 1):
+        path = _flat_path(user_id, root)
+        os.mkdir(path)
+        with open(os.path.join(path, ENTRIES_FILE), "w", encoding="utf-8") as f:
+            f.write(data)
+        if i % 100000 == 0:
+            print(f"  wrote {i:,}/{len(users):,}")
+
+
+def time_opens(root, users, resolve, samples, rng):
+    timings = []
+    for user_id in rng.sample(users, min(samples, len(users))):
+        started = time.perf_counter()
+        with open(os.path.join(resolve(user_id, root), ENTRIES_FILE), "r", encoding="utf-8") as f:
+            json.load(f)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def time_creates(root, resolve, samples, data, prefix):
+    timings = []
+    for i in range(samples):
+        started = time.perf_counter()
+        path = resolve(f"{prefix}_{i:06d}", root)
+        os.makedirs(path)
+        with open(os.path.join(path, ENTRIES_FILE), "w", encoding="utf-8") as f:
+            f.write(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def _list_flat(root):
+    with os.scandir(root) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
+
+
+def _backup_scan(root):
+    total = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            total += os.stat(os.path.join(directory, name)).st_size
+    return total
+
+
+def _backup_tar(root, scratch):
+    target = os.path.join(scratch, "backup.tar")
+    with tarfile.open(target, "w") as tar:
+        tar.add(root, arcname="user_data")
+    size = os.path.getsize(target)
+    os.remove(target)
+    return size
+
+
+def measure(root, users, resolve, list_users, args, data, label):
+    """Timings for one layout of an existing tree."""
+    rng = random.Random(args.seed)
+    result = {
+        "open_ms": summarize(time_opens(root, users, resolve, args.samples, rng)),
+        "create_ms": summarize(time_creates(root, resolve, args.samples, data, f"new_{label}")),
+    }
+    list_ms, listed = _timed(list_users, root)
+    scan_ms, total_bytes = _timed(_backup_scan, root)
+    result.update({"list_s": round(list_ms / 1000, 3), "listed": len(listed),
+                   "backup_scan_s": round(scan_ms / 1000, 3), "data_mb": round(total_bytes / 1024 / 1024, 1)})
+    if args.tar:
+        tar_ms, _ = _timed(_backup_tar, root, os.path.dirname(root))
+        result["backup_tar_s"] = round(tar_ms / 1000, 3)
+    return result
+
+
+def bench_count(count, args, data):
+    scratch = tempfile.mkdtemp(prefix="mygrow-bench-users-", dir=args.data_dir)
+    root = os.path.join(scratch, "user_data")
+    os.mkdir(root)
+    try:
+        users = _user_ids(count)
+        build_ms, _ = _timed(build_flat, root, users, data)
+        flat = measure(root, users, _flat_path, _list_flat, args, data, "flat")
+
+        legacy = data_layout.legacy_users(root)
+        migrate_ms, moved = _timed(lambda: sum(data_layout.migrate_user(user_id, root) for user_id in legacy))
+        sharded = measure(root, users, data_layout.shard_path, lambda r: list(data_layout.iter_users(r)),
+                          args, data, "sharded")
+        return {
+            "users": count,
+            "build_flat_s": round(build_ms / 1000, 3),
+            "migrate_s": round(migrate_ms / 1000, 3),
+            "migrated": moved,
+            "flat": flat,
+            "sharded": sharded
+        }
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def print_result(result, samples):
+    print_table(f"{result['users']:,} users - per-user operations (ms), {samples} samples", {
+        f"{op} {layout}": result[layout][f"{op}_ms"]
+        for op in ("open", "create") for layout in ("flat", "sharded")
+    })
+    print(f"\n{'':<24}{'flat':>11}{'sharded':>11}")
+    for key in ("list_s", "backup_scan_s", "backup_tar_s"):
+        if key in result["flat"]:
+            print(f"{key:<24}{result['flat'][key]:>11.2f}{result['sharded'][key]:>11.2f}")
+    print(f"migrate {result['migrated']:,} folders: {result['migrate_s']:.2f}s")
+
+
+def run(args):
+    data = json.dumps(synthetic_entries(args.entries, seed=args.seed), ensure_ascii=False)
+    results = []
+    for count in args.users:
+        result = bench_count(count, args, data)
+        results.append(result)
+        print_result(result, args.samples)
+
+    report = {"revision": git_revision(), "config": vars(args), "results": results}
+    if args.output:
+        write_json(args.output, report)
+        print(f"Saved {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[100000])
+    parser.add_argument("--entries", type=int, default=3, help="Journal entries per user")
+    parser.add_argument("--samples", type=int, default=2000, help="Timed opens and creates per layout")
+    parser.add_argument("--tar", action="store_true", help="Also time a full tar backup")
+    parser.add_argument("--data-dir", help="Where to build the scratch trees (default: the temp directory)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark the SQLite user store at scale.
+
+Seeds a scratch store with --users accounts (rows inserted directly, all
+sharing one precomputed scrypt hash, so seeding takes seconds), then times:
+
+  authenticate_hit    correct password for a random registered email
+  authenticate_miss   unknown email (still pays one KDF, by design)
+  register            a brand-new account
+  verify_cached       session token already in the in-memory cache
+  verify_uncached     session token looked up in SQLite (fresh store object)
+
+Use --scrypt-n to see how the KDF cost dominates sign-in latency.
+
+Usage:
+  python tools/bench_user_store.py --users 100000
+  python tools/bench_user_store.py --users 100000 --scrypt-n 16384 --output users.json
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from bench_utils import git_revision, print_table, summarize, write_json
+
+import user_store
+from user_store import SCRYPT_P, SCRYPT_R, UserStore
+
+PASSWORD = "correct horse battery"
+
+
+def seed(path, count, scrypt_n):
+    """Create the schema through the store, then bulk-insert `count` accounts."""
+    UserStore(path, scrypt_n).count()
+    salt = os.urandom(16)
+    key = user_store._derive(PASSWORD, salt, scrypt_n, SCRYPT_R, SCRYPT_P)
+    now = time.time()
+    db = sqlite3.connect(path)
+    with db:
+        db.executemany(
+            "INSERT INTO users (user_id, email, name, password_hash, salt, n, r, p, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((f"bench_{i:07d}", f"user{i}@bench.example", f"User {i}", key, salt, scrypt_n, SCRYPT_R, SCRYPT_P, now)
+             for i in range(count))
+        )
+    db.close()
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def run(args):
+    directory = tempfile.mkdtemp(prefix="mygrow-users-")
+    path = os.path.join(directory, "users.sqlite3")
+    rng = random.Random(args.seed)
+    try:
+        started = time.perf_counter()
+        seed(path, args.users, args.scrypt_n)
+        seed_s = time.perf_counter() - started
+
+        store = UserStore(path, args.scrypt_n)
+        emails = [f"user{rng.randrange(args.users)}@bench.example" for _ in range(args.runs)]
+        timings = {
+            "authenticate_hit": [_timed(store.authenticate, email, PASSWORD) for email in emails],
+            "authenticate_miss": [_timed(store.authenticate, f"nobody{i}@bench.example", PASSWORD)
+                                  for i in range(args.runs)],
+            "register": [_timed(store.register, f"new{i}@bench.example", PASSWORD, "New")
+                         for i in range(args.runs)],
+        }
+        tokens = [store.create_session({"sub": f"bench_{i:07d}", "email": email, "name": ""})
+                  for i, email in enumerate(emails)]
+        timings["verify_cached"] = [_timed(store.verify_session, token) for token in tokens]
+        fresh = UserStore(path, args.scrypt_n)
+        timings["verify_uncached"] = [_timed(fresh.verify_session, token) for token in tokens]
+
+        rows = {name: summarize(samples) for name, samples in timings.items()}
+        print_table(f"User store (ms) - {store.count():,} accounts, scrypt N={args.scrypt_n}, "
+                    f"{args.runs} runs (seeded in {seed_s:.1f}s)", rows)
+        report = {
+            "revision": git_revision(),
+            "config": vars(args),
+            "accounts": store.count(),
+            "db_mb": round(os.path.getsize(path) / 1024 / 1024, 2),
+            "timings_ms": rows
+        }
+        if args.output:
+            write_json(args.output, report)
+            print(f"Saved {args.output}")
+        return report
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--scrypt-n", type=int, default=user_store.SCRYPT_N)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Shared helpers for the benchmark and load-test scripts in tools/."""
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+
+# Make the app modules importable when a script is run as `python tools/<script>.py`
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(samples):
+    """count/mean/p50/p95/p99/max for a list of millisecond timings."""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean": round(sum(samples) / len(samples), 3),
+        "p50": round(percentile(samples, 50), 3),
+        "p95": round(percentile(samples, 95), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "max": round(max(samples), 3)
+    }
+
+
+def print_table(title, rows):
+    """Print {name: summarize(...)} as an aligned table."""
+    print(f"\n{title}")
+    print(f"{'':<24}{'count':>8}{'mean':>11}{'p50':>11}{'p95':>11}{'p99':>11}{'max':>11}")
+    for name, stats in rows.items():
+        if not stats.get("count"):
+            print(f"{name:<24}{0:>8}")
+            continue
+        print(f"{name:<24}{stats['count']:>8}" + "".join(
+            f"{stats[key]:>11.2f}" for key in ("mean", "p50", "p95", "p99", "max")
+        ))
+
+
+def git_revision():
+    """Short commit hash of the working tree, or 'unknown'."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_json(path, data):
+    """Write benchmark results as pretty JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+SYNTHETIC_THEMES = ["Faith", "Hope", "Love", "Peace", "Joy", "Patience", "Gratitude", "Forgiveness",
+                    "Anxiety", "Guidance", "Grief", "Strength", "Prayer", "Grace", "Surrender", "Trust"]
+SYNTHETIC_EMOTIONS = ["Reflective", "Anxious", "Grateful", "Hopeful", "Weary", "Peaceful", "Sad", "Joyful"]
+SYNTHETIC_PASSAGES = ["Philippians 4:6-7", "Psalm 23:1", "Proverbs 3:5-6", "Matthew 11:28", "Isaiah 41:10",
+                      "Romans 8:28", "Jeremiah 29:11", "John 14:27", "Lamentations 3:22-23", "James 1:5"]
+_SENTENCES = ["I prayed this morning before work.", "I worried about money again.",
+              "I felt grateful for my family.", "I asked God for direction.", "I could not sleep.",
+              "A friend called and encouraged me.", "I read the Psalms slowly.", "I felt far from God.",
+              "I am learning to wait.", "I want to forgive, but it is hard."]
+
+
+def synthetic_entries(count, seed=7, start=datetime.datetime(2022, 1, 1, 7, 0), days=1095):
+    """`count` archive entries in JournalArchive's format, spread over `days` days, oldest first."""
+    rng = random.Random(seed)
+    step = days * 86400 / max(count, 1)
+    entries = []
+    for i in range(count):
+        when = start + datetime.timedelta(seconds=int(i * step) + rng.randint(0, 3600))
+        text = " ".join(rng.choice(_SENTENCES) for _ in range(rng.randint(4, 40)))
+        themes = rng.sample(SYNTHETIC_THEMES, rng.randint(2, 4))
+        emotions = rng.sample(SYNTHETIC_EMOTIONS, rng.randint(1, 3))
+        passages = [{"reference": ref, "text": "", "why_it_fits": ""}
+                    for ref in rng.sample(SYNTHETIC_PASSAGES, rng.randint(1, 3))]
+        analysis = {"primary_themes": themes, "emotional_state": emotions, "bible_passages": passages,
+                    "practical_steps": ["Pray for five minutes", "Write down one gratitude"]}
+        entries.append({
+            "id": str(when.timestamp()), "timestamp": when.isoformat(), "date": when.strftime("%Y-%m-%d"),
+            "journal_text": text, "analysis": analysis, "themes": themes, "emotions": emotions,
+            "bible_passages": passages, "practical_steps": analysis["practical_steps"],
+            "word_count": len(text.split())
+        })
+    return entries
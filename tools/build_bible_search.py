@@ -0,0 +1,52 @@
+"""Build the offline search index (data/bible_<version>.mgi) from the verse store.
+
+Run after tools/build_bible_store.py; the index refers to verses by their
+position in the store, so rebuild it whenever the store is rebuilt.
+
+Usage:
+  python tools/build_bible_search.py
+  python tools/build_bible_search.py --version WEB --query "the Lord is my shepherd"
+"""
+import argparse
+import sys
+import time
+
+import bench_utils  # noqa: F401  (puts the repo root on sys.path)
+from bible_search import SearchIndex, index_path, write_index
+from bible_store import BibleStore, store_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", default="WEB", help="Translation id (default WEB)")
+    parser.add_argument("--store", help="Store file (default data/bible_<version>.mgb)")
+    parser.add_argument("--output", help="Output path (default data/bible_<version>.mgi)")
+    parser.add_argument("--query", action="append", default=[], help="Sample query to run afterwards")
+    args = parser.parse_args()
+
+    store_file = args.store or store_path(args.version)
+    output = args.output or index_path(args.version)
+    try:
+        store = BibleStore(store_file)
+    except OSError as e:
+        sys.exit(f"❌ Could not open {store_file}: {e} (build it with tools/build_bible_store.py)")
+
+    started = time.perf_counter()
+    terms, postings = write_index(output, store)
+    print(f"✅ Indexed {store.count} verses ({terms} terms, {postings} postings) "
+          f"to {output} in {time.perf_counter() - started:.1f}s")
+
+    index = SearchIndex(output, store)
+    for query in args.query or ["anxious", "\"my shepherd\""]:
+        started = time.perf_counter()
+        results = index.search(query, k=3)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\n{query!r} ({elapsed:.2f} ms)")
+        for result in results:
+            print(f"  {result['reference']:<22} {result['score']:>6}  {result['text'][:70]}")
+    index.close()
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Build the offline Bible store (data/bible_<version>.mgb).
+
+Sources:
+  --tsv FILE     tab-separated "book<TAB>chapter<TAB>verse<TAB>text" rows, where book
+                 is a canonical name ("1 Corinthians") or a 1-66 book number
+  --from-api     download chapter by chapter from bible-api.com (public-domain
+                 translations such as WEB; ~1,200 requests, so be patient)
+
+Usage:
+  python tools/build_bible_store.py --tsv web.tsv
+  python tools/build_bible_store.py --from-api --version WEB --delay 2
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+import bench_utils  # noqa: F401  (puts the repo root on sys.path)
+from bible_integration import get_chapter_list
+from bible_store import BibleStore, store_path, write_store
+from scripture_refs import BOOK_NAMES, book_id_for
+
+
+def read_tsv(path):
+    """Rows from a book/chapter/verse/text TSV file."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for line_number, row in enumerate(csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE), 1):
+            if not row or row[0].startswith("#"):
+                continue
+            if len(row) < 4:
+                raise ValueError(f"{path}:{line_number}: expected 4 columns, got {len(row)}")
+            book, chapter, verse, text = row[0], row[1], row[2], "\t".join(row[3:])
+            book_id = int(book) if book.isdigit() else book_id_for(book)
+            if not book_id:
+                raise ValueError(f"{path}:{line_number}: unknown book {book!r}")
+            yield book_id, int(chapter), int(verse), text
+
+
+def download_chapters(version, delay):
+    """Rows for every chapter from bible-api.com."""
+    for book_id, book in enumerate(BOOK_NAMES, 1):
+        for chapter in get_chapter_list(book):
+            url = (f"https://bible-api.com/{urllib.parse.quote(f'{book} {chapter}')}"
+                   f"?translation={version.lower()}")
+            for attempt in range(5):
+                try:
+                    with urllib.request.urlopen(url, timeout=30) as response:
+                        data = json.loads(response.read())
+                    break
+                except OSError as e:
+                    wait = delay * 2 ** (attempt + 1)
+                    print(f"⚠️ {book} {chapter}: {e} - retrying in {wait:.0f}s", file=sys.stderr)
+                    time.sleep(wait)
+            else:
+                raise RuntimeError(f"Could not download {book} {chapter}")
+
+            for verse in data.get("verses", []):
+                yield book_id, int(verse["chapter"]), int(verse["verse"]), verse["text"]
+            print(f"  {book} {chapter}", end="\r", file=sys.stderr)
+            time.sleep(delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--tsv", help="Tab-separated source file")
+    source.add_argument("--from-api", action="store_true", help="Download from bible-api.com")
+    parser.add_argument("--version", default="WEB", help="Translation id (default WEB)")
+    parser.add_argument("--delay", type=float, default=2.0, help="Seconds between API requests")
+    parser.add_argument("--output", help="Output path (default data/bible_<version>.mgb)")
+    args = parser.parse_args()
+
+    rows = read_tsv(args.tsv) if args.tsv else download_chapters(args.version, args.delay)
+    output = args.output or store_path(args.version)
+
+    started = time.perf_counter()
+    count = write_store(output, rows)
+    print(f"✅ Wrote {count} verses to {output} in {time.perf_counter() - started:.1f}s")
+
+    # Sanity check: read a well-known verse back
+    store = BibleStore(output)
+    sample = store.get_verse(book_id_for("John"), 3, 16)
+    print(f"John 3:16 -> {sample[:80] + '...' if sample else 'MISSING'}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
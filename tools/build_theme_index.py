@@ -0,0 +1,63 @@
+"""Build the theme -> verse recommendation index (data/bible_<version>.themes.json).
+
+Scores every verse in the offline store against each theme's lexicon
+(SPIRITUAL_THEMES keywords plus theme_index.THEME_LEXICON) with TF-IDF and
+keeps the top verses per theme. Run after tools/build_bible_store.py.
+
+Usage:
+  python tools/build_theme_index.py
+  python tools/build_theme_index.py --top 40 --theme Anxiety --theme "trusting God"
+"""
+import argparse
+import sys
+import time
+
+import bench_utils  # noqa: F401  (puts the repo root on sys.path)
+from ai_analyzer import SPIRITUAL_THEMES
+from bible_store import BibleStore, store_path
+from theme_index import (
+    THEME_LEXICON, TOP_VERSES_PER_THEME, build_theme_index, clear_cache, recommend_verses,
+    themes_path, write_theme_index
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", default="WEB", help="Translation id (default WEB)")
+    parser.add_argument("--top", type=int, default=TOP_VERSES_PER_THEME, help="Verses kept per theme")
+    parser.add_argument("--theme", action="append", default=[], help="Sample theme to look up afterwards")
+    args = parser.parse_args()
+
+    try:
+        store = BibleStore(store_path(args.version))
+    except OSError as e:
+        sys.exit(f"❌ Could not open the {args.version} store: {e} (build it with tools/build_bible_store.py)")
+
+    themes = {theme: list(keywords) for theme, keywords in THEME_LEXICON.items()}
+    for theme, keywords in SPIRITUAL_THEMES.items():
+        themes.setdefault(theme, [])
+        themes[theme] += [k for k in keywords if k not in themes[theme]]
+
+    started = time.perf_counter()
+    index = build_theme_index(store, themes, args.top)
+    output = themes_path(args.version)
+    write_theme_index(output, index)
+    print(f"✅ Indexed {len(index['themes'])} themes over {store.count} verses to {output} "
+          f"in {time.perf_counter() - started:.1f}s")
+    store.close()
+
+    clear_cache()
+    for theme in args.theme or ["Anxiety", "Trusting God in uncertainty"]:
+        started = time.perf_counter()
+        picks = recommend_verses(theme, version=args.version)
+        cold = (time.perf_counter() - started) * 1e6
+        started = time.perf_counter()
+        recommend_verses(theme, version=args.version)
+        warm = (time.perf_counter() - started) * 1e6
+        print(f"\n{theme!r} (cold {cold:.0f} µs, memoized {warm:.1f} µs)")
+        for matched, reference in picks:
+            print(f"  {reference:<22} via {matched}")
+
+
+if __name__ == "__main__":
+    main()
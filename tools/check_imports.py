@@ -0,0 +1,85 @@
+"""Import-time budget check for the non-UI modules.
+
+Imports each module in a fresh interpreter and fails (exit 1) if the import
+  - takes longer than the budget (best of --runs),
+  - pulls in a heavy dependency (openai, streamlit, requests, pandas, plotly),
+  - opens a non-module file, touches the network or starts a process.
+
+Usage:
+  python tools/check_imports.py
+  python tools/check_imports.py --budget-ms 100 --runs 7 ai_analyzer
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from bench_utils import REPO_ROOT
+
+DEFAULT_MODULES = ["ai_analyzer", "bible_integration"]
+HEAVY_MODULES = ["openai", "streamlit", "requests", "urllib3", "pandas", "plotly"]
+DEFAULT_BUDGET_MS = 75.0
+
+# Runs in the child interpreter: audit hook, timed import, JSON report on stdout
+_CHILD = r"""
+import json, sys, time
+events = []
+def hook(event, args):
+    if event == "open":
+        path = str(args[0])
+        if not path.endswith((".py", ".pyc", ".so", ".pyd", ".pth")) and "__pycache__" not in path:
+            events.append(f"open {path}")
+    elif event.startswith("socket.") or event in ("subprocess.Popen", "os.system"):
+        events.append(event)
+sys.addaudithook(hook)
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({"ms": elapsed, "events": events, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure(module):
+    """One cold import in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD.replace("{module}", module)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        try:
+            runs = [measure(module) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            failures.append(f"{module}: import failed\n{e.stderr.strip()}")
+            continue
+
+        best = min(run["ms"] for run in runs)
+        heavy = sorted({name.split(".")[0] for name in runs[0]["modules"]} & set(HEAVY_MODULES))
+        events = sorted({event for run in runs for event in run["events"]})
+        status = "✅" if best <= args.budget_ms and not heavy and not events else "❌"
+        print(f"{status} {module:<20} {best:7.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+        if best > args.budget_ms:
+            failures.append(f"{module}: {best:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        if heavy:
+            failures.append(f"{module}: imports {', '.join(heavy)} at import time")
+        for event in events:
+            failures.append(f"{module}: I/O during import: {event}")
+
+    for failure in failures:
+        print(f"  {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
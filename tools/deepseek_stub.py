@@ -0,0 +1,315 @@
+"""Local OpenAI-compatible stand-in for the DeepSeek API.
+
+Modes:
+  stub    - synthesize responses with configurable latency, token rate,
+            error rate and malformed-JSON rate (default)
+  record  - proxy to the real API and append every response to a cassette
+  replay  - serve responses from a cassette, keyed by the request body
+
+Usage:
+  python tools/deepseek_stub.py --port 8765 --latency-ms 800 --tokens-per-sec 60
+  python tools/deepseek_stub.py --mode record --cassette cassettes/deepseek.jsonl
+  python tools/deepseek_stub.py --mode replay --cassette cassettes/deepseek.jsonl
+
+Point the app at it with DEEPSEEK_BASE_URL=http://127.0.0.1:8765 and any
+DEEPSEEK_API_KEY.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UPSTREAM_URL = "https://api.deepseek.com"
+
+STUB_ANALYSIS = {
+    "analysis_summary": "A season of anxious waiting that is slowly turning into trust",
+    "primary_themes": ["Faith", "Peace", "Anxiety", "Guidance"],
+    "emotional_state": ["Anxious", "Hopeful", "Tired"],
+    "core_question": "Can I trust God with what I cannot control?",
+    "key_insight": "Your worry is pointing at what you love most. Naming it before God turns it into prayer.",
+    "bible_passages": [
+        {
+            "reference": "Philippians 4:6-7",
+            "text": "Do not be anxious about anything, but in every situation, by prayer and petition, with thanksgiving, present your requests to God.",
+            "why_it_fits": "You describe carrying worry alone; Paul invites you to hand it over specifically.",
+            "application": "Write each worry down and pray over it by name."
+        },
+        {
+            "reference": "Proverbs 3:5-6",
+            "text": "Trust in the Lord with all your heart and lean not on your own understanding.",
+            "why_it_fits": "You are trying to see the whole path before taking a step.",
+            "application": "Take the next faithful step without needing the full map."
+        }
+    ],
+    "practical_steps": [
+        "Spend five minutes in silence each morning",
+        "Name one worry in prayer each evening",
+        "Tell a friend what you are waiting for"
+    ],
+    "prayer_starter": "Lord, I bring You what keeps me awake. Teach me to rest in Your care.",
+    "encouragement": "Your honesty is already a step of faith.",
+    "growth_areas": ["Trust", "Rest"],
+    "scriptural_promise": "Isaiah 26:3 - You will keep in perfect peace those whose minds are steadfast."
+}
+
+STUB_SUMMARY = (
+    "The writer feels anxious about work and family, asks whether God hears them, "
+    "mentions Psalm 23 and wants to pray more consistently."
+)
+
+
+def estimate_tokens(text):
+    """Same rough estimate the prompt builder uses (~4 chars per token)."""
+    return len(text) // 4 + 1
+
+
+def cassette_key(body):
+    """Stable key for a chat completion request (ignores stream/user fields)."""
+    relevant = {k: body.get(k) for k in ("model", "messages", "temperature", "max_tokens", "response_format")}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Append-only JSONL store of recorded API responses."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.responses = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.responses[record["key"]] = record
+
+    def get(self, key):
+        return self.responses.get(key)
+
+    def add(self, key, status, body, latency_ms):
+        record = {"key": key, "status": status, "body": body, "latency_ms": latency_ms}
+        with self.lock:
+            self.responses[key] = record
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class StubConfig:
+    """Behaviour knobs for the stub server."""
+
+    def __init__(self, mode="stub", latency_ms=500.0, jitter_ms=100.0, tokens_per_sec=0.0,
+                 error_rate=0.0, malformed_rate=0.0, cassette=None, upstream=UPSTREAM_URL,
+                 replay_latency=False, seed=None):
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.cassette = Cassette(cassette) if cassette else None
+        self.upstream = upstream.rstrip("/")
+        self.replay_latency = replay_latency
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0, "malformed": 0, "replayed": 0, "recorded": 0}
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+
+def _completion(body, content):
+    """Wrap content in an OpenAI chat.completion response."""
+    prompt_text = "".join(m.get("content", "") for m in body.get("messages", []))
+    prompt_tokens = estimate_tokens(prompt_text)
+    completion_tokens = estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-stub-{random.getrandbits(48):012x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "deepseek-chat"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def _error(status, message, kind="server_error"):
+    return status, {"error": {"message": message, "type": kind, "code": status}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "DeepSeekStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/models", "/v1/models"):
+            self._send(200, {"object": "list", "data": [{"id": "deepseek-chat", "object": "model"}]})
+        elif self.path == "/stats":
+            self._send(200, self.config.stats)
+        else:
+            self._send(*_error(404, f"Unknown path {self.path}", "invalid_request_error"))
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+            self._send(*_error(404, f"Unknown path {self.path}", "invalid_request_error"))
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            self._send(*_error(400, "Request body is not JSON", "invalid_request_error"))
+            return
+
+        self.config.count("requests")
+        if self.config.mode == "record":
+            status, payload = self._record(body, raw)
+        elif self.config.mode == "replay":
+            status, payload = self._replay(body)
+        else:
+            status, payload = self._stub(body)
+        self._send(status, payload)
+
+    def _stub(self, body):
+        config = self.config
+        delay = max(0.0, config.random.gauss(config.latency_ms, config.jitter_ms)) / 1000
+
+        if config.random.random() < config.error_rate:
+            config.count("errors")
+            time.sleep(delay)
+            status = config.random.choice([429, 500, 502, 503])
+            return _error(status, "Simulated upstream failure")
+
+        wants_json = (body.get("response_format") or {}).get("type") == "json_object"
+        content = json.dumps(STUB_ANALYSIS) if wants_json else STUB_SUMMARY
+        if config.random.random() < config.malformed_rate:
+            config.count("malformed")
+            content = content[: len(content) // 2]
+
+        # Simulate generation time for the completion tokens
+        if config.tokens_per_sec > 0:
+            max_tokens = body.get("max_tokens") or estimate_tokens(content)
+            delay += min(estimate_tokens(content), max_tokens) / config.tokens_per_sec
+
+        time.sleep(delay)
+        return 200, _completion(body, content)
+
+    def _record(self, body, raw):
+        config = self.config
+        request = urllib.request.Request(
+            config.upstream + "/chat/completions",
+            data=raw,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": self.headers.get("Authorization", "")
+            },
+            method="POST"
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                status, payload = response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, json.loads(e.read() or b"{}")
+        except (urllib.error.URLError, TimeoutError) as e:
+            return _error(502, f"Upstream unreachable: {e}")
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if config.cassette:
+            config.cassette.add(cassette_key(body), status, payload, latency_ms)
+            config.count("recorded")
+        return status, payload
+
+    def _replay(self, body):
+        config = self.config
+        record = config.cassette.get(cassette_key(body)) if config.cassette else None
+        if record is None:
+            return _error(404, "No cassette entry for this request", "cassette_miss")
+
+        config.count("replayed")
+        if config.replay_latency:
+            time.sleep(record["latency_ms"] / 1000)
+        return record["status"], record["body"]
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def run_stub_server(config=None, host="127.0.0.1", port=0, verbose=False):
+    """Start the stub in a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.config = config or StubConfig()
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=["stub", "record", "replay"], default="stub")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Mean time to first byte")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Std-dev of the latency")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Completion generation rate (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/5xx")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of responses with truncated JSON")
+    parser.add_argument("--cassette", help="JSONL cassette file for record/replay")
+    parser.add_argument("--upstream", default=UPSTREAM_URL, help="Real API base URL for record mode")
+    parser.add_argument("--replay-latency", action="store_true", help="Sleep for the recorded latency on replay")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if args.mode != "stub" and not args.cassette:
+        parser.error(f"--cassette is required in {args.mode} mode")
+
+    config = StubConfig(
+        mode=args.mode, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        tokens_per_sec=args.tokens_per_sec, error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate, cassette=args.cassette,
+        upstream=args.upstream, replay_latency=args.replay_latency, seed=args.seed
+    )
+    server, base_url = run_stub_server(config, args.host, args.port, args.verbose)
+    print(f"🧪 DeepSeek stub ({args.mode}) listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""Multi-user load test for the journal core, with local stand-ins for every API.
+
+Simulates concurrent users running realistic sessions:
+  login -> analyze an entry -> save it -> dashboard -> search the archive -> look up verses
+against service.py in-process (default), an http_api.py started here (--serve-api),
+or one already running (--api). DeepSeek is replaced by tools/deepseek_stub.py and
+bible-api.com by a small local stub, and the verse cache lives in a scratch
+directory, so nothing reaches the network or the app's real cache. Each
+concurrency level runs on a fresh data directory (--serve-api: one for the run).
+
+An http_api.py you started yourself (--api) does not see the stubs: it calls
+whatever DeepSeek and bible-api.com its own environment points at, and fills
+its own verse cache. Use --serve-api unless that is what you want to measure.
+
+Reports, per operation and level:
+  - throughput and latency percentiles,
+  - file opens (read / write) and JSON bytes parsed per operation (in-process only),
+  - memory retained per session and peak (tracemalloc, in-process only).
+
+Usage:
+  python tools/load_test.py --users 200 --levels 10 50 100 200
+  python tools/load_test.py --users 100 --sessions 5 --prefill 1000 --output load.json
+  python tools/load_test.py --serve-api 4 --users 200 --levels 50
+  python tools/load_test.py --api http://127.0.0.1:8600 --users 200 --levels 50
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_utils import REPO_ROOT, git_revision, print_table, summarize, synthetic_entries, write_json
+from deepseek_stub import StubConfig, run_stub_server
+
+import profiler
+from data_layout import shard_path
+
+OPERATIONS = ["login", "analyze", "save", "dashboard", "search", "verses"]
+
+JOURNAL_LINES = [
+    "I felt anxious about work again today and tried to hand it over in prayer.",
+    "Grateful for a quiet morning and for my family around the table.",
+    "I am struggling to forgive a friend; mercy feels far away.",
+    "Waiting on God for direction about the move. Patience is hard.",
+    "Psalm 23 came to mind when I could not sleep. The Lord is my shepherd.",
+    "I want to trust more and worry less, but fear keeps creeping back in.",
+]
+SEARCH_TERMS = ["faith", "peace", "anxious", "grateful", "forgive", "hope", "trust"]
+
+
+class _BibleStubHandler(BaseHTTPRequestHandler):
+    """Answers GET /<reference> in bible-api.com's shape."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        reference = urllib.parse.unquote(self.path.split("?")[0].lstrip("/"))
+        chapter, _, verse = reference.rpartition(" ")[2].partition(":")
+        verse = verse.split("-")[0] or "1"
+        payload = {
+            "reference": reference,
+            "verses": [{"book_name": reference.rpartition(" ")[0], "chapter": int(chapter or 1),
+                        "verse": int(verse), "text": f"Stub text for {reference}.\n"}],
+            "text": f"Stub text for {reference}.\n"
+        }
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def run_bible_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BibleStubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# File opens per operation, attributed through a thread-local "current operation";
+# JSON bytes parsed come from the app's own profiler counters
+_current = threading.local()
+_io_lock = threading.Lock()
+_io = {}
+
+
+def _audit(event, args):
+    if event != "open":
+        return
+    op = getattr(_current, "op", None)
+    if op is None or not isinstance(args[0], (str, bytes)):
+        return
+    mode, flags = args[1], args[2]
+    writes = any(c in mode for c in "wax+") if isinstance(mode, str) else bool(flags & (os.O_WRONLY | os.O_RDWR))
+    with _io_lock:
+        counts = _io.setdefault(op, [0, 0, 0])
+        counts[1 if writes else 0] += 1
+
+
+class InProcessClient:
+    """Calls service.py directly; file I/O and memory are measurable."""
+
+    measures_io = True
+
+    def __init__(self, data_root):
+        import service
+        self.service = service
+        self.data_root = data_root
+
+    def login(self, user_id):
+        self.service.get_archive(user_id, self.data_root)
+
+    def analyze(self, text):
+        return self.service.analyze(text)
+
+    def save(self, user_id, text, analysis):
+        self.service.save_entry(user_id, text, analysis, self.data_root)
+
+    def dashboard(self, user_id):
+        self.service.dashboard_model(user_id, self.data_root)
+
+    def search(self, user_id, term):
+        self.service.search_entries(user_id, term, data_root=self.data_root)
+
+    def verse(self, reference):
+        self.service.lookup_verse(reference)
+
+
+class HttpClient:
+    """Drives a running http_api.py (its own processes, so only latency is measured)."""
+
+    measures_io = False
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def _call(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def login(self, user_id):
+        self._call("GET", f"/users/{user_id}/entries?limit=1")
+
+    def analyze(self, text):
+        return self._call("POST", "/analyze", {"journal_text": text})
+
+    def save(self, user_id, text, analysis):
+        self._call("POST", f"/users/{user_id}/entries", {"journal_text": text, "analysis": analysis})
+
+    def dashboard(self, user_id):
+        self._call("GET", f"/users/{user_id}/dashboard")
+
+    def search(self, user_id, term):
+        self._call("GET", f"/users/{user_id}/entries/search?q={urllib.parse.quote(term)}")
+
+    def verse(self, reference):
+        self._call("GET", f"/verses?ref={urllib.parse.quote(reference)}")
+
+
+def session(client, user_id, rng, timings, errors):
+    """One user visit; every step is timed under its operation name."""
+    def step(op, func, *args):
+        _current.op = op
+        profiler.start(True)
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception as e:
+            with _io_lock:
+                errors[op] = errors.get(op, 0) + 1
+                first = errors[op] == 1
+            if first:
+                print(f"⚠️ {op} error: {e}")
+            return None
+        finally:
+            timings[op].append((time.perf_counter() - started) * 1000)
+            _current.op = None
+            parsed = profiler.report()["bytes"]
+            if parsed:
+                with _io_lock:
+                    _io.setdefault(op, [0, 0, 0])[2] += parsed
+
+    text = " ".join(rng.sample(JOURNAL_LINES, 3))
+    step("login", client.login, user_id)
+    analysis = step("analyze", client.analyze, text) or {}
+    step("save", client.save, user_id, text, analysis)
+    step("dashboard", client.dashboard, user_id)
+    step("search", client.search, user_id, rng.choice(SEARCH_TERMS))
+    for passage in analysis.get("bible_passages", [])[:3]:
+        step("verses", client.verse, passage.get("reference", "John 3:16"))
+
+
+def prefill(data_root, users, count):
+    """Give every user an existing archive of `count` entries."""
+    entries = synthetic_entries(count, seed=11)
+    data = json.dumps(entries, ensure_ascii=False)
+    for user in users:
+        user_dir = shard_path(user, data_root)
+        os.makedirs(user_dir, exist_ok=True)
+        with open(os.path.join(user_dir, "journal_entries.json"), "w", encoding="utf-8") as f:
+            f.write(data)
+
+
+def run_level(args, concurrency):
+    data_root = tempfile.mkdtemp(prefix="mygrow-load-")
+    users = [f"load_user_{i:04d}" for i in range(args.users)]
+    try:
+        if args.prefill and not args.api:
+            prefill(data_root, users, args.prefill)
+        client = HttpClient(args.api) if args.api else InProcessClient(data_root)
+
+        timings = {op: [] for op in OPERATIONS}
+        errors = {}
+        _io.clear()
+        plan = [(user, random.Random(f"{user}-{n}")) for n in range(args.sessions) for user in users]
+
+        memory = None
+        if client.measures_io and args.memory:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda job: session(client, job[0], job[1], timings, errors), plan))
+        wall = time.perf_counter() - started
+        if client.measures_io and args.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory = {"retained_kb_per_session": round((current - baseline) / 1024 / len(plan), 1),
+                      "retained_kb_per_user": round((current - baseline) / 1024 / len(users), 1),
+                      "peak_mb": round(peak / 1024 / 1024, 1)}
+
+        io = None
+        if client.measures_io:
+            io = {op: {"reads_per_op": round(reads / max(len(timings[op]), 1), 2),
+                       "writes_per_op": round(writes / max(len(timings[op]), 1), 2),
+                       "bytes_parsed_per_op": round(parsed / max(len(timings[op]), 1))}
+                  for op, (reads, writes, parsed) in sorted(_io.items())}
+        return {
+            "concurrency": concurrency,
+            "sessions": len(plan),
+            "wall_s": round(wall, 2),
+            "sessions_per_sec": round(len(plan) / wall, 2),
+            "ops_per_sec": round(sum(len(t) for t in timings.values()) / wall, 2),
+            "latency_ms": {op: summarize(samples) for op, samples in timings.items()},
+            "errors": errors,
+            "file_io": io,
+            "memory": memory
+        }
+    finally:
+        shutil.rmtree(data_root, ignore_errors=True)
+
+
+def start_api(workers, data_root):
+    """Start http_api.py with this process's environment (stubs, scratch dirs). Returns (process, url)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = dict(os.environ, MYGROW_DATA_DIR=data_root)
+    # Its own session, so the forked workers can be stopped together
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "http_api.py"), "--port", str(port),
+                                "--workers", str(workers), "--quiet"], env=env, start_new_session=True)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=1):
+                return process, url
+        except OSError:
+            time.sleep(0.1)
+    stop_api(process)
+    raise RuntimeError("http_api.py did not start")
+
+
+def stop_api(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    process.wait(timeout=10)
+
+
+def run(args):
+    # Stand-ins for DeepSeek and bible-api.com, and a scratch verse cache so stub text
+    # never lands in the app's real one; set before the app modules are imported
+    deepseek, deepseek_url = run_stub_server(StubConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5,
+                                                        seed=args.seed))
+    bible, bible_url = run_bible_stub()
+    scratch = tempfile.mkdtemp(prefix="mygrow-load-run-")
+    os.environ["DEEPSEEK_BASE_URL"] = deepseek_url
+    os.environ.setdefault("DEEPSEEK_API_KEY", "stub-key")
+    os.environ["BIBLE_API_URL"] = bible_url
+    os.environ["MYGROW_CACHE_DIR"] = os.path.join(scratch, "cache")
+    api = None
+    if args.serve_api:
+        api, args.api = start_api(args.serve_api, os.path.join(scratch, "user_data"))
+    elif not args.api:
+        sys.addaudithook(_audit)
+
+    try:
+        levels = run_levels(args)
+    finally:
+        if api:
+            stop_api(api)
+        deepseek.shutdown()
+        bible.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "revision": git_revision(),
+        "target": "http_api.py (--serve-api)" if api else args.api or "in-process",
+        "config": vars(args),
+        "levels": levels
+    }
+    if args.output:
+        write_json(args.output, report)
+        print(f"Saved {args.output}")
+    return report
+
+
+def run_levels(args):
+    levels = []
+    for concurrency in args.levels:
+        result = run_level(args, concurrency)
+        levels.append(result)
+        print_table(f"Concurrency {concurrency}: {result['sessions']} sessions in {result['wall_s']}s "
+                    f"({result['sessions_per_sec']} sessions/s, {result['ops_per_sec']} ops/s) - latency (ms)",
+                    result["latency_ms"])
+        if result["file_io"]:
+            print("File opens per op (reads/writes/JSON bytes parsed): " + ", ".join(
+                f"{op} {io['reads_per_op']}r/{io['writes_per_op']}w/{io['bytes_parsed_per_op']:,}B"
+                for op, io in result["file_io"].items()))
+        if result["memory"]:
+            memory = result["memory"]
+            print(f"Memory: {memory['retained_kb_per_session']} KB retained per session, "
+                  f"{memory['retained_kb_per_user']} KB per user, peak {memory['peak_mb']} MB")
+        if result["errors"]:
+            print(f"⚠️ Errors: {result['errors']}")
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100, help="Distinct simulated users")
+    parser.add_argument("--sessions", type=int, default=1, help="Sessions per user")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 50, 100], help="Concurrency levels to run")
+    parser.add_argument("--prefill", type=int, default=0, help="Existing archive entries per user (in-process only)")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean DeepSeek stub latency")
+    parser.add_argument("--api", help="Base URL of a running http_api.py instead of in-process calls (no stubs)")
+    parser.add_argument("--serve-api", type=int, metavar="WORKERS",
+                        help="Start http_api.py with this many workers, wired to the stubs")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip tracemalloc (faster)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
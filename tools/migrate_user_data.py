@@ -0,0 +1,61 @@
+"""Move every user folder from the flat layout into the sharded one.
+
+The app moves a flat-layout folder the first time its user is opened, so this is
+optional; it finishes the job for users who haven't come back. It is safe to run
+while the app is serving: each folder is moved with a single rename, and a user
+opened mid-run is simply moved by whichever process gets there first. Users
+whose files exist in both layouts are listed at the end; they can't open their
+journal until the two folders are merged by hand.
+
+Usage:
+  python tools/migrate_user_data.py
+  python tools/migrate_user_data.py --data-dir /srv/mygrow/user_data --dry-run
+"""
+import argparse
+import time
+
+import bench_utils  # noqa: F401  (puts the repo root on sys.path)
+import data_layout
+
+
+def run(args):
+    root = data_layout.data_root(args.data_dir)
+    users = data_layout.legacy_users(root)
+    print(f"{len(users):,} flat-layout folders in {root}")
+    if args.dry_run or not users:
+        return 0
+
+    data_layout.check_layout(root)
+    started = time.perf_counter()
+    moved = 0
+    conflicts = []
+    for i, user_id in enumerate(users, 1):
+        try:
+            moved += data_layout.migrate_user(user_id, root)
+        except ValueError as e:
+            # Files in both layouts: the user can't open until they're merged by hand
+            conflicts.append(user_id)
+            print(f"⚠️ {e}")
+        if i % 10000 == 0:
+            print(f"  {i:,}/{len(users):,}")
+    elapsed = time.perf_counter() - started
+
+    manifest = data_layout.read_manifest(root) or {"layout": data_layout.LAYOUT}
+    manifest["migrated_at"] = time.time()
+    manifest["migrated_users"] = manifest.get("migrated_users", 0) + moved
+    data_layout.write_manifest(root, manifest)
+    print(f"Moved {moved:,} in {elapsed:.1f}s; {len(data_layout.legacy_users(root)):,} left")
+    if conflicts:
+        print(f"⚠️ {len(conflicts):,} users need their folders merged by hand: {', '.join(conflicts[:20])}")
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="Data directory (default MYGROW_DATA_DIR or user_data)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the folders to move")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
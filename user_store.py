@@ -0,0 +1,224 @@
+# user_store.py - Registered accounts and sign-in sessions in SQLite (NO STREAMLIT)
+#
+# Emails are unique and indexed (case-insensitive), so a sign-in is one indexed
+# row lookup plus one scrypt derivation, however many users are registered.
+# The scrypt cost is stored per user; accounts hashed with weaker parameters are
+# rehashed on their next successful sign-in. Sessions are random tokens stored
+# only as SHA-256 digests, with an in-memory cache in front so a rerun checks a
+# token without touching the database or the KDF.
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from data_layout import data_root
+
+# scrypt cost: N=2^15, r=8, p=1 uses 32 MiB and takes roughly 100 ms per check
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+KEY_BYTES = 32
+
+SESSION_TTL = 7 * 24 * 3600
+MAX_CACHED_SESSIONS = 10000
+MIN_PASSWORD_LENGTH = 6
+
+# Accounts shown on the sign-in page, created with a new store
+DEMO_USERS = (
+    ("user@example.com", "password123", "John Doe", "user_001"),
+    ("test@test.com", "test123", "Test User", "user_002"),
+)
+
+
+def _derive(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * n * 2, dklen=KEY_BYTES)
+
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+class UserStore:
+    """Accounts and sessions in one SQLite file; safe to share between threads."""
+
+    def __init__(self, path, scrypt_n=SCRYPT_N):
+        self.path = path
+        self.scrypt_n = scrypt_n
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        # Compared against when an email is unknown, so a miss costs as much as a hit
+        self._dummy = (os.urandom(16), scrypt_n)
+
+    def _connection(self):
+        """Open the database (and add the demo accounts) on first use."""
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                " user_id TEXT PRIMARY KEY, email TEXT NOT NULL UNIQUE COLLATE NOCASE, name TEXT,"
+                " password_hash BLOB NOT NULL, salt BLOB NOT NULL, n INTEGER NOT NULL,"
+                " r INTEGER NOT NULL, p INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " token_hash BLOB PRIMARY KEY, user_id TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.commit()
+            self._db = db
+            if not db.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+                for email, password, name, user_id in DEMO_USERS:
+                    self._insert(email, password, name, user_id)
+        return self._db
+
+    def _insert(self, email, password, name, user_id):
+        salt = os.urandom(16)
+        key = _derive(password, salt, self.scrypt_n, SCRYPT_R, SCRYPT_P)
+        self._db.execute(
+            "INSERT INTO users (user_id, email, name, password_hash, salt, n, r, p, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (user_id, email, name, key, salt, self.scrypt_n, SCRYPT_R, SCRYPT_P, time.time())
+        )
+        self._db.commit()
+
+    def register(self, email, password, name=""):
+        """Create an account. Returns its user info; raises ValueError if it can't be created."""
+        # The same id scheme as before accounts were stored (md5 of the email exactly as
+        # typed, case and all), so existing folders still match
+        digest = hashlib.md5((email or "").encode()).hexdigest()
+        email = normalize_email(email)
+        if "@" not in email:
+            raise ValueError("Please enter a valid email address")
+        if len(password) < MIN_PASSWORD_LENGTH:
+            raise ValueError(f"Passwords must be at least {MIN_PASSWORD_LENGTH} characters")
+
+        salt = os.urandom(16)
+        key = _derive(password, salt, self.scrypt_n, SCRYPT_R, SCRYPT_P)
+        with self._db_lock:
+            db = self._connection()
+            if db.execute("SELECT 1 FROM users WHERE email = ?", (email,)).fetchone():
+                raise ValueError("An account with this email already exists")
+            for user_id in (f"user_{digest[:8]}", f"user_{digest[:16]}", f"user_{digest}"):
+                try:
+                    db.execute(
+                        "INSERT INTO users (user_id, email, name, password_hash, salt, n, r, p, created_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (user_id, email, name, key, salt, self.scrypt_n, SCRYPT_R, SCRYPT_P, time.time())
+                    )
+                    db.commit()
+                    break
+                except sqlite3.IntegrityError:
+                    # Short id taken by another email: fall through to a longer one
+                    db.rollback()
+            else:
+                raise ValueError("Could not create the account")
+        return {"email": email, "name": name, "sub": user_id}
+
+    def authenticate(self, email, password):
+        """User info for matching credentials, else None."""
+        email = normalize_email(email)
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT user_id, name, password_hash, salt, n, r, p FROM users WHERE email = ?", (email,)
+            ).fetchone()
+
+        if row is None:
+            salt, n = self._dummy
+            _derive(password, salt, n, SCRYPT_R, SCRYPT_P)
+            return None
+
+        user_id, name, stored, salt, n, r, p = row
+        if not hmac.compare_digest(_derive(password, salt, n, r, p), stored):
+            return None
+
+        if n < self.scrypt_n or (r, p) != (SCRYPT_R, SCRYPT_P):
+            # Bring the hash up to the current cost while we have the password
+            salt = os.urandom(16)
+            key = _derive(password, salt, self.scrypt_n, SCRYPT_R, SCRYPT_P)
+            with self._db_lock:
+                self._db.execute("UPDATE users SET password_hash = ?, salt = ?, n = ?, r = ?, p = ? WHERE user_id = ?",
+                                 (key, salt, self.scrypt_n, SCRYPT_R, SCRYPT_P, user_id))
+                self._db.commit()
+        return {"email": email, "name": name, "sub": user_id}
+
+    def create_session(self, user_info, ttl=SESSION_TTL):
+        """A new session token for a signed-in user."""
+        token = secrets.token_urlsafe(32)
+        digest = _token_digest(token)
+        expires_at = time.time() + ttl
+        with self._db_lock:
+            db = self._connection()
+            db.execute("INSERT INTO sessions (token_hash, user_id, expires_at) VALUES (?, ?, ?)",
+                       (digest, user_info["sub"], expires_at))
+            db.commit()
+        with self._sessions_lock:
+            if len(self._sessions) >= MAX_CACHED_SESSIONS:
+                self._sessions = {d: item for d, item in self._sessions.items() if item[1] > time.time()}
+            self._sessions[digest] = (dict(user_info), expires_at)
+        return token
+
+    def verify_session(self, token):
+        """User info for a live session token, else None. Cached after the first check."""
+        if not token:
+            return None
+        digest = _token_digest(token)
+        now = time.time()
+        with self._sessions_lock:
+            cached = self._sessions.get(digest)
+        if cached is not None:
+            return dict(cached[0]) if cached[1] > now else None
+
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT u.user_id, u.email, u.name, s.expires_at FROM sessions s"
+                " JOIN users u ON u.user_id = s.user_id WHERE s.token_hash = ?", (digest,)
+            ).fetchone()
+        if row is None or row[3] <= now:
+            return None
+        user_info = {"email": row[1], "name": row[2], "sub": row[0]}
+        with self._sessions_lock:
+            self._sessions[digest] = (user_info, row[3])
+        return dict(user_info)
+
+    def end_session(self, token):
+        """Sign a session out (other processes keep their cached copy until it expires)."""
+        digest = _token_digest(token)
+        with self._sessions_lock:
+            self._sessions.pop(digest, None)
+        with self._db_lock:
+            db = self._connection()
+            db.execute("DELETE FROM sessions WHERE token_hash = ? OR expires_at <= ?", (digest, time.time()))
+            db.commit()
+
+    def count(self):
+        with self._db_lock:
+            return self._connection().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def open_user_store():
+    """The shared user store (MYGROW_USER_DB, default users.sqlite3 in the data directory)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                default = os.path.join(data_root(), "users.sqlite3")
+                _store = UserStore(os.getenv("MYGROW_USER_DB", default))
+    return _store
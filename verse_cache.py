@@ -0,0 +1,165 @@
+# verse_cache.py - Process-wide LRU backed by a persistent SQLite cache (NO STREAMLIT)
+#
+# Verse text is the same for every user, so one cache serves all sessions.
+# Failed lookups are cached too ("negative" entries, value None) with a short
+# TTL so a bad reference or an API outage doesn't cost a network timeout per click.
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import get_metrics
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+DEFAULT_TTL = 30 * 24 * 3600   # verse text doesn't change
+NEGATIVE_TTL = 60              # outages and timeouts
+NOT_FOUND_TTL = 15 * 60        # references the API doesn't know
+
+
+class VerseCache:
+    """Two tiers: an in-memory LRU (L1) in front of a SQLite file (L2)."""
+
+    def __init__(self, path=None, max_entries=4096):
+        self.path = path
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "negative_hits": 0}
+
+    def _connection(self):
+        """Open the L2 database on first use."""
+        if self._db is None and self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS verse_cache ("
+                " key TEXT PRIMARY KEY, text TEXT, expires_at REAL NOT NULL)"
+            )
+            self._db = db
+        return self._db
+
+    def get(self, key):
+        """Return (hit, text). A hit with text None is a cached failure."""
+        now = time.time()
+        with self._lock:
+            item = self._lru.get(key)
+            if item is not None:
+                if item[1] > now:
+                    self._lru.move_to_end(key)
+                else:
+                    del self._lru[key]
+                    item = None
+        if item is not None:
+            self._count_hit("l1", item[0])
+            return True, item[0]
+
+        row = None
+        try:
+            with self._db_lock:
+                db = self._connection()
+                if db is not None:
+                    row = db.execute(
+                        "SELECT text, expires_at FROM verse_cache WHERE key = ?", (key,)
+                    ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Verse cache read error: {e}")
+
+        if row and row[1] > now:
+            self._remember(key, row[0], row[1])
+            self._count_hit("l2", row[0])
+            return True, row[0]
+
+        with self._lock:
+            self._stats["misses"] += 1
+        get_metrics().incr("verse_cache.lookup", result="miss")
+        return False, None
+
+    def peek(self, key):
+        """L1-only lookup that never touches disk (for render-time checks)."""
+        with self._lock:
+            item = self._lru.get(key)
+            if item is not None and item[1] > time.time():
+                return True, item[0]
+        return False, None
+
+    def set(self, key, text, ttl=DEFAULT_TTL):
+        """Cache a verse (or a failure, with text None)."""
+        expires_at = time.time() + ttl
+        self._remember(key, text, expires_at)
+        try:
+            with self._db_lock:
+                db = self._connection()
+                if db is not None:
+                    db.execute(
+                        "INSERT OR REPLACE INTO verse_cache (key, text, expires_at) VALUES (?, ?, ?)",
+                        (key, text, expires_at)
+                    )
+                    db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Verse cache write error: {e}")
+
+    def set_failure(self, key, ttl=NEGATIVE_TTL):
+        self.set(key, None, ttl)
+
+    def _remember(self, key, text, expires_at):
+        with self._lock:
+            self._lru[key] = (text, expires_at)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _count_hit(self, tier, text):
+        with self._lock:
+            self._stats[f"{tier}_hits"] += 1
+            if text is None:
+                self._stats["negative_hits"] += 1
+        get_metrics().incr("verse_cache.lookup", result=f"{tier}_hit", negative=text is None)
+
+    def stats(self):
+        """Hit counters plus the overall hit ratio."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._lru)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["l1_hits"] + stats["l2_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def purge_expired(self):
+        """Drop expired rows from the L2 file."""
+        with self._db_lock:
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM verse_cache WHERE expires_at <= ?", (time.time(),))
+                db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+        with self._db_lock:
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM verse_cache")
+                db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verse_cache():
+    """The shared verse cache (file under MYGROW_CACHE_DIR, default .cache/)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                directory = os.getenv("MYGROW_CACHE_DIR", CACHE_DIR)
+                _cache = VerseCache(os.path.join(directory, "verse_cache.sqlite3"))
+    return _cache